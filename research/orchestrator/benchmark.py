@@ -0,0 +1,483 @@
+"""
+Offline benchmark of orchestrator overhead.
+
+Runs `main()` end to end against a scripted stand-in for the Responses API and
+in-process fake Linear/Smartsheet MCP servers, so no network, API key or external
+server is needed. Both stand-ins have configurable latency and payload size.
+
+Usage:
+    python benchmark.py                                  # 40 turns, 4 agents
+    python benchmark.py --agents 2 --turns 20 --payload-bytes 8000
+    python benchmark.py --llm-latency 0.05 --tool-latency 0.02 --parallel-tool-calls
+    python benchmark.py --llm-latency 0.2 --tool-latency 0.1 --parallel-tool-calls --stream-responses
+    python benchmark.py --output bench_output.json
+
+Reports per-turn orchestrator CPU time, growth of `AgentState.inputs`, time spent
+writing the run log and turns per second as JSON. CPU time includes the in-process
+fake servers, which do almost no work; simulated latency is sleep and costs no CPU.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import AsyncExitStack
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+from mcp.server.fastmcp import FastMCP
+from mcp.shared.memory import create_connected_server_and_client_session
+from openai.types.responses import Response
+
+import main as orchestrator_main
+from orchestrator.agent_state import AgentState
+from orchestrator.cassette import to_jsonable
+from orchestrator.config import Config, MCPServerConfig, OpenAIConfig, RunConfig
+from orchestrator.logger import RunLogger
+from orchestrator.mcp_manager import MCPManager, MCPServerHandle
+from orchestrator.prompts import HELLO_TICKET_WORLD, TOOL_INTEGRATION_WORLD
+
+
+# ============================================================================
+# FAKE MCP SERVERS
+# ============================================================================
+
+def _payload(kind: str, size: int, **fields: Any) -> str:
+    """JSON tool output of roughly `size` bytes."""
+    body = {"kind": kind, **fields}
+    filler = max(0, size - len(json.dumps(body)) - 12)
+    body["notes"] = ("lorem ipsum " * (filler // 12 + 1))[:filler]
+    return json.dumps(body)
+
+
+def build_fake_linear(latency: float, payload_bytes: int) -> FastMCP:
+    server = FastMCP("fake-linear")
+    counter = {"issues": 0}
+
+    @server.tool()
+    async def list_teams(limit: int = 10) -> str:
+        """List Linear teams."""
+        await asyncio.sleep(latency)
+        return _payload("teams", payload_bytes, teams=[{"id": "team_eng", "name": "Engineering"}])
+
+    @server.tool()
+    async def list_projects(team_id: str = "") -> str:
+        """List Linear projects for a team."""
+        await asyncio.sleep(latency)
+        return _payload("projects", payload_bytes, projects=[{"id": "proj_1", "name": "Hello"}])
+
+    @server.tool()
+    async def list_issues(project_id: str = "", limit: int = 20) -> str:
+        """List Linear issues in a project."""
+        await asyncio.sleep(latency)
+        return _payload("issues", payload_bytes, issues=[{"id": f"ENG-{i}"} for i in range(1, counter["issues"] + 1)])
+
+    @server.tool()
+    async def create_issue(title: str, team_id: str = "", description: str = "") -> str:
+        """Create a Linear issue."""
+        await asyncio.sleep(latency)
+        counter["issues"] += 1
+        return json.dumps({"id": f"ENG-{counter['issues']}", "title": title, "state": "Todo"})
+
+    @server.tool()
+    async def update_issue(issue_id: str, state: str = "") -> str:
+        """Update a Linear issue's state."""
+        await asyncio.sleep(latency)
+        return json.dumps({"id": issue_id, "state": state})
+
+    return server
+
+
+def build_fake_smartsheet(latency: float, payload_bytes: int) -> FastMCP:
+    server = FastMCP("fake-smartsheet")
+    counter = {"rows": 0}
+
+    @server.tool()
+    async def health_check() -> str:
+        """Check Smartsheet API health."""
+        await asyncio.sleep(latency)
+        return "ok"
+
+    @server.tool()
+    async def list_sheets() -> str:
+        """List Smartsheet sheets."""
+        await asyncio.sleep(latency)
+        return _payload("sheets", payload_bytes, sheets=[{"id": 101, "name": "Specs"}])
+
+    @server.tool()
+    async def get_sheet(sheet_id: int = 101) -> str:
+        """Get a Smartsheet sheet with its rows."""
+        await asyncio.sleep(latency)
+        return _payload("sheet", payload_bytes, id=sheet_id, rows=counter["rows"])
+
+    @server.tool()
+    async def add_sheet_row(sheet_id: int = 101, cells: str = "") -> str:
+        """Add a row to a Smartsheet sheet."""
+        await asyncio.sleep(latency)
+        counter["rows"] += 1
+        return json.dumps({"sheet_id": sheet_id, "row_id": 1000 + counter["rows"]})
+
+    return server
+
+
+class InProcessServerHandle(MCPServerHandle):
+    """MCP server handle connected to a FastMCP server over in-memory streams."""
+
+    def __init__(self, namespace: str, server: FastMCP) -> None:
+        super().__init__(namespace, f"in-process:{namespace}")
+        self._server = server
+
+    async def _open_session(self, stack: AsyncExitStack):
+        return await stack.enter_async_context(
+            create_connected_server_and_client_session(self._server, message_handler=self._handle_message)
+        )
+
+
+def build_fake_mcp(cfg: MCPServerConfig, latency: float, payload_bytes: int) -> MCPManager:
+    servers = {
+        "linear": build_fake_linear(latency, payload_bytes),
+        "smartsheet": build_fake_smartsheet(latency, payload_bytes),
+    }
+    return MCPManager(
+        cfg, handle_factory=lambda namespace, _command: InProcessServerHandle(namespace, servers[namespace])
+    )
+
+
+# ============================================================================
+# SCRIPTED LLM
+# ============================================================================
+
+# Discovery-heavy then write-heavy, like the recorded runs
+TOOL_SCRIPT = [
+    ("linear__list_teams", {"limit": 5}),
+    ("smartsheet__list_sheets", {}),
+    ("linear__list_projects", {"team_id": "team_eng"}),
+    ("linear__list_issues", {"project_id": "proj_1"}),
+    ("linear__create_issue", {"title": "Hello ticket", "team_id": "team_eng"}),
+    ("smartsheet__add_sheet_row", {"sheet_id": 101, "cells": "AC1; AC2; AC3"}),
+    ("smartsheet__get_sheet", {"sheet_id": 101}),
+    ("linear__update_issue", {"issue_id": "ENG-1", "state": "Done"}),
+]
+
+
+class ScriptedLLM:
+    """Deterministic stand-in for `OpenAIClient` returning real `Response` objects.
+
+    Each turn issues `calls_per_turn` tool calls (all in one round when parallel tool
+    calls are allowed, otherwise one per round) and then replies with a message of
+    `message_bytes` characters. Optionally prepends a reasoning item to each output.
+    When streamed, `latency` is spread evenly over the output items, each emitted as
+    soon as its share has elapsed.
+    """
+
+    def __init__(
+        self,
+        *,
+        latency: float = 0.0,
+        calls_per_turn: int = 3,
+        message_bytes: int = 400,
+        reasoning_bytes: int = 0,
+    ) -> None:
+        self._latency = latency
+        self._calls_per_turn = calls_per_turn
+        self._message_bytes = message_bytes
+        self._reasoning_bytes = reasoning_bytes
+        self._seq = 0
+        self._calls_done: Dict[str, int] = {}
+        self._cached_prefixes: Dict[str, List[str]] = {}
+        self.requests = 0
+        self.request_bytes = 0
+        # Time spent turning history items into request JSON, as the real client does
+        self.serialize_seconds = 0.0
+
+    async def respond_with_tools(
+        self,
+        inputs,
+        tools,
+        *,
+        parallel_tool_calls=False,
+        previous_response_id=None,
+        prompt_cache_key=None,
+        on_text_delta=None,
+        on_output_item=None,
+        timings=None,
+        **_: Any,
+    ) -> Response:
+        self.requests += 1
+        started = time.perf_counter()
+        segments = [json.dumps(tools)] + [json.dumps(to_jsonable(item)) for item in inputs]
+        self.serialize_seconds += time.perf_counter() - started
+        self.request_bytes += sum(len(segment) for segment in segments[1:])
+        usage = {
+            "input_tokens": sum(len(segment) for segment in segments) // 4,
+            "cached_tokens": 0 if previous_response_id else self._cached_tokens(prompt_cache_key or "", segments),
+        }
+        streaming = on_text_delta is not None or on_output_item is not None
+        if not streaming:
+            await asyncio.sleep(self._latency)
+
+        available = {tool["name"] for tool in tools}
+        script = [(name, args) for name, args in TOOL_SCRIPT if name in available]
+        done = _calls_this_turn(inputs)
+        if previous_response_id and done == len(inputs):
+            # Chained request carrying only tool outputs: the turn continues server-side
+            done += self._calls_done.get(previous_response_id, 0)
+        output: List[Dict[str, Any]] = []
+        if self._reasoning_bytes:
+            output.append(self._item("reasoning", summary=[{"type": "summary_text", "text": "r" * self._reasoning_bytes}]))
+        if done < self._calls_per_turn and script:
+            count = self._calls_per_turn - done if parallel_tool_calls else 1
+            for index in range(done, done + count):
+                name, args = script[index % len(script)]
+                output.append(self._item(
+                    "function_call", call_id=f"call_{self._seq}", name=name,
+                    arguments=json.dumps(args), status="completed",
+                ))
+        else:
+            text = ("Progress update: " + "x" * self._message_bytes)[: self._message_bytes]
+            output.append(self._item(
+                "message", role="assistant", status="completed",
+                content=[{"type": "output_text", "text": text, "annotations": []}],
+            ))
+        if streaming:
+            await self._stream(output, on_text_delta, on_output_item, timings)
+        response = self._response(output, usage)
+        self._calls_done[response.id] = done
+        return response
+
+    async def _stream(self, output, on_text_delta, on_output_item, timings) -> None:
+        started = time.perf_counter()
+        for item in output:
+            await asyncio.sleep(self._latency / len(output))
+            if timings is not None:
+                timings.setdefault("ttft_s", time.perf_counter() - started)
+            if item["type"] == "message" and on_text_delta:
+                on_text_delta(item["content"][0]["text"])
+            if on_output_item:
+                on_output_item(SimpleNamespace(**item))
+
+    async def complete(self, messages, max_output_tokens: int = 600):
+        await asyncio.sleep(self._latency)
+        return "ok", {}
+
+    def cassette_stats(self):
+        return None
+
+    def _cached_tokens(self, key: str, segments: List[str]) -> int:
+        """Prompt cache model: the prefix shared with the previous request under `key`,
+        in 128-token blocks once at least 1024 tokens match."""
+        previous = self._cached_prefixes.get(key, [])
+        self._cached_prefixes[key] = segments
+        shared = 0
+        for old, new in zip(previous, segments):
+            if old != new:
+                break
+            shared += len(new)
+        tokens = shared // 4
+        return tokens // 128 * 128 if tokens >= 1024 else 0
+
+    def _item(self, kind: str, **fields: Any) -> Dict[str, Any]:
+        self._seq += 1
+        prefix = {"function_call": "fc", "message": "msg", "reasoning": "rs"}[kind]
+        return {"type": kind, "id": f"{prefix}_{self._seq}", **fields}
+
+    def _response(self, output: List[Dict[str, Any]], usage: Dict[str, int]) -> Response:
+        return Response.model_validate({
+            "id": f"resp_{self._seq}",
+            "object": "response",
+            "created_at": 0,
+            "model": "scripted",
+            "output": output,
+            "parallel_tool_calls": False,
+            "tool_choice": "auto",
+            "tools": [],
+            "usage": {
+                "input_tokens": usage["input_tokens"],
+                "input_tokens_details": {"cached_tokens": usage["cached_tokens"]},
+                "output_tokens": 20,
+                "output_tokens_details": {"reasoning_tokens": 0},
+                "total_tokens": usage["input_tokens"] + 20,
+            },
+        })
+
+
+def _calls_this_turn(inputs: List[Any]) -> int:
+    """Function outputs since the last plain message, i.e. calls made this turn."""
+    count = 0
+    for item in reversed(inputs):
+        kind = item.get("type") if isinstance(item, dict) else getattr(item, "type", None)
+        if kind == "function_call_output":
+            count += 1
+        elif kind in ("function_call", "reasoning"):
+            continue
+        else:
+            break
+    return count
+
+
+# ============================================================================
+# MEASUREMENT
+# ============================================================================
+
+def deep_sizeof(obj: Any, seen: set = None) -> int:
+    """Approximate retained bytes of an object graph (dicts, lists, strings, models)."""
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(v, seen) for v in obj)
+    elif hasattr(obj, "__dict__"):
+        size += deep_sizeof(vars(obj), seen)
+    elif hasattr(obj, "__slots__"):
+        size += sum(deep_sizeof(getattr(obj, s), seen) for s in obj.__slots__ if hasattr(obj, s))
+    return size
+
+
+class TurnRecorder:
+    """`on_turn` hook: CPU and log-write time since the previous turn, inputs size."""
+
+    def __init__(self) -> None:
+        self.turns: List[Dict[str, Any]] = []
+        self._cpu_mark = time.process_time()
+        self._log_mark = 0.0
+
+    def __call__(self, turn: int, agents: List[AgentState], logger: RunLogger) -> None:
+        cpu_now = time.process_time()
+        # One `seen` set: items shared between agents (the event log) count once
+        seen: set = set()
+        inputs_bytes = sum(deep_sizeof(agent.inputs, seen) for agent in agents)
+        self.turns.append({
+            "turn": turn,
+            "cpu_ms": round((cpu_now - self._cpu_mark) * 1000, 3),
+            "log_ms": round((logger.write_seconds - self._log_mark) * 1000, 3),
+            "inputs_items": sum(len(agent.inputs) for agent in agents),
+            "inputs_bytes": inputs_bytes,
+        })
+        self._log_mark = logger.write_seconds
+        # Exclude the measurement itself from the next turn's CPU time
+        self._cpu_mark = time.process_time()
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+async def run_benchmark(args: argparse.Namespace) -> Dict[str, Any]:
+    log_dir = Path(tempfile.mkdtemp(prefix="orchestrator-bench-"))
+    cfg = Config(
+        openai=OpenAIConfig(api_key="offline", model="scripted"),
+        mcp=MCPServerConfig(),
+        run=RunConfig(
+            max_turns=args.turns,
+            stale_turn_limit=args.turns + 1,
+            max_tool_rounds=args.calls_per_turn + 2,
+            parallel_tool_calls=args.parallel_tool_calls,
+            stream_responses=args.stream_responses,
+            chain_responses=args.chain_responses,
+            context_token_budget=args.context_token_budget,
+            prompt_cache=args.prompt_cache,
+            prompt_tool_mode=args.prompt_tool_mode,
+            tool_subset_size=args.tool_subset_size,
+            reasoning_keep=args.reasoning_keep,
+            tool_output_spill_chars=args.tool_output_spill_chars,
+            turn_scheduler=args.turn_scheduler,
+            concurrent_turns=args.concurrent_turns,
+            team_digest_chars=args.team_digest_chars,
+            log_dir=log_dir,
+        ),
+    )
+    llm = ScriptedLLM(
+        latency=args.llm_latency,
+        calls_per_turn=args.calls_per_turn,
+        message_bytes=args.message_bytes,
+        reasoning_bytes=args.reasoning_bytes,
+    )
+    mcp = build_fake_mcp(cfg.mcp, args.tool_latency, args.payload_bytes)
+    recorder = TurnRecorder()
+    world = TOOL_INTEGRATION_WORLD if args.agents == 4 else HELLO_TICKET_WORLD
+
+    started = time.perf_counter()
+    await orchestrator_main.main(world, cfg=cfg, llm=llm, mcp=mcp, on_turn=recorder)
+    wall = time.perf_counter() - started
+
+    turns = recorder.turns
+    cpu = [t["cpu_ms"] for t in turns]
+    logging_ms = [t["log_ms"] for t in turns]
+    growth = [b["inputs_bytes"] - a["inputs_bytes"] for a, b in zip(turns, turns[1:])]
+    return {
+        "config": {k: v for k, v in vars(args).items() if k != "output"},
+        "summary": {
+            "turns": len(turns),
+            "wall_s": round(wall, 4),
+            "turns_per_s": round(len(turns) / wall, 3) if wall else 0.0,
+            "llm_requests": llm.requests,
+            "serialize_ms_per_request": round(llm.serialize_seconds * 1000 / llm.requests, 4) if llm.requests else 0.0,
+            "cpu_ms_per_turn": {
+                "mean": round(statistics.fmean(cpu), 3) if cpu else 0.0,
+                "p50": _percentile(cpu, 50),
+                "p95": _percentile(cpu, 95),
+            },
+            "log_ms_per_turn": round(statistics.fmean(logging_ms), 3) if logging_ms else 0.0,
+            "inputs_bytes_final": turns[-1]["inputs_bytes"] if turns else 0,
+            "inputs_items_final": turns[-1]["inputs_items"] if turns else 0,
+            "inputs_bytes_growth_per_turn": round(statistics.fmean(growth), 1) if growth else 0.0,
+            "request_bytes_total": llm.request_bytes,
+        },
+        "turns": turns,
+    }
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Offline orchestrator overhead benchmark")
+    parser.add_argument("--agents", type=int, choices=(2, 4), default=4)
+    parser.add_argument("--turns", type=int, default=40)
+    parser.add_argument("--calls-per-turn", type=int, default=3)
+    parser.add_argument("--parallel-tool-calls", action="store_true")
+    parser.add_argument("--chain-responses", action="store_true", help="Send only new items with previous_response_id")
+    parser.add_argument("--context-token-budget", type=int, default=0, help="Compact agent histories to this many tokens")
+    parser.add_argument("--prompt-cache", action="store_true", help="Byte-stable prefix and per-agent prompt_cache_key")
+    parser.add_argument(
+        "--prompt-tool-mode", choices=("full", "index", "none"), default="full", help="Tool catalogue in system prompts"
+    )
+    parser.add_argument("--tool-subset-size", type=int, default=0, help="Tools offered per agent (0 = all)")
+    parser.add_argument("--team-digest-chars", type=int, default=0, help="Condense teammate activity per turn")
+    parser.add_argument("--reasoning-keep", type=int, default=-1, help="Reasoning items kept per agent (-1 = all)")
+    parser.add_argument("--tool-output-spill-chars", type=int, default=0, help="Spill longer tool outputs (0 = off)")
+    parser.add_argument(
+        "--turn-scheduler", choices=("round_robin", "activity"), default="round_robin", help="Who takes the next turn"
+    )
+    parser.add_argument("--concurrent-turns", type=int, default=1, help="Agents taking turns at the same time")
+    parser.add_argument("--stream-responses", action="store_true", help="Dispatch tool calls while the LLM streams")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="Seconds per LLM request")
+    parser.add_argument("--tool-latency", type=float, default=0.0, help="Seconds per MCP tool call")
+    parser.add_argument("--payload-bytes", type=int, default=2000, help="Size of list/get tool outputs")
+    parser.add_argument("--message-bytes", type=int, default=400, help="Size of agent messages")
+    parser.add_argument("--reasoning-bytes", type=int, default=0, help="Add a reasoning item of this size per response")
+    parser.add_argument("--show-console", action="store_true", help="Keep the orchestrator's console output")
+    parser.add_argument("--output", type=Path, help="Write the JSON report here instead of stdout")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args(sys.argv[1:])
+    logging.getLogger("mcp").setLevel(logging.WARNING)
+    orchestrator_main.console.quiet = not args.show_console
+    report = asyncio.run(run_benchmark(args))
+    text = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n", encoding="utf-8")
+        print(json.dumps(report["summary"], indent=2))
+    else:
+        print(text)
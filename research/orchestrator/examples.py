@@ -8,12 +8,26 @@ Usage:
     python examples.py documentation_sync
     python examples.py tool_integration
     python examples.py custom
+    python examples.py all --repeat 3 --concurrency 4
+    python examples.py bug_triage sprint_planning --repeat 5 --concurrency 5
+
+With several runs (more than one scenario, "all", or --repeat), the runs share one
+OpenAI client (one HTTP connection pool) and one connected MCPManager (one set of
+MCP sessions), at most --concurrency of them at a time in one event loop. Each run
+writes its own log; a summary table is printed at the end.
 """
 
+import argparse
 import asyncio
 import sys
+import time
+from typing import Any, Dict, List, Optional
 
+import main as orchestrator_main
 from main import main
+from orchestrator.config import Config, load_config
+from orchestrator.llm import OpenAIClient
+from orchestrator.mcp_manager import MCPManager
 from orchestrator.prompts import (
     BUG_TRIAGE_WORLD,
     DOCUMENTATION_SYNC_WORLD,
@@ -75,11 +89,98 @@ async def run_scenario(scenario_name: str):
     await main(world_prompt=world_prompt)
 
 
+async def run_batch(
+    scenario_names: List[str],
+    repeat: int,
+    concurrency: int,
+    verbose: bool = False,
+    *,
+    cfg: Optional[Config] = None,
+    llm: Optional[OpenAIClient] = None,
+    mcp: Optional[MCPManager] = None,
+) -> List[Dict[str, Any]]:
+    """Run every scenario `repeat` times, at most `concurrency` runs at once.
+
+    `cfg`, `llm` and `mcp` replace the ones built from the environment, as for `main`;
+    `mcp` is connected and closed here either way.
+    """
+    for name in scenario_names:
+        if name not in SCENARIOS:
+            print(f"❌ Unknown scenario: {name}")
+            print_usage()
+            sys.exit(1)
+
+    cfg = cfg or load_config()
+    llm = llm or OpenAIClient(cfg.openai)
+    mcp = mcp or MCPManager(cfg.mcp)
+    # Interleaved output from concurrent runs is unreadable; the logs have it all
+    orchestrator_main.console.quiet = not verbose
+    jobs = [(name, index) for name in scenario_names for index in range(1, repeat + 1)]
+    semaphore = asyncio.Semaphore(concurrency)
+    print(f"🚀 Running {len(jobs)} runs, {concurrency} at a time")
+
+    async def _run(number: int, name: str, index: int) -> Dict[str, Any]:
+        async with semaphore:
+            started = time.perf_counter()
+            row: Dict[str, Any] = {"scenario": name, "repeat": index}
+            try:
+                row.update(await main(
+                    world_prompt=SCENARIOS[name], cfg=cfg, llm=llm, mcp=mcp, own_mcp=False, run_id=f"run{number:03d}"
+                ))
+            except Exception as exc:
+                row.update({"outcome": f"error: {exc}", "turns": 0, "input_tokens": 0, "cached_tokens": 0})
+            row["wall_s"] = round(time.perf_counter() - started, 2)
+            print(f"  [{number}/{len(jobs)}] {name} #{index}: {row['outcome']} after {row['turns']} turns, {row['wall_s']}s")
+            return row
+
+    try:
+        await mcp.connect_all()
+        # The runs share the manager, so its servers are probed once for the batch
+        startup = await orchestrator_main.probe_servers(mcp)
+        failing = [name for name, result in startup["probes"].items() if result.startswith("[probe-error]")]
+        print(f"🩺 {len(startup['probes'])} health probes, {len(failing)} failing {failing or ''}".rstrip())
+        for namespace, error in startup["startup_profile"]["errors"].items():
+            print(f"  {namespace} failed to start: {error}")
+        rows = await asyncio.gather(*(_run(number, name, index) for number, (name, index) in enumerate(jobs, 1)))
+    finally:
+        await mcp.close()
+    print_summary(rows)
+    return rows
+
+
+def print_summary(rows: List[Dict[str, Any]]) -> None:
+    header = f"{'scenario':<20} {'#':>3} {'outcome':<10} {'turns':>5} {'input_tok':>10} {'cached_tok':>10} {'wall_s':>8}  log"
+    print(f"\n{header}\n{'-' * len(header)}")
+    for row in rows:
+        print(
+            f"{row['scenario']:<20} {row['repeat']:>3} {row['outcome'][:10]:<10} {row['turns']:>5} "
+            f"{row['input_tokens']:>10} {row['cached_tokens']:>10} {row['wall_s']:>8}  {row.get('log_path', '-')}"
+        )
+    print(
+        f"{len(rows)} runs, {sum(row['turns'] for row in rows)} turns, "
+        f"{sum(row['input_tokens'] for row in rows)} input tokens"
+    )
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run orchestrator scenarios", usage=__doc__)
+    parser.add_argument("scenarios", nargs="+", help='Scenario names, or "all" for every built-in scenario')
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per scenario")
+    parser.add_argument("--concurrency", type=int, default=1, help="Runs in flight at once")
+    parser.add_argument("--verbose", action="store_true", help="Keep per-run console output in batch mode")
+    return parser.parse_args(argv)
+
+
 if __name__ == "__main__":
     if len(sys.argv) < 2:
         print_usage()
         sys.exit(1)
 
-    scenario_name = sys.argv[1]
-    asyncio.run(run_scenario(scenario_name))
+    args = parse_args(sys.argv[1:])
+    # "all" is every built-in scenario; the custom one is only a template
+    names = [name for name in SCENARIOS if name != "custom"] if args.scenarios == ["all"] else args.scenarios
+    if len(names) == 1 and args.repeat == 1:
+        asyncio.run(run_scenario(names[0]))
+    else:
+        asyncio.run(run_batch(names, max(1, args.repeat), max(1, args.concurrency), args.verbose))
 
@@ -1,17 +1,27 @@
 from __future__ import annotations
 
 import asyncio
+import hashlib
+import json
 import os
+import time
 from datetime import datetime
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
 from rich.console import Console
 
 from orchestrator.agent_state import AgentState
+from orchestrator.cassette import to_jsonable
+from orchestrator.compaction import ContextCompactor
+from orchestrator.tokens import TokenCounter
+from orchestrator.tool_selection import ToolSelector
 from orchestrator.config import Config, load_config
-from orchestrator.llm import OpenAIClient
+from orchestrator.event_log import SharedEventLog
+from orchestrator.llm import OpenAIClient, ResponseChainError
 from orchestrator.logger import RunLogger
-from orchestrator.mcp_manager import MCPManager, NamespacedTool
+from orchestrator.mcp_manager import DISCOVER_TOOL, READ_OUTPUT_TOOL, MCPManager, NamespacedTool
+from orchestrator.output_store import OutputStore
+from orchestrator.scheduler import make_scheduler
 from orchestrator.parsing import ToolCall
 from orchestrator.prompts import (
     ALEX_OPERATIONS_PERSONA,
@@ -41,14 +51,43 @@ def _build_run_signature(cfg: Config, world_prompt: str, agent_personas: Dict[st
             "openai_model": cfg.openai.model,
             "openai_temperature": cfg.openai.temperature,
             "openai_seed": cfg.openai.seed,
+            "openai_cassette_mode": cfg.openai.cassette_mode,
+            "openai_cassette": str(cfg.openai.cassette_path) if cfg.openai.cassette_mode else None,
             "smartsheet_mcp_cmd": cfg.mcp.smartsheet_cmd,
             "linear_mcp_cmd": cfg.mcp.linear_cmd,
+            "mcp_pool_socket": cfg.mcp.pool_socket,
+            "mcp_startup_timeout": cfg.mcp.startup_timeout,
+            "mcp_sessions_per_namespace": cfg.mcp.sessions_per_namespace,
+            "mcp_session_counts": cfg.mcp.session_counts,
+            "mcp_cache_enabled": cfg.mcp.cache_enabled,
+            "mcp_cache_ttl_seconds": cfg.mcp.cache_ttl_seconds,
+            "mcp_cache_tool_ttls": cfg.mcp.cache_tool_ttls,
+            "mcp_single_flight": cfg.mcp.single_flight,
+            "mcp_single_flight_exclude": list(cfg.mcp.single_flight_exclude),
+            "mcp_max_concurrent_calls": cfg.mcp.max_concurrent_calls,
+            "mcp_concurrency_limits": cfg.mcp.concurrency_limits,
         },
         "run_config": {
             "max_turns": cfg.run.max_turns,
             "stale_turn_limit": cfg.run.stale_turn_limit,
             "reflection_interval": cfg.run.reflection_interval,
             "max_tool_rounds": cfg.run.max_tool_rounds,
+            "parallel_tool_calls": cfg.run.parallel_tool_calls,
+            "stream_responses": cfg.run.stream_responses,
+            "chain_responses": cfg.run.chain_responses,
+            "context_token_budget": cfg.run.context_token_budget,
+            "compaction_mode": cfg.run.compaction_mode,
+            "compaction_keep_recent": cfg.run.compaction_keep_recent,
+            "token_count_mode": cfg.run.token_count_mode,
+            "prompt_cache": cfg.run.prompt_cache,
+            "prompt_tool_mode": cfg.run.prompt_tool_mode,
+            "tool_subset_size": cfg.run.tool_subset_size,
+            "team_digest_chars": cfg.run.team_digest_chars,
+            "reasoning_keep": cfg.run.reasoning_keep,
+            "tool_output_spill_chars": cfg.run.tool_output_spill_chars,
+            "tool_output_preview_chars": cfg.run.tool_output_preview_chars,
+            "turn_scheduler": cfg.run.turn_scheduler,
+            "concurrent_turns": cfg.run.concurrent_turns,
             "log_dir": str(cfg.run.log_dir),
         },
         "world_prompt": world_prompt,
@@ -57,18 +96,55 @@ def _build_run_signature(cfg: Config, world_prompt: str, agent_personas: Dict[st
     }
 
 
-async def main(world_prompt: str = HELLO_TICKET_WORLD) -> None:
+async def probe_servers(mcp: MCPManager) -> Dict[str, Any]:
+    """Health-probe the connected servers; returns the probes and the startup profile."""
+    console.print("[bold cyan]Performing health probes...[/]")
+    health = await mcp.health_probe()
+    for name, result in health.items():
+        console.print(f"  {name}: {result}")
+    return {"probes": health, "startup_profile": {**mcp.startup_profile, "errors": mcp.startup_errors}}
+
+
+async def main(
+    world_prompt: str = HELLO_TICKET_WORLD,
+    *,
+    cfg: Optional[Config] = None,
+    llm: Optional[OpenAIClient] = None,
+    mcp: Optional[MCPManager] = None,
+    on_turn: Optional[Callable[[int, List[AgentState], RunLogger], None]] = None,
+    own_mcp: bool = True,
+    run_id: Optional[str] = None,
+    personas: Optional[Dict[str, str]] = None,
+    on_event: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> Dict[str, Any]:
     """Run the orchestrator with a given world/scenario prompt.
     
     Args:
         world_prompt: The scenario/world context to use. Defaults to HELLO_TICKET_WORLD.
+        cfg: Configuration to use instead of loading it from the environment.
+        llm: Client to use instead of an `OpenAIClient` built from `cfg.openai`.
+        mcp: Manager to use instead of one built from `cfg.mcp`; it is still
+            connected and closed by this run unless `own_mcp` is False.
+        on_turn: Called after each turn is logged with (turn number, all agents, logger).
+        own_mcp: False when `mcp` is already connected and shared with other runs;
+            it is then left open, and its pool and cache stats cover every run.
+        run_id: Appended to the log file name so concurrent runs get separate logs.
+        personas: Agent name -> persona, replacing the team chosen from the world prompt.
+        on_event: Called with every run-log record as it is written.
+
+    Returns:
+        A summary of the run: log path, outcome, turns and input tokens.
     """
-    cfg = load_config()
+    cfg = cfg or load_config()
     
     # Determine if this is a 4-agent scenario (tool integration) or 2-agent scenario
     is_four_agent = world_prompt == TOOL_INTEGRATION_WORLD
     
-    if is_four_agent:
+    if personas:
+        # A caller-supplied team
+        agent_personas = dict(personas)
+        composed_prompts = {name: build_agent_prompt(world_prompt, persona) for name, persona in personas.items()}
+    elif is_four_agent:
         # 4-agent team: Alex, Sam, Jordan, Taylor
         alex_prompt = build_agent_prompt(world_prompt, ALEX_OPERATIONS_PERSONA)
         sam_prompt = build_agent_prompt(world_prompt, SAM_ENGINEERING_PERSONA)
@@ -107,115 +183,350 @@ async def main(world_prompt: str = HELLO_TICKET_WORLD) -> None:
     # Extract scenario name for log filename
     scenario_name = extract_scenario_name(world_prompt)
     
-    logger = RunLogger(cfg.run.log_dir, run_signature=run_signature, scenario_name=scenario_name)
-    mcp = MCPManager(cfg.mcp)
-    llm = OpenAIClient(cfg.openai)
+    logger = RunLogger(
+        cfg.run.log_dir, run_signature=run_signature, scenario_name=scenario_name, run_id=run_id, on_record=on_event
+    )
+    mcp = mcp or MCPManager(cfg.mcp)
+    llm = llm or OpenAIClient(cfg.openai)
 
     console.print("[bold cyan]Connecting to MCP servers...[/]")
     try:
-        tools = await mcp.connect_all()
+        tools = await mcp.connect_all() if own_mcp else mcp.available_tools()
+        for namespace, error in mcp.startup_errors.items():
+            console.print(f"[red]{namespace} failed to start: {error}[/]")
+        token_counter = TokenCounter(cfg.run.token_count_mode, cfg.openai.model)
+        if token_counter.fallback_reason:
+            console.print(f"[yellow]Exact token counting unavailable ({token_counter.fallback_reason}); using approx[/]")
         logger.log_event(
             "tools_discovered",
-            {"tools": [tool.fq_name for tool in tools]},
+            {
+                "tools": [tool.fq_name for tool in tools],
+                "tool_tokens": token_counter.count_tools(mcp.openai_tools()),
+                "tools_hash": mcp.tools_hash(),
+                "token_count_mode": token_counter.mode,
+            },
         )
 
         console.print("[green]Connected. Available tools:[/]")
         for tool in tools:
             console.print(f"  • {tool.describe()}")
 
-        console.print("[bold cyan]Performing health probes...[/]")
-        health = await mcp.health_probe()
-        for name, result in health.items():
-            console.print(f"  {name}: {result}")
-        logger.log_event("health_probe", {"results": health})
-
-        # Create agents based on configuration
-        if is_four_agent:
-            alex = AgentState("alex", _build_prompt(alex_prompt, tools))
-            sam = AgentState("sam", _build_prompt(sam_prompt, tools))
-            jordan = AgentState("jordan", _build_prompt(jordan_prompt, tools))
-            taylor = AgentState("taylor", _build_prompt(taylor_prompt, tools))
-            agents = [alex, sam, jordan, taylor]
-            num_agents = 4
-        else:
-            planner = AgentState("planner", _build_prompt(composed_prompts["planner"], tools))
-            engineer = AgentState("engineer", _build_prompt(composed_prompts["engineer"], tools))
-            agents = [planner, engineer]
-            num_agents = 2
-
-        for turn in range(cfg.run.max_turns):
-            active = agents[turn % num_agents]
-            # Get all teammates (everyone except active agent)
-            teammates = [a for a in agents if a != active]
-            
-            console.print(f"\n[bold magenta]Turn {turn + 1} — {active.name.capitalize()}[/]")
-            
-            # Check if this is a reflection turn
-            should_reflect = (turn + 1) % cfg.run.reflection_interval == 0
-            if should_reflect and turn > 0:  # Don't reflect on first turn
-                reflection_prompt = (
-                    "Take a moment to reflect: What has been accomplished? What are the next steps? "
-                    "IMPORTANT: If there's something assigned to you or identified as a next deliverable, "
-                    "STOP DISCUSSING and CREATE IT NOW using the tools in this turn. The team values "
-                    "action over planning. Show progress through actual artifacts, not promises."
-                )
-                active.receive(reflection_prompt)
-                console.print(f"[yellow]↻ Action-focused reflection prompt injected[/]")
-
-            message, tool_calls, tool_outputs, usage = await _drive_agent_turn(
-                active,
-                teammates,
-                llm,
-                mcp,
-                max_tool_rounds=cfg.run.max_tool_rounds,
+        if own_mcp:
+            # A shared manager is probed once by whoever connected it, not per run
+            startup = await probe_servers(mcp)
+            logger.log_event("health_probe", {"results": startup["probes"]})
+            logger.log_event("startup_profile", startup["startup_profile"])
+
+        if cfg.run.prompt_cache:
+            # Same tool listing in the system prompt whatever order servers report
+            tools = sorted(tools, key=lambda tool: tool.fq_name)
+
+        # Create agents based on configuration (4-agent: alex, sam, jordan, taylor;
+        # 2-agent: planner, engineer); system prompts follow once tool subsets are known
+        agents = [AgentState(name, "") for name in composed_prompts]
+
+        tool_selector = None
+        if cfg.run.tool_subset_size > 0:
+            tool_selector = ToolSelector(
+                mcp.available_tools(), cfg.run.tool_subset_size, version=mcp.tools_version
+            )
+            subsets: Dict[str, Any] = {}
+            for agent in agents:
+                subset = tool_selector.assign(agent, agent_personas[agent.name])
+                subsets[agent.name] = {
+                    "tools": list(subset),
+                    "tool_tokens": token_counter.count_tools(mcp.openai_tools(names=subset)),
+                }
+            logger.log_event(
+                "tool_subsets",
+                {"tool_tokens_all": token_counter.count_tools(mcp.openai_tools()), "agents": subsets},
             )
 
-            logger.log_turn(
-                turn_index=turn + 1,
-                agent=active.name,
-                message=message,
-                tool_calls=tool_calls,
-                tool_outputs=tool_outputs,
-                usage=usage,
+        # Each prompt lists only the agent's own tools; the rest are left to discovery
+        prompt_tool_mode = cfg.run.prompt_tool_mode
+        discoverable = tool_selector is not None
+        agent_tools = {agent.name: _subset_tools(tools, agent.tool_subset) for agent in agents}
+        for agent in agents:
+            agent.system_prompt = _build_prompt(
+                composed_prompts[agent.name], agent_tools[agent.name], prompt_tool_mode, discoverable
             )
+        logger.log_event(
+            "prompt_tool_tokens",
+            _prompt_tool_tokens(
+                composed_prompts,
+                agent_tools,
+                prompt_tool_mode,
+                token_counter,
+                {agent.name: mcp.openai_tools(names=agent.tool_subset) for agent in agents},
+                discoverable,
+            ),
+        )
 
-            # If a finish tool was invoked, end the run immediately
-            if message == "__RUN_FINISHED__":
-                console.print("\n[bold green]Run finished by agent.[/]")
-                break
+        compactor = None
+        if cfg.run.context_token_budget > 0 and cfg.run.prompt_cache:
+            # Compaction rewrites history, which would invalidate the cached prefix
+            console.print("[yellow]PROMPT_CACHE keeps history append-only; context compaction is disabled[/]")
+        elif cfg.run.context_token_budget > 0:
+            compactor = ContextCompactor(
+                cfg.run.context_token_budget,
+                mode=cfg.run.compaction_mode,
+                keep_recent=cfg.run.compaction_keep_recent,
+                counter=token_counter,
+            )
+        reasoning_keep = cfg.run.reasoning_keep if cfg.run.reasoning_keep >= 0 else None
+        if reasoning_keep is not None and cfg.run.prompt_cache:
+            console.print("[yellow]PROMPT_CACHE keeps history append-only; reasoning pruning is disabled[/]")
+            reasoning_keep = None
+        output_store = None
+        if cfg.run.tool_output_spill_chars > 0:
+            output_store = OutputStore(cfg.run.tool_output_spill_chars, cfg.run.tool_output_preview_chars)
+
+        # Broadcasts are stored once and read lazily by each teammate
+        event_log = SharedEventLog(digest_chars=cfg.run.team_digest_chars)
+        for agent in agents:
+            agent.token_counter = token_counter
+            agent.compactor = compactor
+            agent.event_log = event_log
+            agent.reasoning_keep = reasoning_keep
+
+        if cfg.run.prompt_cache:
+            logger.log_event(
+                "prompt_prefix",
+                {
+                    "agents": {
+                        agent.name: _prefix_fingerprint(
+                            agent,
+                            mcp.openai_tools(
+                                canonical=True, names=agent.tool_subset, extra_tools=_run_tools(output_store)
+                            ),
+                        )
+                        for agent in agents
+                    }
+                },
+            )
 
-            activity = bool(tool_calls) or bool(message and message.strip())
-            if activity:
-                active.reset_stale()
-            else:
-                active.increment_stale()
+        scheduler = make_scheduler(cfg.run.turn_scheduler)
+        outcome = "max_turns"
+        turn = 0
+        while turn < cfg.run.max_turns:
+            # Up to `concurrent_turns` distinct agents take their turns at the same time
+            batch = scheduler.next_batch(turn, agents, min(cfg.run.concurrent_turns, cfg.run.max_turns - turn))
+            if not batch:
+                console.print("\n[yellow]No agent has anything to react to. Stopping.[/]")
+                outcome = "idle"
+                break
 
-            if active.stale_turns >= cfg.run.stale_turn_limit:
-                console.print(
-                    f"[yellow]{active.name} reached stale limit ({cfg.run.stale_turn_limit}). Stopping.[/]"
+            for offset, active in enumerate(batch):
+                console.print(f"\n[bold magenta]Turn {turn + offset + 1} — {active.name.capitalize()}[/]")
+                # Catch up on teammate broadcasts before anything else is appended
+                active.sync_events()
+
+                # Check if this is a reflection turn
+                should_reflect = (turn + offset + 1) % cfg.run.reflection_interval == 0
+                if should_reflect and turn + offset > 0:  # Don't reflect on first turn
+                    reflection_prompt = (
+                        "Take a moment to reflect: What has been accomplished? What are the next steps? "
+                        "IMPORTANT: If there's something assigned to you or identified as a next deliverable, "
+                        "STOP DISCUSSING and CREATE IT NOW using the tools in this turn. The team values "
+                        "action over planning. Show progress through actual artifacts, not promises."
+                    )
+                    active.receive(reflection_prompt)
+                    console.print(f"[yellow]↻ Action-focused reflection prompt injected[/]")
+
+            batch_timings: List[List[Dict[str, Any]]] = [[] for _ in batch]
+            if len(batch) > 1:
+                # Batch-mates see each other's broadcasts only after the barrier
+                event_log.hold()
+            turns = [
+                asyncio.ensure_future(
+                    _drive_agent_turn(
+                        active,
+                        [a for a in agents if a is not active],
+                        llm,
+                        mcp,
+                        max_tool_rounds=cfg.run.max_tool_rounds,
+                        parallel_tool_calls=cfg.run.parallel_tool_calls,
+                        stream=cfg.run.stream_responses,
+                        chain_responses=cfg.run.chain_responses,
+                        prompt_cache_key=f"{scenario_name}:{active.name}" if cfg.run.prompt_cache else None,
+                        round_timings=round_timings,
+                        tool_selector=tool_selector,
+                        output_store=output_store,
+                    )
                 )
+                for active, round_timings in zip(batch, batch_timings)
+            ]
+            try:
+                results = await asyncio.gather(*turns)
+            except BaseException:
+                # One turn failed (or the run was cancelled): stop its batch-mates before
+                # the sessions and the log are closed under them
+                for task in turns:
+                    task.cancel()
+                await asyncio.gather(*turns, return_exceptions=True)
+                raise
+            finally:
+                event_log.release([active.name for active in batch])
+
+            # Log and check each turn in scheduled order, whichever finished first
+            finished = stale = False
+            for offset, (active, round_timings, result) in enumerate(zip(batch, batch_timings, results)):
+                message, tool_calls, tool_outputs, usage = result
+                logger.log_turn(
+                    turn_index=turn + offset + 1,
+                    agent=active.name,
+                    message=message,
+                    tool_calls=tool_calls,
+                    tool_outputs=tool_outputs,
+                    usage=usage,
+                    rounds=round_timings,
+                )
+                scheduler.record(active, tool_calls, message)
+                if on_turn:
+                    on_turn(turn + offset + 1, agents, logger)
+
+                # If a finish tool was invoked, end the run once the batch is logged
+                if message == "__RUN_FINISHED__":
+                    finished = True
+                    continue
+
+                activity = bool(tool_calls) or bool(message and message.strip())
+                if activity:
+                    active.reset_stale()
+                else:
+                    active.increment_stale()
+
+                if active.stale_turns >= cfg.run.stale_turn_limit:
+                    console.print(
+                        f"[yellow]{active.name} reached stale limit ({cfg.run.stale_turn_limit}). Stopping.[/]"
+                    )
+                    stale = True
+            if finished:
+                console.print("\n[bold green]Run finished by agent.[/]")
+            if finished or stale:
+                outcome = "finished" if finished else "stale"
                 break
+            turn += len(batch)
 
         console.print("\n[bold green]Run complete.[/]")
+        logger.log_event("pool_utilization", {"namespaces": mcp.pool_utilization()})
+        logger.log_event("single_flight_stats", mcp.single_flight_stats())
+        logger.log_event("tool_refresh_stats", mcp.tool_refresh_stats())
+        cassette_stats = llm.cassette_stats()
+        if cassette_stats is not None:
+            logger.log_event("cassette_stats", cassette_stats)
+        if compactor is not None:
+            logger.log_event("compaction_stats", compactor.stats(agents))
+        if tool_selector is not None:
+            logger.log_event("tool_selection_stats", tool_selector.stats(agents))
+        logger.log_event("event_log_stats", event_log.stats())
+        logger.log_event("scheduler_stats", scheduler.stats())
+        if output_store is not None:
+            logger.log_event("output_store_stats", output_store.stats())
+        if reasoning_keep is not None:
+            logger.log_event(
+                "reasoning_prune_stats",
+                {"keep": reasoning_keep, "agents": {agent.name: agent.reasoning_pruned for agent in agents}},
+            )
+        logger.log_event("prompt_cache_stats", logger.prompt_cache_stats())
+        cache_stats = mcp.cache_stats()
+        if cache_stats is not None:
+            logger.log_event("tool_cache_stats", cache_stats)
+        run_tokens = logger.prompt_cache_stats()["run"]
+        return {
+            "log_path": str(logger.path),
+            "outcome": outcome,
+            "turns": logger.turns,
+            "input_tokens": run_tokens["input_tokens"],
+            "cached_tokens": run_tokens["cached_tokens"],
+        }
     finally:
-        try:
-            await mcp.close()
-        except asyncio.CancelledError:
-            pass
+        if own_mcp:
+            try:
+                await mcp.close()
+            except asyncio.CancelledError:
+                pass
         logger.close()
 
 
-def _build_prompt(base_prompt: str, tools: List[NamespacedTool]) -> str:
-    tool_text = "\n".join(tool.describe() for tool in tools)
+PROMPT_TOOL_MODES = ("full", "index", "none")
+
+
+def _subset_tools(tools: List[NamespacedTool], subset: Optional[List[str]]) -> List[NamespacedTool]:
+    """The tools in an agent's subset (OpenAI names), or all of them without one."""
+    if subset is None:
+        return list(tools)
+    names = set(subset)
+    return [tool for tool in tools if tool.fq_name.replace(".", "__") in names]
+
+
+def _build_prompt(
+    base_prompt: str, tools: List[NamespacedTool], mode: str = "full", discoverable: bool = False
+) -> str:
+    """Compose a system prompt; `mode` controls how much of the tool catalogue it repeats.
+
+    "full" lists every tool with its description, "index" only the tool names per
+    namespace, and "none" leaves the catalogue to the function definitions sent
+    with each request. `discoverable` means `tools` is a subset and the rest can be
+    found with `orchestrator__discover_tools`.
+    """
+    if mode == "full":
+        tool_text = "Available MCP tools:\n" + "\n".join(tool.describe() for tool in tools) + "\n"
+    elif mode == "index":
+        names: Dict[str, List[str]] = {}
+        for tool in tools:
+            names.setdefault(tool.namespace, []).append(tool.definition.name)
+        tool_text = "Available MCP tools (descriptions and parameters are in the function definitions):\n"
+        tool_text += "".join(f"- {namespace}: {', '.join(tool_names)}\n" for namespace, tool_names in names.items())
+    elif mode == "none":
+        tool_text = ""
+    else:
+        raise ValueError(f"Unknown prompt tool mode '{mode}' (expected one of {PROMPT_TOOL_MODES})")
+    if discoverable:
+        tool_text += (
+            f"More tools exist than you are offered; call {DISCOVER_TOOL['name']} with a short "
+            "description of what you need to find and unlock them.\n"
+        )
     return (
         f"{base_prompt}\n\n"
-        "Available MCP tools:\n"
-        f"{tool_text}\n"
+        f"{tool_text}"
         "Tools are provided as callable functions; use them when needed.\n"
         "If no tool is needed, reply with concise natural language."
     )
 
 
+def _prompt_tool_tokens(
+    composed_prompts: Dict[str, str],
+    tools: Dict[str, List[NamespacedTool]],
+    mode: str,
+    counter: TokenCounter,
+    oi_tools: Dict[str, List[dict]],
+    discoverable: bool = False,
+) -> Dict[str, Any]:
+    """Fixed input tokens per request (system prompt plus tool definitions), in "full"
+    mode and in `mode`, so the saving from not repeating the catalogue is on record.
+
+    `tools` and `oi_tools` are each agent's own tools and function definitions.
+    """
+    agents: Dict[str, Dict[str, int]] = {}
+    for name, prompt in composed_prompts.items():
+        tool_tokens = counter.count_tools(oi_tools[name])
+        full = counter.count_item(
+            {"role": "system", "content": _build_prompt(prompt, tools[name], "full", discoverable)}
+        )
+        current = counter.count_item(
+            {"role": "system", "content": _build_prompt(prompt, tools[name], mode, discoverable)}
+        )
+        agents[name] = {
+            "tools": len(tools[name]),
+            "tool_tokens": tool_tokens,
+            "request_tokens_full": full + tool_tokens,
+            "request_tokens": current + tool_tokens,
+            "saved_per_request": full - current,
+        }
+    return {"mode": mode, "token_count_mode": counter.mode, "agents": agents}
+
+
 async def _drive_agent_turn(
     agent: AgentState,
     teammates: List[AgentState],
@@ -223,35 +534,155 @@ async def _drive_agent_turn(
     mcp: MCPManager,
     *,
     max_tool_rounds: int,
+    parallel_tool_calls: bool = False,
+    stream: bool = False,
+    chain_responses: bool = False,
+    prompt_cache_key: Optional[str] = None,
+    round_timings: Optional[List[Dict[str, Any]]] = None,
+    tool_selector: Optional[ToolSelector] = None,
+    output_store: Optional[OutputStore] = None,
 ):
     accumulated_tool_calls: List[ToolCall] = []
     tool_outputs: List[dict] = []
     usage = None
+    oi_tools: Optional[List[dict]] = None
+    offered: Optional[int] = None
 
-    # Convert MCP tools to OpenAI tools once per turn
-    oi_tools = mcp.openai_tools()
-
-    inputs = agent.build_inputs()
     rounds = 0
     while rounds < max_tool_rounds:
         rounds += 1
-        response = await llm.respond_with_tools(
-            inputs,
-            tools=oi_tools,
-            parallel_tool_calls=False,
-            tool_choice="auto",
-        )
+        if tool_selector is not None and tool_selector.version != mcp.tools_version:
+            tool_selector.reindex(mcp.available_tools(), mcp.tools_version)
+        # Tool definitions are cached by the manager per tool-list version; they are
+        # picked up once per turn and again only when the agent's subset grows. A
+        # prompt cache key asks for the canonical (byte-stable) form so every request
+        # shares the same prefix
+        subset_size = len(agent.tool_subset) if agent.tool_subset is not None else None
+        if oi_tools is None or subset_size != offered:
+            offered = subset_size
+            oi_tools = mcp.openai_tools(
+                canonical=bool(prompt_cache_key), names=agent.tool_subset, extra_tools=_run_tools(output_store)
+            )
+            tool_tokens = agent.token_counter.count_tools(oi_tools) if agent.token_counter else 0
+        # Rebuilt every round: compaction may rewrite the history on any append
+        inputs = agent.build_inputs()
+        round_started = time.perf_counter()
+        timings: Dict[str, Any] = {"round": rounds}
+        if round_timings is not None:
+            round_timings.append(timings)
+        # Started tool calls by call_id; with streaming they begin before the response ends
+        dispatched: Dict[str, asyncio.Future] = {}
+        # Without parallel tool calls, calls still run one at a time in call order
+        serial = None if parallel_tool_calls else asyncio.Lock()
+
+        async def _call(fq: str, arguments: Any):
+            if serial is None:
+                return await _run_tool(agent, mcp, tool_selector, output_store, fq, arguments)
+            async with serial:
+                return await _run_tool(agent, mcp, tool_selector, output_store, fq, arguments)
+
+        def _dispatch(fq: str, arguments: Any) -> asyncio.Future:
+            timings.setdefault("first_dispatch_s", round(time.perf_counter() - round_started, 4))
+            console.print(f"[blue]→ {fq} {arguments}[/]")
+            return asyncio.ensure_future(_call(fq, arguments))
+
+        streamed_text = False
+        finish_seen = False
+
+        def _on_text_delta(delta: str) -> None:
+            nonlocal streamed_text
+            if not streamed_text:
+                console.print(f"[cyan]{agent.name}:[/] ", end="")
+                streamed_text = True
+            console.print(delta, end="", markup=False, highlight=False)
+
+        def _on_output_item(item: Any) -> None:
+            # Start each MCP call as soon as its function_call item is complete
+            nonlocal finish_seen
+            if finish_seen or getattr(item, "type", None) != "function_call":
+                return
+            name, fq, arguments, call_id = _parse_function_call(item, mcp)
+            if _is_finish_call(name, fq):
+                finish_seen = True
+            elif call_id and call_id not in dispatched:
+                dispatched[call_id] = _dispatch(fq, arguments)
+
+        request: Dict[str, Any] = {}
+        llm_timings: Dict[str, float] = {}
+        if stream:
+            request.update(
+                on_text_delta=_on_text_delta, on_output_item=_on_output_item, timings=llm_timings
+            )
+        if prompt_cache_key:
+            request["prompt_cache_key"] = prompt_cache_key
+        # With chaining, send only what the server has not seen yet
+        request_inputs = inputs
+        if chain_responses and agent.last_response_id:
+            request_inputs = agent.pending_inputs()
+            request["previous_response_id"] = agent.last_response_id
+            timings["saved_bytes"] = agent.chain_bytes
+        sent_bytes = _payload_bytes(request_inputs) if chain_responses else 0
+        if agent.token_counter is not None:
+            # Known before sending: what the request will cost in input tokens
+            timings["estimated_input_tokens"] = agent.total_tokens() + tool_tokens
+        if agent.compactor is not None:
+            # Saved since this agent's previous request; run totals are in compaction_stats
+            timings["tokens_saved"] = agent.tokens_saved - agent.tokens_saved_logged
+            agent.tokens_saved_logged = agent.tokens_saved
+
+        try:
+            try:
+                response = await llm.respond_with_tools(
+                    request_inputs,
+                    tools=oi_tools,
+                    parallel_tool_calls=parallel_tool_calls,
+                    tool_choice="auto",
+                    **request,
+                )
+            except ResponseChainError as exc:
+                console.print(f"[yellow]Response chain lost ({exc}); resending full history[/]")
+                agent.reset_chain()
+                request.pop("previous_response_id")
+                timings["chain_lost"] = True
+                timings["saved_bytes"] = 0
+                sent_bytes = _payload_bytes(inputs)
+                response = await llm.respond_with_tools(
+                    inputs,
+                    tools=oi_tools,
+                    parallel_tool_calls=parallel_tool_calls,
+                    tool_choice="auto",
+                    **request,
+                )
+        except BaseException:
+            for task in dispatched.values():
+                task.cancel()
+            raise
+        if streamed_text:
+            console.print()
+        if "ttft_s" in llm_timings:
+            timings["ttft_s"] = round(llm_timings["ttft_s"], 4)
+        if chain_responses:
+            timings["sent_bytes"] = sent_bytes
+        timings["response_s"] = round(time.perf_counter() - round_started, 4)
 
         usage = getattr(response, "usage", None)
+        if getattr(usage, "input_tokens", None) is not None:
+            timings["input_tokens"] = usage.input_tokens
+            details = getattr(usage, "input_tokens_details", None)
+            timings["cached_tokens"] = getattr(details, "cached_tokens", None) or 0
 
         # Persist raw output items (reasoning/function_call/message) to agent
         try:
             output_items = list(response.output)
         except Exception:
             output_items = []
+        compactions = agent.compactions
         if output_items:
             agent.add_output_items(output_items)
-            inputs.extend(output_items)
+        if chain_responses and agent.compactions == compactions:
+            agent.advance_chain(
+                getattr(response, "id", None), sent_bytes + _payload_bytes(output_items)
+            )
 
         # Collect function calls
         tool_calls = []
@@ -263,103 +694,203 @@ async def _drive_agent_turn(
             # No tool calls, extract natural language if present
             natural_text = _extract_message_text(response)
             if natural_text:
-                console.print(f"[cyan]{agent.name}:[/] {natural_text}")
+                if not streamed_text:
+                    console.print(f"[cyan]{agent.name}:[/] {natural_text}")
                 # Output message already persisted via add_output_items; broadcast to all teammates
-                for teammate in teammates:
-                    teammate.receive(f"{agent.name}: {natural_text}")
+                agent.broadcast(f"{agent.name}: {natural_text}", teammates)
+            timings["round_s"] = round(time.perf_counter() - round_started, 4)
             return natural_text, accumulated_tool_calls, tool_outputs, usage
 
-        # Execute each tool call serially
-        for fc in tool_calls:
-            name = getattr(fc, "name", "")
-            args_json = getattr(fc, "arguments", "{}")
-            call_id = getattr(fc, "call_id", None)
+        calls = [_parse_function_call(fc, mcp) for fc in tool_calls]
+        # Calls after a finish call are never executed, matching serial semantics
+        finish_at = next(
+            (i for i, (name, fq, _, _) in enumerate(calls) if _is_finish_call(name, fq)),
+            len(calls),
+        )
+        runnable = calls[:finish_at]
+
+        if dispatched or (parallel_tool_calls and len(runnable) > 1):
+            # Execute concurrently (bounded per namespace by MCPManager), then
+            # record results in call order so history stays deterministic
+            tasks = [
+                dispatched.pop(call_id, None) or _dispatch(fq, arguments)
+                for _, fq, arguments, call_id in runnable
+            ]
+            for task in dispatched.values():
+                task.cancel()
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+            for (_, fq, arguments, call_id), result in zip(runnable, results):
+                if isinstance(result, BaseException) and not isinstance(result, Exception):
+                    raise result
+                _record_tool_result(
+                    agent, teammates, accumulated_tool_calls, tool_outputs,
+                    fq, arguments, call_id, result, output_store,
+                )
+        else:
+            # Execute each tool call serially
+            for _, fq, arguments, call_id in runnable:
+                timings.setdefault("first_dispatch_s", round(time.perf_counter() - round_started, 4))
+                console.print(f"[blue]→ {fq} {arguments}[/]")
+                try:
+                    result = await _run_tool(agent, mcp, tool_selector, output_store, fq, arguments)
+                except Exception as exc:  # noqa: BLE001
+                    result = exc
+                _record_tool_result(
+                    agent, teammates, accumulated_tool_calls, tool_outputs,
+                    fq, arguments, call_id, result, output_store,
+                )
+        timings["round_s"] = round(time.perf_counter() - round_started, 4)
 
-            try:
-                fq = mcp.resolve_openai_tool_name(name)
-            except KeyError:
-                fq = name  # fallback
+        if finish_at < len(calls):
+            # Handle synthetic finish tool locally
+            _, _, arguments, call_id = calls[finish_at]
+            summary = arguments.get("summary", "Run finished.") if isinstance(arguments, dict) else "Run finished."
+            console.print(f"[green]↳ Finish:[/] {summary}")
+            if call_id:
+                agent.add_function_output(call_id, "finished")
+            # Log as a tool call/output for consistency
+            accumulated_tool_calls.append(ToolCall(name="orchestrator.finish", arguments=arguments if isinstance(arguments, dict) else {}))
+            tool_outputs.append({"name": "orchestrator.finish", "arguments": arguments, "output": "finished"})
+            # Notify all teammates with concise summary
+            agent.broadcast(
+                f"{agent.name} finished: {summary}", teammates, kind="finish", details={"summary": summary}
+            )
+            return "__RUN_FINISHED__", accumulated_tool_calls, tool_outputs, usage
 
-            try:
-                import json as _json
+    console.print(
+        "[red]Max tool rounds reached without natural response; handing over turn.[/]"
+    )
+    return "", accumulated_tool_calls, tool_outputs, usage
 
-                arguments = _json.loads(args_json) if isinstance(args_json, str) else (args_json or {})
-            except Exception:
-                arguments = {}
 
-            # Handle synthetic finish tool locally
-            if name in ("orchestrator__finish",) or fq in ("orchestrator.finish",):
-                summary = arguments.get("summary", "Run finished.") if isinstance(arguments, dict) else "Run finished."
-                console.print(f"[green]↳ Finish:[/] {summary}")
-                if call_id:
-                    agent.add_function_output(call_id, "finished")
-                    inputs.append({"type": "function_call_output", "call_id": call_id, "output": "finished"})
-                # Log as a tool call/output for consistency
-                accumulated_tool_calls.append(ToolCall(name="orchestrator.finish", arguments=arguments if isinstance(arguments, dict) else {}))
-                tool_outputs.append({"name": "orchestrator.finish", "arguments": arguments, "output": "finished"})
-                # Notify all teammates with concise summary
-                for teammate in teammates:
-                    teammate.receive(f"{agent.name} finished: {summary}")
-                return "__RUN_FINISHED__", accumulated_tool_calls, tool_outputs, usage
-
-            # Log to console
-            console.print(f"[blue]→ {fq} {arguments}[/]")
 
-            try:
-                rendered, raw = await mcp.call(fq, arguments)
-                console.print(
-                    f"[blue]← {rendered}[/]" if rendered else "[blue]← (no content)[/]"
-                )
-                tool_outputs.append(
-                    {"name": fq, "arguments": arguments, "output": rendered}
-                )
-                accumulated_tool_calls.append(
-                    ToolCall(name=fq, arguments=arguments)
-                )
-                # Provide tool output to the model
-                output_str = rendered if isinstance(rendered, str) else str(rendered)
-                if call_id:
-                    agent.add_function_output(call_id, output_str)
-                    inputs.append(
-                        {
-                            "type": "function_call_output",
-                            "call_id": call_id,
-                            "output": output_str,
-                        }
-                    )
-                # Send a short summary to all teammates to keep them aware
-                summary = (output_str or "(no content)").strip()
-                summary = " ".join(summary.split())
-                for teammate in teammates:
-                    teammate.receive(
-                        f"{agent.name} tool {fq}: {summary[:400]}"
-                    )
-            except Exception as exc:  # noqa: BLE001
-                error_message = f"[tool-error:{fq}] {exc}"
-                console.print(f"[red]{error_message}[/]")
-                tool_outputs.append(
-                    {
-                        "name": fq,
-                        "arguments": arguments,
-                        "error": str(exc),
-                    }
-                )
-                if call_id:
-                    agent.add_function_output(call_id, str(exc))
-                    inputs.append(
-                        {
-                            "type": "function_call_output",
-                            "call_id": call_id,
-                            "output": str(exc),
-                        }
-                    )
-                for teammate in teammates:
-                    teammate.receive(f"{agent.name} tool {fq} failed: {exc}")
+def _prefix_fingerprint(agent: AgentState, tools: List[dict]) -> Dict[str, Any]:
+    """Hash of the cacheable prefix (tools + system prompt); equal hashes mean equal bytes."""
+    prefix = json.dumps([tools, agent.system_prompt], ensure_ascii=False)
+    fingerprint: Dict[str, Any] = {"sha256": hashlib.sha256(prefix.encode("utf-8")).hexdigest()[:16]}
+    if agent.token_counter is not None:
+        fingerprint["tokens"] = agent.total_tokens() + agent.token_counter.count_tools(tools)
+    return fingerprint
+
+
+def _payload_bytes(items: List[Any]) -> int:
+    """Serialized size of request items, as uploaded."""
+    return len(json.dumps(to_jsonable(items), ensure_ascii=False, default=str).encode("utf-8"))
 
+
+def _parse_function_call(fc, mcp: MCPManager) -> Tuple[str, str, Any, Optional[str]]:
+    """Return (openai name, fq name, decoded arguments, call_id) for a function_call item."""
+    name = getattr(fc, "name", "")
+    args_json = getattr(fc, "arguments", "{}")
+    call_id = getattr(fc, "call_id", None)
+
+    try:
+        fq = mcp.resolve_openai_tool_name(name)
+    except KeyError:
+        fq = name  # fallback
+
+    try:
+        arguments = json.loads(args_json) if isinstance(args_json, str) else (args_json or {})
+    except Exception:
+        arguments = {}
+    return name, fq, arguments, call_id
+
+
+def _run_tools(output_store: Optional[OutputStore]) -> Tuple[dict, ...]:
+    """Synthetic tools this run answers on top of the manager's (which runs may share)."""
+    return (READ_OUTPUT_TOOL,) if output_store is not None else ()
+
+
+async def _run_tool(
+    agent: AgentState,
+    mcp: MCPManager,
+    tool_selector: Optional[ToolSelector],
+    output_store: Optional[OutputStore],
+    fq: str,
+    arguments: Any,
+) -> Tuple[str, Any]:
+    """Run one tool call: tool discovery and output paging are answered locally,
+    everything else by MCP.
+
+    Tools outside the agent's subset still resolve and run; the subset only limits
+    which definitions are sent.
+    """
+    if fq == "orchestrator.discover_tools" and tool_selector is not None:
+        return tool_selector.discover(agent, arguments), None
+    if fq == "orchestrator.read_output":
+        if output_store is None:
+            return "No tool outputs are stored in this run.", None
+        return output_store.read(arguments), None
+    return await mcp.call(fq, arguments)
+
+
+def _is_finish_call(name: str, fq: str) -> bool:
+    return name in ("orchestrator__finish",) or fq in ("orchestrator.finish",)
+
+
+def _record_tool_result(
+    agent: AgentState,
+    teammates: List[AgentState],
+    accumulated_tool_calls: List[ToolCall],
+    tool_outputs: List[dict],
+    fq: str,
+    arguments: Any,
+    call_id: Optional[str],
+    result: Union[Tuple[str, Any], Exception],
+    output_store: Optional[OutputStore] = None,
+) -> None:
+    """Feed one tool result (or failure) back to the agent and its teammates.
+
+    MCP outputs over the spill threshold reach the agent and teammates as a preview
+    with a handle for `orchestrator.read_output`; the run log keeps the full text.
+    """
+    if isinstance(result, Exception):
+        exc = result
+        error_message = f"[tool-error:{fq}] {exc}"
+        console.print(f"[red]{error_message}[/]")
+        tool_outputs.append(
+            {
+                "name": fq,
+                "arguments": arguments,
+                "error": str(exc),
+            }
+        )
+        if call_id:
+            agent.add_function_output(call_id, str(exc))
+        agent.broadcast(
+            f"{agent.name} tool {fq} failed: {exc}",
+            teammates,
+            kind="tool_error",
+            details={"tool": fq, "arguments": arguments, "error": str(exc)},
+        )
+        return
+
+    rendered, _raw = result
+    logged: Dict[str, Any] = {"name": fq, "arguments": arguments, "output": rendered}
+    output_str = rendered if isinstance(rendered, str) else str(rendered)
+    if output_store is not None and isinstance(rendered, str) and not fq.startswith("orchestrator."):
+        output_str = output_store.spill(rendered)
+        if output_str is not rendered:
+            logged["output_handle"] = output_store.handle_for(rendered)
     console.print(
-        "[red]Max tool rounds reached without natural response; handing over turn.[/]"
+        f"[blue]← {output_str}[/]" if output_str else "[blue]← (no content)[/]"
+    )
+    tool_outputs.append(logged)
+    accumulated_tool_calls.append(
+        ToolCall(name=fq, arguments=arguments)
+    )
+    # Provide tool output to the model
+    if call_id:
+        agent.add_function_output(call_id, output_str)
+    # Send a short summary to all teammates to keep them aware
+    summary = (output_str or "(no content)").strip()
+    summary = " ".join(summary.split())
+    agent.broadcast(
+        f"{agent.name} tool {fq}: {summary[:400]}",
+        teammates,
+        kind="tool",
+        details={"tool": fq, "arguments": arguments, "output": output_str},
     )
-    return "", accumulated_tool_calls, tool_outputs, usage
 
 
 def _extract_message_text(response) -> str:
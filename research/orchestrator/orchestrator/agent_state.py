@@ -1,7 +1,14 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Any, Dict, List
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+from .items import FunctionCallItem, MessageItem, compact_item
+
+if TYPE_CHECKING:
+    from .compaction import ContextCompactor
+    from .event_log import SharedEventLog
+    from .tokens import TokenCounter
 
 
 Message = Dict[str, str]
@@ -14,6 +21,31 @@ class AgentState:
     # Mixed list: regular chat messages and Responses API items (e.g., function_call)
     inputs: List[Any] = field(default_factory=list)
     stale_turns: int = 0
+    # Server-side chaining: the last response id and how many `inputs` it already holds
+    last_response_id: Optional[str] = None
+    chain_cursor: int = 0
+    chain_bytes: int = 0
+    # Token accounting: tokens per item of `inputs`, kept current on every append
+    token_counter: Optional["TokenCounter"] = field(default=None, repr=False)
+    item_tokens: List[int] = field(default_factory=list, repr=False)
+    history_tokens: int = 0
+    system_tokens: Optional[int] = None
+    # Compaction state
+    compactor: Optional["ContextCompactor"] = field(default=None, repr=False)
+    context_summary: Optional[str] = None
+    tokens_saved: int = 0
+    # `tokens_saved` as of the previous request, so each request logs its own share
+    tokens_saved_logged: int = 0
+    compactions: int = 0
+    items_compacted: int = 0
+    # OpenAI names of the tools offered to this agent; None offers every tool
+    tool_subset: Optional[List[str]] = None
+    # Team broadcasts: a shared log and how far into it this agent has read
+    event_log: Optional["SharedEventLog"] = field(default=None, repr=False)
+    event_cursor: int = 0
+    # Reasoning items kept in history (most recent first); None keeps them all
+    reasoning_keep: Optional[int] = None
+    reasoning_pruned: int = 0
 
     def build_messages(self) -> List[Message]:
         # Backwards compat for simple text-only completions
@@ -21,21 +53,78 @@ class AgentState:
 
     def build_inputs(self) -> List[Any]:
         """Return inputs suitable for the Responses API (mixed types)."""
+        self.sync_events()
         return [{"role": "system", "content": self.system_prompt}, *self.inputs]
 
+    def sync_events(self) -> None:
+        """Append teammate broadcasts logged since this agent last read the shared log."""
+        if self.event_log is None:
+            return
+        items, self.event_cursor = self.event_log.read(self.name, self.event_cursor)
+        if items:
+            self.inputs.extend(items)
+            self._appended()
+
+    def broadcast(
+        self,
+        content: str,
+        teammates: List["AgentState"],
+        *,
+        kind: str = "message",
+        details: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Tell every teammate `content`: once through the shared log if there is one.
+
+        `kind` and `details` describe the event for digests (see `SharedEvent`).
+        """
+        if self.event_log is not None:
+            self.event_log.append(self.name, content, kind=kind, details=details)
+            return
+        for teammate in teammates:
+            teammate.receive(content)
+
     def receive(self, content: str) -> None:
         """Append a user message (from the teammate)."""
         if content.strip():
             self.inputs.append({"role": "user", "content": content.strip()})
+            self._appended()
 
     def respond(self, content: str) -> None:
         if content.strip():
             self.inputs.append({"role": "assistant", "content": content.strip()})
+            self._appended()
 
     def add_output_items(self, items: List[Any]) -> None:
-        """Append raw response.output items (e.g., reasoning, function_call)."""
+        """Append response.output items (e.g., reasoning, function_call) in compact form."""
         if items:
-            self.inputs.extend(items)
+            self.inputs.extend(compact_item(item) for item in items)
+            self._appended()
+            if self.reasoning_keep is not None:
+                self.prune_reasoning(self.reasoning_keep)
+
+    def prune_reasoning(self, keep: int) -> int:
+        """Drop all but the `keep` most recent reasoning items; returns how many were dropped.
+
+        Calls and messages of a pruned response lose their item ids, since the API
+        rejects ids that point at a reasoning item it was not sent.
+        """
+        positions = [i for i, item in enumerate(self.inputs) if getattr(item, "type", None) == "reasoning"]
+        drop = set(positions[: max(0, len(positions) - keep)])
+        if not drop:
+            return 0
+        for index in drop:
+            following = index + 1
+            while following < len(self.inputs) and isinstance(self.inputs[following], (FunctionCallItem, MessageItem)):
+                self.inputs[following].id = None
+                following += 1
+        kept = [i for i in range(len(self.inputs)) if i not in drop]
+        if len(self.item_tokens) == len(self.inputs):
+            self.history_tokens -= sum(self.item_tokens[i] for i in drop)
+            self.item_tokens[:] = [self.item_tokens[i] for i in kept]
+        self.chain_cursor -= sum(1 for i in drop if i < self.chain_cursor)
+        self.inputs[:] = [self.inputs[i] for i in kept]
+        self.reasoning_pruned += len(drop)
+        return len(drop)
 
     def add_function_output(self, call_id: str, output: str) -> None:
         """Append a function_call_output item linked to a prior call_id."""
@@ -46,6 +135,48 @@ class AgentState:
                 "output": output,
             }
         )
+        self._appended()
+
+    def account_tokens(self) -> None:
+        """Count tokens of items appended since the last call."""
+        if self.token_counter is None:
+            return
+        for item in self.inputs[len(self.item_tokens):]:
+            tokens = self.token_counter.count_item(item)
+            self.item_tokens.append(tokens)
+            self.history_tokens += tokens
+
+    def total_tokens(self) -> int:
+        """Estimated input tokens of `build_inputs()` (system prompt plus history)."""
+        if self.token_counter is None:
+            return 0
+        if self.system_tokens is None:
+            self.system_tokens = self.token_counter.count_item(
+                {"role": "system", "content": self.system_prompt}
+            )
+        return self.system_tokens + self.history_tokens
+
+    def _appended(self) -> None:
+        if self.compactor is not None:
+            self.compactor.on_append(self)
+        else:
+            self.account_tokens()
+
+    def pending_inputs(self) -> List[Any]:
+        """Items added since the last chained response (teammate messages, tool outputs)."""
+        return self.inputs[self.chain_cursor:]
+
+    def advance_chain(self, response_id: Optional[str], sent_bytes: int) -> None:
+        """Record that the server now holds every current item under `response_id`."""
+        self.last_response_id = response_id
+        self.chain_cursor = len(self.inputs)
+        self.chain_bytes += sent_bytes
+
+    def reset_chain(self) -> None:
+        """Forget the server-side conversation; the next request resends everything."""
+        self.last_response_id = None
+        self.chain_cursor = 0
+        self.chain_bytes = 0
 
     def reset_stale(self) -> None:
         self.stale_turns = 0
@@ -0,0 +1,222 @@
+"""Record/replay of Responses API calls.
+
+A cassette is a file of gzip members, one JSON record per member, so it stays
+readable even if a run is interrupted. Input items and tool definitions are stored
+once as content-addressed blobs; each call record references them by hash. Since
+every request resends the whole history, this keeps cassettes roughly linear in run
+length instead of quadratic.
+"""
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .items import COMPACT_TYPES
+
+RECORD = "record"
+REPLAY = "replay"
+MODES = (RECORD, REPLAY)
+
+
+class CassetteMismatchError(RuntimeError):
+    """Raised in replay mode when a request was never recorded."""
+
+
+def to_jsonable(value: Any) -> Any:
+    """Convert SDK objects (pydantic models) nested in request payloads to JSON data."""
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json", exclude_none=True)
+    if isinstance(value, COMPACT_TYPES):
+        return value.to_wire()
+    if isinstance(value, dict):
+        return {str(k): to_jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_jsonable(v) for v in value]
+    return value
+
+
+def _canonical(value: Any) -> str:
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:32]
+
+
+class Cassette:
+    """Stores request/response pairs keyed by a stable hash of the request.
+
+    The key covers the endpoint, model, every input item, every tool definition and
+    all remaining parameters, so any change to prompts, history or tools is a miss.
+    """
+
+    def __init__(self, path: Path, mode: str) -> None:
+        if mode not in MODES:
+            raise ValueError(f"Unknown cassette mode '{mode}' (expected one of {MODES})")
+        self.path = Path(path)
+        self.mode = mode
+        self._blobs: Dict[str, Any] = {}
+        self._calls: List[Dict[str, Any]] = []
+        self._by_key: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self._served: Dict[str, int] = defaultdict(int)
+        self.stats = {"recorded": 0, "replayed": 0}
+
+        if mode == REPLAY:
+            self._load()
+        else:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.path.write_bytes(b"")
+
+    # ------------------------------------------------------------------ keys
+
+    def _split(self, endpoint: str, kwargs: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, str]]:
+        """Return the compact request (blob hashes instead of items) and new blobs."""
+        blobs: Dict[str, str] = {}
+
+        def _refs(items: Any) -> List[str]:
+            refs = []
+            for item in items or []:
+                text = _canonical(to_jsonable(item))
+                digest = _digest(text)
+                blobs[digest] = text
+                refs.append(digest)
+            return refs
+
+        params = {
+            k: to_jsonable(v) for k, v in kwargs.items() if k not in ("model", "input", "tools")
+        }
+        request = {
+            "endpoint": endpoint,
+            "model": kwargs.get("model"),
+            "params": params,
+            "input": _refs(kwargs.get("input")),
+            "tools": _refs(kwargs.get("tools")),
+        }
+        return request, blobs
+
+    @staticmethod
+    def _key(request: Dict[str, Any]) -> str:
+        return _digest(_canonical(request))
+
+    # ------------------------------------------------------------- recording
+
+    def record(
+        self,
+        endpoint: str,
+        kwargs: Dict[str, Any],
+        response: Any,
+        *,
+        temperature_rejected: bool = False,
+    ) -> None:
+        request, blobs = self._split(endpoint, kwargs)
+        records = [
+            {"t": "blob", "h": digest, "v": json.loads(text)}
+            for digest, text in blobs.items()
+            if digest not in self._blobs
+        ]
+        for record in records:
+            self._blobs[record["h"]] = record["v"]
+        call = {
+            "t": "call",
+            "seq": len(self._calls),
+            "key": self._key(request),
+            "request": request,
+            "response": response.model_dump(mode="json"),
+        }
+        if temperature_rejected:
+            call["temperature_rejected"] = True
+        self._calls.append(call)
+        records.append(call)
+        with self.path.open("ab") as fh:
+            for record in records:
+                fh.write(gzip.compress(json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n"))
+        self.stats["recorded"] += 1
+
+    # --------------------------------------------------------------- replay
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            raise FileNotFoundError(f"Cassette not found: {self.path}")
+        with gzip.open(self.path, "rt", encoding="utf-8") as fh:
+            for line in fh:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if record["t"] == "blob":
+                    self._blobs[record["h"]] = record["v"]
+                elif record["t"] == "call":
+                    self._calls.append(record)
+                    self._by_key[record["key"]].append(record)
+
+    def replay(self, endpoint: str, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """Return the recorded call for this request or raise CassetteMismatchError.
+
+        Identical requests recorded several times are served in recorded order; once
+        exhausted, the last one is repeated.
+        """
+        request, blobs = self._split(endpoint, kwargs)
+        key = self._key(request)
+        candidates = self._by_key.get(key)
+        if not candidates:
+            raise CassetteMismatchError(self._describe_miss(request, blobs))
+        index = min(self._served[key], len(candidates) - 1)
+        self._served[key] += 1
+        self.stats["replayed"] += 1
+        return candidates[index]
+
+    def _describe_miss(self, request: Dict[str, Any], blobs: Dict[str, str]) -> str:
+        same_endpoint = [c for c in self._calls if c["request"]["endpoint"] == request["endpoint"]]
+        if not same_endpoint:
+            return f"No {request['endpoint']} calls recorded in {self.path}"
+        # Closest recording: longest shared input prefix, then earliest unserved
+        def _shared_prefix(call: Dict[str, Any]) -> int:
+            shared = 0
+            for a, b in zip(call["request"]["input"], request["input"]):
+                if a != b:
+                    break
+                shared += 1
+            return shared
+
+        nearest = max(
+            same_endpoint,
+            key=lambda c: (_shared_prefix(c), -self._served.get(c["key"], 0), -c["seq"]),
+        )
+        recorded = nearest["request"]
+        lines = [
+            f"Request not in cassette {self.path} (closest: recorded call #{nearest['seq']}):"
+        ]
+        if recorded["model"] != request["model"]:
+            lines.append(f"  model: recorded {recorded['model']!r}, requested {request['model']!r}")
+        for name in sorted(set(recorded["params"]) | set(request["params"])):
+            old, new = recorded["params"].get(name), request["params"].get(name)
+            if old != new:
+                lines.append(f"  params.{name}: recorded {old!r}, requested {new!r}")
+        if recorded["tools"] != request["tools"]:
+            old_names = [self._blobs.get(h, {}).get("name") for h in recorded["tools"]]
+            new_names = [json.loads(blobs[h]).get("name") for h in request["tools"]]
+            added = sorted(set(new_names) - set(old_names))
+            removed = sorted(set(old_names) - set(new_names))
+            detail = f"added {added}, removed {removed}" if added or removed else "definitions changed"
+            lines.append(f"  tools: {detail}")
+        if recorded["input"] != request["input"]:
+            at = _shared_prefix(nearest)
+            old_item = self._blobs.get(recorded["input"][at]) if at < len(recorded["input"]) else None
+            new_item = json.loads(blobs[request["input"][at]]) if at < len(request["input"]) else None
+            lines.append(
+                f"  input[{at}] differs (recorded {len(recorded['input'])} items, "
+                f"requested {len(request['input'])}):"
+            )
+            lines.append(f"    recorded:  {_preview(old_item)}")
+            lines.append(f"    requested: {_preview(new_item)}")
+        return "\n".join(lines)
+
+
+def _preview(item: Optional[Any], limit: int = 240) -> str:
+    if item is None:
+        return "(none)"
+    text = _canonical(item)
+    return text if len(text) <= limit else text[: limit - 3] + "..."
@@ -0,0 +1,217 @@
+"""Token-budgeted compaction of agent histories.
+
+History is split into spans that must stay together: a plain message on its own,
+or the output items of one response (reasoning, function_call, message) together
+with the function_call_outputs answering its calls. When an agent's history goes
+over budget, the oldest spans are replaced by a short extractive summary message
+until it is back under a target share of the budget. The system prompt, open
+calls and the most recent spans are never touched.
+"""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+from .tokens import TokenCounter, item_field, item_type
+
+if TYPE_CHECKING:
+    from .agent_state import AgentState
+
+
+SUMMARIZE = "summarize"
+DROP = "drop"
+MODES = (SUMMARIZE, DROP)
+
+SUMMARY_HEADER = "[Earlier conversation, compacted]"
+
+
+def build_spans(inputs: List[Any]) -> List[List[int]]:
+    """Group item indices into spans that are kept or dropped as a unit."""
+    spans: List[List[int]] = []
+    span_of_call: Dict[str, int] = {}
+    open_response: Optional[int] = None
+    for index, item in enumerate(inputs):
+        kind = item_type(item)
+        if kind == "function_call_output":
+            owner = span_of_call.get(item_field(item, "call_id"))
+            if owner is None:
+                spans.append([index])
+            else:
+                spans[owner].append(index)
+            continue
+        if kind in ("reasoning", "function_call", "message") and not isinstance(item, dict):
+            # Raw output item: consecutive ones come from the same response
+            if open_response is None:
+                spans.append([])
+                open_response = len(spans) - 1
+            spans[open_response].append(index)
+            if kind == "function_call":
+                span_of_call[item_field(item, "call_id")] = open_response
+            continue
+        open_response = None
+        spans.append([index])
+    return spans
+
+
+class ContextCompactor:
+    """Keeps each agent's history under `budget_tokens` (system prompt included).
+
+    Compaction triggers when the running total exceeds the budget and then removes
+    whole spans, oldest first, until the total is at most `target_ratio * budget`,
+    so it runs rarely rather than on every append. In "summarize" mode the removed
+    spans are folded into a single summary message at the start of the history
+    (capped at `summary_max_chars`, and at about a quarter of the budget); in "drop"
+    mode they are discarded. Token counts come from the agent's running totals
+    (`AgentState.token_counter`); agents without a counter get `counter`.
+    """
+
+    def __init__(
+        self,
+        budget_tokens: int,
+        *,
+        mode: str = SUMMARIZE,
+        keep_recent: int = 6,
+        target_ratio: float = 0.75,
+        summary_max_chars: int = 2000,
+        counter: Optional[TokenCounter] = None,
+    ) -> None:
+        if mode not in MODES:
+            raise ValueError(f"Unknown compaction mode '{mode}' (expected one of {MODES})")
+        self.budget_tokens = budget_tokens
+        self.mode = mode
+        self.keep_recent = keep_recent
+        self.target_ratio = target_ratio
+        self.summary_max_chars = summary_max_chars
+        self.counter = counter or TokenCounter()
+
+    def on_append(self, agent: "AgentState") -> None:
+        """Account for items appended to `agent.inputs`; compact if over budget."""
+        if agent.token_counter is None:
+            agent.token_counter = self.counter
+        agent.account_tokens()
+        # A new summary costs tokens too, so one pass may not be enough
+        while agent.total_tokens() > self.budget_tokens:
+            if self.compact(agent) <= 0:
+                break
+
+    def compact(self, agent: "AgentState") -> int:
+        """Drop the oldest spans until under target; returns net tokens saved."""
+        target = int(self.budget_tokens * self.target_ratio)
+        has_summary = agent.context_summary is not None
+        spans = build_spans(agent.inputs[1:] if has_summary else agent.inputs)
+        offset = 1 if has_summary else 0
+        droppable = spans[: max(0, len(spans) - self.keep_recent)]
+
+        excess = agent.total_tokens() - target
+        dropped: List[int] = []
+        removed_tokens = 0
+        for span in droppable:
+            if removed_tokens >= excess:
+                break
+            indices = [i + offset for i in span]
+            if self._has_open_call(agent.inputs, indices):
+                break
+            dropped.extend(indices)
+            removed_tokens += sum(agent.item_tokens[i] for i in indices)
+        if not dropped:
+            return 0
+
+        dropped_set = set(dropped)
+        removed_items = [agent.inputs[i] for i in sorted(dropped)]
+        if has_summary:
+            dropped_set.add(0)
+            removed_tokens += agent.item_tokens[0]
+        kept = [i for i in range(len(agent.inputs)) if i not in dropped_set]
+        inputs = [agent.inputs[i] for i in kept]
+        item_tokens = [agent.item_tokens[i] for i in kept]
+
+        added_tokens = 0
+        if self.mode == SUMMARIZE:
+            agent.context_summary = self._fold_summary(agent.context_summary, removed_items)
+            summary_item = {"role": "user", "content": agent.context_summary}
+            added_tokens = agent.token_counter.count_item(summary_item)
+            inputs.insert(0, summary_item)
+            item_tokens.insert(0, added_tokens)
+        else:
+            agent.context_summary = None
+
+        agent.inputs[:] = inputs
+        agent.item_tokens[:] = item_tokens
+        agent.history_tokens += added_tokens - removed_tokens
+        saved = removed_tokens - added_tokens
+        agent.tokens_saved += saved
+        agent.compactions += 1
+        agent.items_compacted += len(removed_items)
+        # The server-side conversation no longer matches the local history
+        agent.reset_chain()
+        return saved
+
+    @staticmethod
+    def _has_open_call(inputs: List[Any], indices: List[int]) -> bool:
+        calls = {item_field(inputs[i], "call_id") for i in indices if item_type(inputs[i]) == "function_call"}
+        answered = {
+            item_field(inputs[i], "call_id") for i in indices if item_type(inputs[i]) == "function_call_output"
+        }
+        return bool(calls - answered)
+
+    def _fold_summary(self, previous: Optional[str], removed: List[Any]) -> str:
+        lines = previous.splitlines()[1:] if previous else []
+        outputs = {
+            item_field(item, "call_id"): item_field(item, "output", "")
+            for item in removed
+            if item_type(item) == "function_call_output"
+        }
+        for item in removed:
+            line = _summarize_item(item, outputs)
+            if line:
+                lines.append(line)
+        # Keep the most recent lines within the cap
+        limit = min(self.summary_max_chars, self.budget_tokens)  # ~4 chars per token
+        kept: List[str] = []
+        size = len(SUMMARY_HEADER)
+        for line in reversed(lines):
+            if size + len(line) + 1 > limit:
+                break
+            kept.append(line)
+            size += len(line) + 1
+        return "\n".join([SUMMARY_HEADER, *reversed(kept)])
+
+    def stats(self, agents: List["AgentState"]) -> Dict[str, Any]:
+        return {
+            "budget_tokens": self.budget_tokens,
+            "mode": self.mode,
+            "agents": {
+                agent.name: {
+                    "compactions": agent.compactions,
+                    "items_compacted": agent.items_compacted,
+                    "tokens_saved": agent.tokens_saved,
+                    "history_tokens": agent.total_tokens(),
+                }
+                for agent in agents
+            },
+        }
+
+
+def _clip(text: Any, limit: int) -> str:
+    text = " ".join(str(text or "").split())
+    return text if len(text) <= limit else text[: limit - 3] + "..."
+
+
+def _summarize_item(item: Any, outputs: Dict[str, Any]) -> Optional[str]:
+    kind = item_type(item)
+    if kind == "function_call":
+        result = outputs.get(item_field(item, "call_id"), "")
+        return f"- called {item_field(item, 'name')}({_clip(item_field(item, 'arguments'), 80)}) -> {_clip(result, 120)}"
+    if kind == "message":
+        parts = [
+            item_field(part, "text", "")
+            for part in item_field(item, "content", []) or []
+            if item_type(part) == "output_text"
+        ]
+        return f"- you said: {_clip(' '.join(parts), 160)}"
+    if kind in ("reasoning", "function_call_output"):
+        return None
+    role = item_field(item, "role")
+    if role in ("user", "assistant"):
+        prefix = "you said" if role == "assistant" else "heard"
+        return f"- {prefix}: {_clip(item_field(item, 'content'), 160)}"
+    return None
@@ -1,19 +1,34 @@
 from __future__ import annotations
 
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional, Tuple
 
 from dotenv import load_dotenv
 
 
+DEFAULT_READ_ONLY_TOOL_PATTERNS: Tuple[str, ...] = (
+    "list_*",
+    "get_*",
+    "search_*",
+    "find_*",
+    "read_*",
+    "describe_*",
+    "health_check",
+)
+
+
 @dataclass(slots=True)
 class OpenAIConfig:
     api_key: str
     model: str = "gpt-4o-mini"
     temperature: float = 0.3
     seed: Optional[int] = None
+    # "record" stores every Responses API call in a cassette; "replay" serves
+    # them back from it without network access
+    cassette_mode: Optional[str] = None
+    cassette_path: Path = Path("cassettes/openai.jsonl.gz")
 
 
 @dataclass(slots=True)
@@ -24,6 +39,81 @@ class MCPServerConfig:
     linear_cmd: str = (
         "uv --directory /Users/apple/Github/mimicry-club run python -m apps.linear.mcp"
     )
+    # Seconds allowed for each server to spawn, initialize and list its tools
+    startup_timeout: float = 60.0
+    # Maximum in-flight tool calls per namespace; overridable per namespace
+    max_concurrent_calls: int = 4
+    concurrency_limits: Dict[str, int] = field(default_factory=dict)
+
+    # Sessions opened per namespace; overridable per namespace
+    sessions_per_namespace: int = 1
+    session_counts: Dict[str, int] = field(default_factory=dict)
+    # Tool-name globs (bare or namespaced) treated as read-only, in addition to
+    # tools that declare `readOnlyHint`; read-only calls may use any session
+    read_only_tool_patterns: Tuple[str, ...] = DEFAULT_READ_ONLY_TOOL_PATTERNS
+    # Cache results of read-only tools; any write in a namespace invalidates it
+    cache_enabled: bool = False
+    cache_ttl_seconds: float = 30.0
+    cache_max_entries: int = 256
+    cache_tool_ttls: Dict[str, float] = field(default_factory=dict)
+    # Coalesce identical concurrent calls to read-only tools into one request,
+    # except for tools matching `single_flight_exclude` (bare or namespaced globs);
+    # calls to any other tool always reach the server
+    single_flight: bool = True
+    single_flight_exclude: Tuple[str, ...] = ()
+    # Unix socket of a running MCP pool daemon (python -m orchestrator.mcp_pool);
+    # when set, sessions are checked out from the pool instead of spawned
+    pool_socket: Optional[str] = None
+
+    def concurrency_limit(self, namespace: str) -> int:
+        return max(1, self.concurrency_limits.get(namespace, self.max_concurrent_calls))
+
+    def pool_size(self, namespace: str) -> int:
+        return max(1, self.session_counts.get(namespace, self.sessions_per_namespace))
+
+    def commands(self) -> Dict[str, str]:
+        """Server launch commands keyed by namespace."""
+        return {"smartsheet": self.smartsheet_cmd, "linear": self.linear_cmd}
+
+    @staticmethod
+    def from_env() -> "MCPServerConfig":
+        """Load MCP server configuration from environment variables with defaults."""
+        load_dotenv()
+        smartsheet_cmd = os.getenv(
+            "SMARTSHEET_MCP_CMD",
+            "python /Users/apple/Github/mcp-ai-lab/smartsheet/main_mcp.py",
+        )
+        linear_cmd = os.getenv(
+            "LINEAR_MCP_CMD",
+            "uv --directory /Users/apple/Github/mimicry-club run python -m apps.linear.mcp",
+        )
+        return MCPServerConfig(
+            smartsheet_cmd=smartsheet_cmd,
+            linear_cmd=linear_cmd,
+            startup_timeout=float(os.getenv("MCP_STARTUP_TIMEOUT", "60")),
+            max_concurrent_calls=int(os.getenv("MCP_MAX_CONCURRENT_CALLS", "4")),
+            concurrency_limits={
+                namespace: int(limit)
+                for namespace, limit in _env_mapping("MCP_CONCURRENCY_LIMITS").items()
+            },
+            sessions_per_namespace=int(os.getenv("MCP_SESSIONS_PER_NAMESPACE", "1")),
+            session_counts={
+                namespace: int(count)
+                for namespace, count in _env_mapping("MCP_SESSION_COUNTS").items()
+            },
+            read_only_tool_patterns=_env_list("MCP_READ_ONLY_TOOLS")
+            or DEFAULT_READ_ONLY_TOOL_PATTERNS,
+            cache_enabled=_env_bool("MCP_CACHE", False),
+            cache_ttl_seconds=float(os.getenv("MCP_CACHE_TTL", "30")),
+            cache_max_entries=int(os.getenv("MCP_CACHE_MAX_ENTRIES", "256")),
+            cache_tool_ttls={
+                pattern: float(ttl)
+                for pattern, ttl in _env_mapping("MCP_CACHE_TTLS").items()
+            },
+            single_flight=_env_bool("MCP_SINGLE_FLIGHT", True),
+            single_flight_exclude=_env_list("MCP_SINGLE_FLIGHT_EXCLUDE"),
+            pool_socket=os.getenv("MCP_POOL_SOCKET") or None,
+        )
 
 
 @dataclass(slots=True)
@@ -32,6 +122,37 @@ class RunConfig:
     stale_turn_limit: int = 6
     reflection_interval: int = 8
     max_tool_rounds: int = 8
+    parallel_tool_calls: bool = False
+    stream_responses: bool = False
+    chain_responses: bool = False
+    # Estimated tokens per agent history (system prompt included); 0 disables compaction
+    context_token_budget: int = 0
+    compaction_mode: str = "summarize"
+    compaction_keep_recent: int = 6
+    # "approx" (chars/4) or "exact" (tiktoken, optional extra)
+    token_count_mode: str = "approx"
+    # Byte-stable prefix (canonical tools, append-only history) plus prompt_cache_key
+    prompt_cache: bool = False
+    # Tool catalogue in system prompts: "full" (names and descriptions), "index"
+    # (names only) or "none"; the function definitions are sent either way
+    prompt_tool_mode: str = "full"
+    # Tools offered per agent, ranked by persona relevance; 0 offers every tool
+    tool_subset_size: int = 0
+    # Condense teammate activity since an agent's last turn into one update of at
+    # most this many characters; 0 delivers each broadcast as its own message
+    team_digest_chars: int = 0
+    # Reasoning items kept per agent history, most recent first; -1 keeps them all
+    reasoning_keep: int = -1
+    # Tool outputs longer than this many characters are replaced by a preview and a
+    # handle for orchestrator__read_output; 0 always sends outputs in full
+    tool_output_spill_chars: int = 0
+    tool_output_preview_chars: int = 2000
+    # "round_robin" (fixed rotation) or "activity" (the agent with the most unread
+    # events, mentions and ongoing tool work; idle agents are skipped)
+    turn_scheduler: str = "round_robin"
+    # Agents taking their turns at the same time; broadcasts are merged in scheduled
+    # order once the whole batch is done. 1 runs turns one after another
+    concurrent_turns: int = 1
     log_dir: Path = Path("runs")
     
     @staticmethod
@@ -41,6 +162,22 @@ class RunConfig:
         stale_turn_limit = int(os.getenv("STALE_TURN_LIMIT", "6"))
         reflection_interval = int(os.getenv("REFLECTION_INTERVAL", "8"))
         max_tool_rounds = int(os.getenv("MAX_TOOL_ROUNDS", "8"))
+        parallel_tool_calls = _env_bool("PARALLEL_TOOL_CALLS", False)
+        stream_responses = _env_bool("STREAM_RESPONSES", False)
+        chain_responses = _env_bool("CHAIN_RESPONSES", False)
+        context_token_budget = int(os.getenv("CONTEXT_TOKEN_BUDGET", "0"))
+        compaction_mode = os.getenv("COMPACTION_MODE", "summarize").strip().lower()
+        compaction_keep_recent = int(os.getenv("COMPACTION_KEEP_RECENT", "6"))
+        token_count_mode = os.getenv("TOKEN_COUNT_MODE", "approx").strip().lower()
+        prompt_cache = _env_bool("PROMPT_CACHE", False)
+        prompt_tool_mode = os.getenv("PROMPT_TOOL_MODE", "full").strip().lower()
+        tool_subset_size = int(os.getenv("TOOL_SUBSET_SIZE", "0"))
+        team_digest_chars = int(os.getenv("TEAM_DIGEST_CHARS", "0"))
+        reasoning_keep = int(os.getenv("REASONING_KEEP", "-1"))
+        tool_output_spill_chars = int(os.getenv("TOOL_OUTPUT_SPILL_CHARS", "0"))
+        tool_output_preview_chars = int(os.getenv("TOOL_OUTPUT_PREVIEW_CHARS", "2000"))
+        turn_scheduler = os.getenv("TURN_SCHEDULER", "round_robin").strip().lower()
+        concurrent_turns = max(1, int(os.getenv("CONCURRENT_TURNS", "1")))
         log_dir_str = os.getenv("LOG_DIR", "runs")
         log_dir = Path(log_dir_str)
         
@@ -49,6 +186,22 @@ class RunConfig:
             stale_turn_limit=stale_turn_limit,
             reflection_interval=reflection_interval,
             max_tool_rounds=max_tool_rounds,
+            parallel_tool_calls=parallel_tool_calls,
+            stream_responses=stream_responses,
+            chain_responses=chain_responses,
+            context_token_budget=context_token_budget,
+            compaction_mode=compaction_mode,
+            compaction_keep_recent=compaction_keep_recent,
+            token_count_mode=token_count_mode,
+            prompt_cache=prompt_cache,
+            prompt_tool_mode=prompt_tool_mode,
+            tool_subset_size=tool_subset_size,
+            team_digest_chars=team_digest_chars,
+            reasoning_keep=reasoning_keep,
+            tool_output_spill_chars=tool_output_spill_chars,
+            tool_output_preview_chars=tool_output_preview_chars,
+            turn_scheduler=turn_scheduler,
+            concurrent_turns=concurrent_turns,
             log_dir=log_dir,
         )
 
@@ -63,8 +216,11 @@ class Config:
 def load_config() -> Config:
     load_dotenv()
 
+    cassette_mode = (os.getenv("OPENAI_CASSETTE_MODE") or "").strip().lower() or None
+    cassette_path = Path(os.getenv("OPENAI_CASSETTE", "cassettes/openai.jsonl.gz"))
+
     api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
+    if not api_key and cassette_mode != "replay":
         raise RuntimeError("OPENAI_API_KEY is required (set in .env)")
 
     model = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
@@ -72,27 +228,41 @@ def load_config() -> Config:
     seed_val = os.getenv("OPENAI_SEED")
     seed = int(seed_val) if seed_val else None
 
-    smartsheet_cmd = os.getenv(
-        "SMARTSHEET_MCP_CMD",
-        "python /Users/apple/Github/mcp-ai-lab/smartsheet/main_mcp.py",
-    )
-    linear_cmd = os.getenv(
-        "LINEAR_MCP_CMD",
-        "uv --directory /Users/apple/Github/mimicry-club run python -m apps.linear.mcp",
-    )
-
     openai_cfg = OpenAIConfig(
-        api_key=api_key,
+        api_key=api_key or "",
         model=model,
         temperature=temperature,
         seed=seed,
+        cassette_mode=cassette_mode,
+        cassette_path=cassette_path,
     )
-    mcp_cfg = MCPServerConfig(
-        smartsheet_cmd=smartsheet_cmd,
-        linear_cmd=linear_cmd,
-    )
+    mcp_cfg = MCPServerConfig.from_env()
     run_cfg = RunConfig.from_env()
 
     run_cfg.log_dir.mkdir(parents=True, exist_ok=True)
 
     return Config(openai=openai_cfg, mcp=mcp_cfg, run=run_cfg)
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None or not value.strip():
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _env_mapping(name: str) -> Dict[str, str]:
+    """Parse `key=value,key=value` pairs from an environment variable."""
+    mapping: Dict[str, str] = {}
+    for pair in os.getenv(name, "").split(","):
+        if "=" not in pair:
+            continue
+        key, value = pair.split("=", 1)
+        if key.strip():
+            mapping[key.strip()] = value.strip()
+    return mapping
+
+
+def _env_list(name: str) -> Tuple[str, ...]:
+    """Parse a comma-separated environment variable into a tuple of strings."""
+    return tuple(item.strip() for item in os.getenv(name, "").split(",") if item.strip())
@@ -0,0 +1,141 @@
+"""Condense teammate activity into one update per turn.
+
+Instead of one user message per teammate tool call, an agent catching up on the
+shared event log gets a single structured digest: what teammates said, which
+entities they created, which states they changed, what failed, and a deduplicated
+tally of their other (read) calls. Entity IDs and state changes are extracted
+from tool names, arguments and outputs with simple heuristics. The digest is
+capped at `max_chars`; lower-priority sections are cut first.
+"""
+from __future__ import annotations
+
+import json
+import re
+from typing import TYPE_CHECKING, Any, Dict, List, Tuple
+
+if TYPE_CHECKING:
+    from .event_log import SharedEvent
+
+
+DIGEST_HEADER = "[Team update since your last turn]"
+
+CREATE_VERBS = ("create", "add", "insert", "new", "copy", "import")
+UPDATE_VERBS = ("update", "set", "move", "close", "complete", "assign", "delete", "archive", "rename")
+STATE_KEYS = ("state", "status", "stateid", "state_id", "status_id")
+
+_ISSUE_KEY = re.compile(r"\b[A-Z][A-Z0-9]+-\d+\b")
+_URL = re.compile(r"https?://[^\s\"'<>)]+")
+
+
+def _verb(tool: str) -> str:
+    return tool.split(".", 1)[-1].split("_", 1)[0].lower()
+
+
+def _is_id_key(key: str) -> bool:
+    lower = key.lower()
+    if lower in STATE_KEYS:
+        return False
+    return lower in ("id", "identifier", "url", "key") or lower.endswith("_id") or key.endswith("Id")
+
+
+def _clip(text: Any, limit: int) -> str:
+    text = " ".join(str(text or "").split())
+    return text if len(text) <= limit else text[: limit - 3] + "..."
+
+
+def created_ids(output: str) -> List[str]:
+    """IDs and links of the entity a create-style tool returned."""
+    try:
+        data = json.loads(output)
+    except (TypeError, ValueError):
+        data = None
+    if isinstance(data, dict):
+        ids = [
+            str(value)
+            for key, value in data.items()
+            if _is_id_key(key) and isinstance(value, (str, int)) and value != ""
+        ]
+        if ids:
+            return ids
+    text = output or ""
+    return list(dict.fromkeys(_ISSUE_KEY.findall(text) + _URL.findall(text)))[:5]
+
+
+def state_change(arguments: Any) -> Tuple[str, str]:
+    """(target ids, changed fields) described by an update-style call's arguments."""
+    if not isinstance(arguments, dict):
+        return "", ""
+    target = ", ".join(str(v) for k, v in arguments.items() if _is_id_key(k) and v not in (None, ""))
+    fields = [
+        f"{k}={_clip(v, 40)}"
+        for k, v in arguments.items()
+        if not _is_id_key(k) and v not in (None, "")
+    ]
+    # State fields first: they are what teammates most need to know
+    fields.sort(key=lambda field: field.split("=", 1)[0].lower() not in STATE_KEYS)
+    return target, ", ".join(fields[:4])
+
+
+def build_digest(events: List["SharedEvent"], max_chars: int) -> str:
+    """One update describing `events`, at most `max_chars` characters long."""
+    finished: List[str] = []
+    messages: List[str] = []
+    created: List[str] = []
+    changed: List[str] = []
+    errors: List[str] = []
+    reads: Dict[str, Dict[str, int]] = {}
+    message_limit = max(120, max_chars // 4)
+
+    for event in events:
+        details = event.details or {}
+        tool = details.get("tool", "")
+        if event.kind == "finish":
+            finished.append(f"- {event.author}: {_clip(details.get('summary', event.item['content']), message_limit)}")
+        elif event.kind == "message":
+            messages.append(f"- {_clip(event.item['content'], message_limit)}")
+        elif event.kind == "tool_error":
+            errors.append(f"- {event.author} {tool}: {_clip(details.get('error'), 160)}")
+        elif event.kind == "tool" and _verb(tool) in CREATE_VERBS:
+            ids = created_ids(details.get("output", ""))
+            created.append(f"- {event.author} {tool}: {', '.join(ids) if ids else _clip(details.get('output'), 120)}")
+        elif event.kind == "tool" and _verb(tool) in UPDATE_VERBS:
+            target, fields = state_change(details.get("arguments"))
+            changed.append(f"- {event.author} {tool} {target}: {fields}".rstrip(": "))
+        else:
+            counts = reads.setdefault(event.author, {})
+            counts[tool or "?"] = counts.get(tool or "?", 0) + 1
+
+    other = [
+        "- " + author + ": " + ", ".join(f"{tool} x{n}" if n > 1 else tool for tool, n in counts.items())
+        for author, counts in reads.items()
+    ]
+    sections = [
+        ("Finished", finished),
+        ("Messages", list(dict.fromkeys(messages))),
+        ("Created", list(dict.fromkeys(created))),
+        ("State changes", list(dict.fromkeys(changed))),
+        ("Errors", list(dict.fromkeys(errors))),
+        ("Other tool calls", other),
+    ]
+
+    lines = [DIGEST_HEADER]
+    size = len(DIGEST_HEADER)
+    # Leave room for the omission note
+    limit = max_chars - len("\n(+999 more updates omitted)")
+    omitted = 0
+    for title, entries in sections:
+        if not entries:
+            continue
+        heading = f"{title}:"
+        for index, entry in enumerate(entries):
+            needed = len(entry) + 1 + (len(heading) + 1 if index == 0 else 0)
+            if size + needed > limit:
+                omitted += len(entries) - index
+                break
+            if index == 0:
+                lines.append(heading)
+            lines.append(entry)
+            size += needed
+    if omitted:
+        lines.append(f"(+{omitted} more updates omitted)")
+    return "\n".join(lines)
@@ -0,0 +1,99 @@
+"""Append-only log of team broadcasts, shared by every agent.
+
+Teammate messages and tool-result notices used to be copied into each teammate's
+history as they happened. They are now stored once here and each `AgentState`
+keeps a cursor into the log. When the agent next builds its inputs it appends the
+events it has not seen yet (skipping its own) as references to the same item
+objects, so N agents hold N pointers to one item instead of N copies. Identical
+broadcasts share a single item as well.
+
+With `digest_chars` set, several unseen events are instead condensed into one
+update for the reader (see `orchestrator.digest`).
+
+While agents take turns concurrently the log is held: their broadcasts are kept
+aside, invisible to every reader, and `release()` appends them at the barrier in
+the batch's scheduled order, so what each agent sees does not depend on which
+turn finished first.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from .digest import build_digest
+
+
+@dataclass(slots=True)
+class SharedEvent:
+    author: str
+    # The input item every reader appends; never mutated once logged
+    item: Dict[str, str]
+    # "message", "tool", "tool_error" or "finish"
+    kind: str = "message"
+    # Structured fields for digests (tool, arguments, output, error, summary)
+    details: Optional[Dict[str, Any]] = None
+
+
+class SharedEventLog:
+    def __init__(self, digest_chars: int = 0) -> None:
+        self.digest_chars = digest_chars
+        self._events: List[SharedEvent] = []
+        self._items: Dict[str, Dict[str, str]] = {}
+        self._digests = {"digests": 0, "digested_events": 0}
+        self._held: Optional[Dict[str, List[SharedEvent]]] = None
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def append(
+        self,
+        author: str,
+        content: str,
+        *,
+        kind: str = "message",
+        details: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Broadcast `content` from `author` to every other reader."""
+        content = content.strip()
+        if not content:
+            return
+        item = self._items.get(content)
+        if item is None:
+            item = self._items[content] = {"role": "user", "content": content}
+        event = SharedEvent(author, item, kind, details)
+        if self._held is not None:
+            self._held.setdefault(author, []).append(event)
+            return
+        self._events.append(event)
+
+    def hold(self) -> None:
+        """Keep new broadcasts aside until `release()`."""
+        if self._held is None:
+            self._held = {}
+
+    def release(self, order: List[str]) -> None:
+        """Append held broadcasts author by author in `order`, each in its own order."""
+        held, self._held = self._held or {}, None
+        for author in [*order, *sorted(set(held) - set(order))]:
+            self._events.extend(held.pop(author, ()))
+
+    def unread(self, reader: str, cursor: int) -> List[SharedEvent]:
+        """Events logged since `cursor` by anyone but `reader`, without reading them."""
+        return [event for event in self._events[cursor:] if event.author != reader]
+
+    def read(self, reader: str, cursor: int) -> Tuple[List[Dict[str, str]], int]:
+        """Items logged since `cursor` by anyone but `reader`, and the new cursor."""
+        events = self.unread(reader, cursor)
+        if self.digest_chars > 0 and len(events) > 1:
+            self._digests["digests"] += 1
+            self._digests["digested_events"] += len(events)
+            return [{"role": "user", "content": build_digest(events, self.digest_chars)}], len(self._events)
+        return [event.item for event in events], len(self._events)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "events": len(self._events),
+            "unique_items": len(self._items),
+            "content_chars": sum(len(content) for content in self._items),
+            **self._digests,
+        }
@@ -0,0 +1,197 @@
+"""Newline-delimited JSON messaging over a local Unix socket.
+
+Requests carry an `id` and an `op`; replies echo the `id` with `ok` set and either a
+`result` or an `error` with an HTTP-style `code`: 400 when the request itself is
+invalid (the handler raised ValueError or KeyError), 500 for any other failure.
+Messages without an `id` are unsolicited pushes (e.g. streamed events) and are
+handed to the client's push callback.
+"""
+from __future__ import annotations
+
+import asyncio
+import itertools
+import json
+import os
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+
+# Tool results and run events can be large; raise asyncio's 64 KiB line limit
+STREAM_LIMIT = 64 * 1024 * 1024
+
+
+class IPCError(RuntimeError):
+    """Raised when the remote side answers a request with an error."""
+
+    def __init__(self, message: str, code: Optional[int] = None) -> None:
+        super().__init__(message)
+        self.code = code
+
+
+class IPCConnection:
+    """Server-side view of one client connection."""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._reader = reader
+        self._writer = writer
+        self._write_lock = asyncio.Lock()
+        self._close_callbacks: List[Callable[[], Awaitable[None]]] = []
+        self.closed = False
+
+    async def send(self, payload: Dict[str, Any]) -> None:
+        if self.closed:
+            return
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8") + b"\n"
+        async with self._write_lock:
+            try:
+                self._writer.write(data)
+                await self._writer.drain()
+            except (ConnectionError, RuntimeError):
+                self.closed = True
+
+    def on_close(self, callback: Callable[[], Awaitable[None]]) -> None:
+        """Register cleanup to run when the client disconnects."""
+        self._close_callbacks.append(callback)
+
+
+Handler = Callable[[Dict[str, Any], IPCConnection], Awaitable[Any]]
+
+
+async def serve_unix(path: str, handler: Handler) -> asyncio.AbstractServer:
+    """Serve `handler` on a Unix socket; each request runs in its own task.
+
+    A socket file left behind by a server that is gone is replaced; one a live
+    server still answers on is not, and RuntimeError is raised instead.
+    """
+    if os.path.exists(path):
+        try:
+            _, writer = await asyncio.open_unix_connection(path)
+        except ConnectionRefusedError:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+        else:
+            writer.close()
+            await writer.wait_closed()
+            raise RuntimeError(f"Another server is already listening on {path}")
+
+    async def _on_client(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        connection = IPCConnection(reader, writer)
+        tasks: set = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                except json.JSONDecodeError as exc:
+                    await connection.send({"ok": False, "error": f"invalid JSON: {exc}", "code": 400})
+                    continue
+                task = asyncio.create_task(_dispatch(handler, request, connection))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            connection.closed = True
+            for task in list(tasks):
+                task.cancel()
+            for callback in connection._close_callbacks:
+                try:
+                    await callback()
+                except Exception:  # noqa: BLE001
+                    pass
+            writer.close()
+
+    return await asyncio.start_unix_server(_on_client, path=path, limit=STREAM_LIMIT)
+
+
+async def _dispatch(handler: Handler, request: Dict[str, Any], connection: IPCConnection) -> None:
+    request_id = request.get("id")
+    try:
+        result = await handler(request, connection)
+        reply: Dict[str, Any] = {"id": request_id, "ok": True, "result": result}
+    except asyncio.CancelledError:
+        raise
+    except KeyError as exc:
+        reply = {"id": request_id, "ok": False, "error": f"Missing field {exc}", "code": 400}
+    except ValueError as exc:
+        reply = {"id": request_id, "ok": False, "error": str(exc) or type(exc).__name__, "code": 400}
+    except Exception as exc:  # noqa: BLE001
+        reply = {"id": request_id, "ok": False, "error": str(exc) or type(exc).__name__, "code": 500}
+    await connection.send(reply)
+
+
+class IPCClient:
+    """Client that multiplexes concurrent requests over one connection."""
+
+    def __init__(self, path: str, on_push: Optional[Callable[[Dict[str, Any]], None]] = None) -> None:
+        self.path = path
+        self._on_push = on_push
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._ids = itertools.count(1)
+        self._write_lock = asyncio.Lock()
+        self._reader_task: Optional[asyncio.Task] = None
+
+    async def connect(self) -> None:
+        self._reader, self._writer = await asyncio.open_unix_connection(
+            self.path, limit=STREAM_LIMIT
+        )
+        self._reader_task = asyncio.create_task(self._read_loop())
+
+    async def request(self, op: str, **params: Any) -> Any:
+        if not self._writer:
+            raise IPCError(f"Not connected to {self.path}")
+        request_id = next(self._ids)
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        data = json.dumps({"id": request_id, "op": op, **params}, ensure_ascii=False)
+        try:
+            async with self._write_lock:
+                self._writer.write(data.encode("utf-8") + b"\n")
+                await self._writer.drain()
+            return await future
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def close(self) -> None:
+        if self._writer:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except (ConnectionError, RuntimeError):
+                pass
+        if self._reader_task:
+            await asyncio.gather(self._reader_task, return_exceptions=True)
+        self._reader = None
+        self._writer = None
+        self._reader_task = None
+
+    async def _read_loop(self) -> None:
+        assert self._reader is not None
+        error: Exception = IPCError(f"Connection to {self.path} closed")
+        try:
+            while True:
+                line = await self._reader.readline()
+                if not line:
+                    break
+                message = json.loads(line)
+                future = self._pending.get(message.get("id")) if "id" in message else None
+                if future is None:
+                    if self._on_push:
+                        self._on_push(message)
+                    continue
+                if future.done():
+                    continue
+                if message.get("ok"):
+                    future.set_result(message.get("result"))
+                else:
+                    future.set_exception(IPCError(message.get("error", "unknown error"), message.get("code")))
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError) as exc:
+            error = IPCError(f"Connection to {self.path} lost: {exc}")
+        finally:
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(error)
@@ -0,0 +1,187 @@
+"""Compact storage for Responses API output items kept in agent histories.
+
+The SDK's pydantic output items (reasoning, function_call, message) are converted
+once, when they are appended to an agent's history, into small `__slots__` objects
+holding just the fields the API accepts back as input. `to_wire()` turns them into
+plain request dicts with no pydantic dump per request, and attribute access
+(`item.type`, `item.call_id`, ...) works as it did on the SDK objects. Item types
+without a compact form are kept as they are.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, Optional, Tuple
+
+
+def _fields(obj: Any) -> Dict[str, Any]:
+    """Non-None fields of an SDK model, dict or plain object, in wire (JSON) form."""
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump(mode="json", exclude_none=True)
+    if isinstance(obj, dict):
+        return {k: v for k, v in obj.items() if v is not None}
+    return {k: _fields(v) if hasattr(v, "__dict__") else v for k, v in vars(obj).items() if v is not None}
+
+
+class ContentPart:
+    """A text part of a message or reasoning summary (`output_text`, `summary_text`, ...)."""
+
+    __slots__ = ("type", "text", "extra")
+
+    def __init__(self, type: str, text: Optional[str], extra: Optional[Dict[str, Any]] = None) -> None:
+        self.type = type
+        self.text = text
+        self.extra = extra or None
+
+    @classmethod
+    def from_fields(cls, fields: Any) -> "ContentPart":
+        fields = dict(_fields(fields))
+        return cls(fields.pop("type", "output_text"), fields.pop("text", None), fields)
+
+    def to_wire(self) -> Dict[str, Any]:
+        wire: Dict[str, Any] = {"type": self.type}
+        if self.text is not None:
+            wire["text"] = self.text
+        if self.extra:
+            wire.update(self.extra)
+        return wire
+
+
+class FunctionCallItem:
+    __slots__ = ("call_id", "name", "arguments", "id", "status", "extra")
+    type = "function_call"
+
+    def __init__(
+        self,
+        call_id: str,
+        name: str,
+        arguments: str,
+        id: Optional[str] = None,
+        status: Optional[str] = None,
+        extra: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        self.call_id = call_id
+        self.name = name
+        self.arguments = arguments
+        self.id = id
+        self.status = status
+        self.extra = extra or None
+
+    def to_wire(self) -> Dict[str, Any]:
+        wire: Dict[str, Any] = {
+            "type": self.type,
+            "call_id": self.call_id,
+            "name": self.name,
+            "arguments": self.arguments,
+        }
+        if self.id is not None:
+            wire["id"] = self.id
+        if self.status is not None:
+            wire["status"] = self.status
+        if self.extra:
+            wire.update(self.extra)
+        return wire
+
+
+class ReasoningItem:
+    __slots__ = ("id", "summary", "encrypted_content", "extra")
+    type = "reasoning"
+
+    def __init__(
+        self,
+        id: Optional[str],
+        summary: Tuple[ContentPart, ...] = (),
+        encrypted_content: Optional[str] = None,
+        extra: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        self.id = id
+        self.summary = summary
+        self.encrypted_content = encrypted_content
+        self.extra = extra or None
+
+    def to_wire(self) -> Dict[str, Any]:
+        wire: Dict[str, Any] = {"type": self.type, "summary": [part.to_wire() for part in self.summary]}
+        if self.id is not None:
+            wire["id"] = self.id
+        if self.encrypted_content is not None:
+            wire["encrypted_content"] = self.encrypted_content
+        if self.extra:
+            wire.update(self.extra)
+        return wire
+
+
+class MessageItem:
+    __slots__ = ("id", "role", "content", "status", "extra")
+    type = "message"
+
+    def __init__(
+        self,
+        id: Optional[str],
+        role: str = "assistant",
+        content: Tuple[ContentPart, ...] = (),
+        status: Optional[str] = None,
+        extra: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        self.id = id
+        self.role = role
+        self.content = content
+        self.status = status
+        self.extra = extra or None
+
+    def to_wire(self) -> Dict[str, Any]:
+        if self.id is None:
+            # Without its id (e.g. its reasoning item was pruned) an output message
+            # can only be sent back as a plain assistant message
+            text = "".join(part.text or "" for part in self.content)
+            return {"role": self.role, "content": text}
+        wire: Dict[str, Any] = {
+            "type": self.type,
+            "id": self.id,
+            "role": self.role,
+            "content": [part.to_wire() for part in self.content],
+        }
+        if self.status is not None:
+            wire["status"] = self.status
+        if self.extra:
+            wire.update(self.extra)
+        return wire
+
+
+COMPACT_TYPES = (FunctionCallItem, ReasoningItem, MessageItem)
+
+
+def compact_item(item: Any) -> Any:
+    """The compact form of an output item; other items are returned unchanged."""
+    if isinstance(item, (dict, *COMPACT_TYPES)):
+        return item
+    kind = getattr(item, "type", None)
+    if kind not in ("function_call", "reasoning", "message"):
+        return item
+    fields = _fields(item)
+    fields.pop("type", None)
+    if kind == "function_call":
+        return FunctionCallItem(
+            fields.pop("call_id", None),
+            fields.pop("name", ""),
+            fields.pop("arguments", ""),
+            fields.pop("id", None),
+            fields.pop("status", None),
+            fields,
+        )
+    if kind == "reasoning":
+        return ReasoningItem(
+            fields.pop("id", None),
+            tuple(ContentPart.from_fields(part) for part in fields.pop("summary", None) or ()),
+            fields.pop("encrypted_content", None),
+            fields,
+        )
+    return MessageItem(
+        fields.pop("id", None),
+        fields.pop("role", "assistant"),
+        tuple(ContentPart.from_fields(part) for part in fields.pop("content", None) or ()),
+        fields.pop("status", None),
+        fields,
+    )
+
+
+def to_wire(item: Any) -> Any:
+    """Request form of a history item: compact items become dicts, others pass through."""
+    return item.to_wire() if isinstance(item, COMPACT_TYPES) else item
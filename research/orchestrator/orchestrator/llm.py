@@ -1,17 +1,30 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List, Tuple
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
-from openai import AsyncOpenAI, BadRequestError
+from openai import APIStatusError, AsyncOpenAI, BadRequestError
+from openai.types.responses import Response
 
+from .cassette import REPLAY, Cassette
 from .config import OpenAIConfig
+from .items import to_wire
+
+
+class ResponseChainError(RuntimeError):
+    """The API no longer has the response named by `previous_response_id`."""
 
 
 class OpenAIClient:
     """Thin wrapper around the OpenAI Responses API."""
 
     def __init__(self, cfg: OpenAIConfig) -> None:
-        self._client = AsyncOpenAI(api_key=cfg.api_key)
+        self._cassette: Optional[Cassette] = (
+            Cassette(cfg.cassette_path, cfg.cassette_mode) if cfg.cassette_mode else None
+        )
+        # Replay never touches the network, so it needs no API key
+        replaying = self._cassette is not None and self._cassette.mode == REPLAY
+        self._client = None if replaying else AsyncOpenAI(api_key=cfg.api_key)
         self._model = cfg.model
         self._temperature = cfg.temperature
         self._seed = cfg.seed
@@ -25,20 +38,7 @@ class OpenAIClient:
             "input": messages,
             "max_output_tokens": max_output_tokens,
         }
-        include_temp = self._should_include_temperature()
-        if include_temp:
-            kwargs["temperature"] = self._temperature
-        if self._seed is not None:
-            kwargs["seed"] = self._seed
-
-        try:
-            response = await self._client.responses.create(**kwargs)
-        except BadRequestError as err:
-            if self._handle_temperature_error(err, include_temp):
-                kwargs.pop("temperature", None)
-                response = await self._client.responses.create(**kwargs)
-            else:
-                raise
+        response = await self._create("complete", kwargs)
 
         text = getattr(response, "output_text", None)
         if text is None:
@@ -55,32 +55,101 @@ class OpenAIClient:
         max_output_tokens: int = 600,
         parallel_tool_calls: bool = False,
         tool_choice: Any = "auto",
+        previous_response_id: Optional[str] = None,
+        prompt_cache_key: Optional[str] = None,
+        on_text_delta: Optional[Callable[[str], None]] = None,
+        on_output_item: Optional[Callable[[Any], None]] = None,
+        timings: Optional[Dict[str, float]] = None,
     ) -> Any:
         """Call the Responses API with tool definitions and mixed inputs.
 
         Returns the raw response object so callers can inspect tool calls.
+
+        Passing `on_text_delta` or `on_output_item` streams the response: message
+        text is handed over as it arrives and each output item (e.g. a function_call)
+        as soon as it is complete, while the model keeps generating. `timings`, if
+        given, receives `ttft_s` (time to the first streamed token) and `response_s`.
+
+        With `previous_response_id`, `inputs` holds only the items added since that
+        response; the API prepends the stored conversation. Raises ResponseChainError
+        if the stored response is gone, so callers can resend the full history.
+
+        `prompt_cache_key` routes requests sharing a prefix to the same prompt cache.
         """
         kwargs: Dict[str, Any] = {
             "model": self._model,
-            "input": inputs,
+            # Compact history items go out as plain dicts, with no per-request model dump
+            "input": [to_wire(item) for item in inputs],
             "tools": tools,
             "max_output_tokens": max_output_tokens,
             "parallel_tool_calls": parallel_tool_calls,
             "tool_choice": tool_choice,
         }
+        if previous_response_id:
+            kwargs["previous_response_id"] = previous_response_id
+        if prompt_cache_key:
+            kwargs["prompt_cache_key"] = prompt_cache_key
+        stream = None
+        if on_text_delta or on_output_item:
+            stream = _StreamHandlers(on_text_delta, on_output_item, timings)
+        started = time.perf_counter()
+        try:
+            response = await self._create("respond_with_tools", kwargs, stream=stream)
+        except APIStatusError as err:
+            if previous_response_id and _is_chain_error(err):
+                raise ResponseChainError(str(err)) from err
+            raise
+        if timings is not None:
+            timings["response_s"] = time.perf_counter() - started
+        return response
+
+    async def _create(
+        self, endpoint: str, kwargs: Dict[str, Any], *, stream: Optional["_StreamHandlers"] = None
+    ) -> Any:
         include_temp = self._should_include_temperature()
         if include_temp:
             kwargs["temperature"] = self._temperature
         if self._seed is not None:
             kwargs["seed"] = self._seed
 
+        if self._cassette and self._cassette.mode == REPLAY:
+            call = self._cassette.replay(endpoint, kwargs)
+            if call.get("temperature_rejected"):
+                self._temperature_supported = False
+            response = Response.model_validate(call["response"])
+            if stream:
+                stream.replay(response)
+            return response
+
+        # Cassettes are keyed on the request as first attempted, which is what a
+        # replay of the same run will compute. Streamed and non-streamed calls share
+        # keys, so either mode can replay the other's recordings.
+        requested = dict(kwargs)
+        temperature_rejected = False
         try:
-            return await self._client.responses.create(**kwargs)
+            response = await self._send(kwargs, stream)
         except BadRequestError as err:
-            if self._handle_temperature_error(err, include_temp):
-                kwargs.pop("temperature", None)
-                return await self._client.responses.create(**kwargs)
-            raise
+            if not self._handle_temperature_error(err, include_temp):
+                raise
+            temperature_rejected = True
+            kwargs.pop("temperature", None)
+            response = await self._send(kwargs, stream)
+
+        if self._cassette:
+            self._cassette.record(
+                endpoint, requested, response, temperature_rejected=temperature_rejected
+            )
+        return response
+
+    async def _send(self, kwargs: Dict[str, Any], stream: Optional["_StreamHandlers"]) -> Any:
+        if stream is None:
+            return await self._client.responses.create(**kwargs)
+        started = time.perf_counter()
+        events = await self._client.responses.create(**kwargs, stream=True)
+        return await stream.consume(events, started)
+
+    def cassette_stats(self) -> Optional[Dict[str, int]]:
+        return dict(self._cassette.stats) if self._cassette else None
 
     def _should_include_temperature(self) -> bool:
         return self._temperature is not None and self._temperature_supported
@@ -99,6 +168,68 @@ class OpenAIClient:
         return False
 
 
+class _StreamHandlers:
+    """Routes Responses API stream events to the caller's callbacks."""
+
+    _TOKEN_EVENTS = ("response.output_text.delta", "response.function_call_arguments.delta")
+
+    def __init__(
+        self,
+        on_text_delta: Optional[Callable[[str], None]],
+        on_output_item: Optional[Callable[[Any], None]],
+        timings: Optional[Dict[str, float]],
+    ) -> None:
+        self._on_text_delta = on_text_delta
+        self._on_output_item = on_output_item
+        self._timings = timings
+
+    async def consume(self, events: Any, started: float) -> Any:
+        response = None
+        async for event in events:
+            kind = getattr(event, "type", "")
+            if kind in self._TOKEN_EVENTS and self._timings is not None:
+                self._timings.setdefault("ttft_s", time.perf_counter() - started)
+            if kind == "response.output_text.delta":
+                if self._on_text_delta:
+                    self._on_text_delta(event.delta)
+            elif kind == "response.output_item.done":
+                if self._on_output_item:
+                    self._on_output_item(event.item)
+            elif kind in ("response.completed", "response.incomplete"):
+                response = event.response
+            elif kind == "response.failed":
+                error = getattr(event.response, "error", None)
+                raise RuntimeError(f"Response failed: {getattr(error, 'message', error)}")
+            elif kind == "error":
+                raise RuntimeError(f"Response stream error: {event.message}")
+        if response is None:
+            raise RuntimeError("Response stream ended without a completed response")
+        return response
+
+    def replay(self, response: Any) -> None:
+        """Emit a recorded response as if it had been streamed."""
+        if self._timings is not None:
+            self._timings.setdefault("ttft_s", 0.0)
+        for item in response.output:
+            if item.type == "message" and self._on_text_delta:
+                for part in item.content:
+                    if part.type == "output_text":
+                        self._on_text_delta(part.text)
+            if self._on_output_item:
+                self._on_output_item(item)
+
+
+def _is_chain_error(err: APIStatusError) -> bool:
+    error = err.body.get("error", err.body) if isinstance(err.body, dict) else {}
+    if not isinstance(error, dict):
+        error = {}
+    return (
+        error.get("param") == "previous_response_id"
+        or "previous_response" in str(error.get("code") or "")
+        or "previous response" in str(error.get("message") or err).lower()
+    )
+
+
 def _extract_text(response: Any) -> str:
     try:
         parts = []
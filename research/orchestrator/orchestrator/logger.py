@@ -1,9 +1,10 @@
 from __future__ import annotations
 
 import json
+import time
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional
 
 from .parsing import ToolCall
 
@@ -13,21 +14,35 @@ class RunLogger:
         self, 
         log_dir: Path, 
         run_signature: Optional[Dict[str, Any]] = None,
-        scenario_name: str = "hello_ticket"
+        scenario_name: str = "hello_ticket",
+        run_id: Optional[str] = None,
+        on_record: Optional[Callable[[Dict[str, Any]], None]] = None,
     ) -> None:
         timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-        self.path = log_dir / f"{scenario_name}_{timestamp}.jsonl"
+        suffix = f"_{run_id}" if run_id else ""
+        self.path = log_dir / f"{scenario_name}_{timestamp}{suffix}.jsonl"
         self.path.parent.mkdir(parents=True, exist_ok=True)
         self._file = self.path.open("w", encoding="utf-8")
+        # Cumulative seconds spent serializing and writing records
+        self.write_seconds = 0.0
+        self.turns = 0
+        # Sees every record after it is written (e.g. to stream a run's events)
+        self._on_record = on_record
+        # Per-agent [input_tokens, cached_tokens] as reported by the API
+        self._prompt_cache: Dict[str, List[int]] = {}
         
         # Write run signature as the first line if provided
         if run_signature:
             self.log_event("run_signature", run_signature)
 
     def log_event(self, event: str, payload: Dict[str, Any]) -> None:
+        started = time.perf_counter()
         record = {"type": event, **payload}
         self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
         self._file.flush()
+        self.write_seconds += time.perf_counter() - started
+        if self._on_record is not None:
+            self._on_record(record)
 
     def log_turn(
         self,
@@ -37,6 +52,7 @@ class RunLogger:
         tool_calls: List[ToolCall],
         tool_outputs: List[Dict[str, Any]],
         usage: Optional[Dict[str, Any]],
+        rounds: Optional[List[Dict[str, Any]]] = None,
     ) -> None:
         payload: Dict[str, Any] = {
             "turn": turn_index,
@@ -56,7 +72,37 @@ class RunLogger:
             else:
                 usage_dict = dict(usage.__dict__)
             payload["usage"] = usage_dict
+        if rounds:
+            # Per-round latency: ttft_s, first_dispatch_s, response_s, round_s, plus
+            # sent_bytes/saved_bytes when requests are chained
+            payload["rounds"] = rounds
+            if any("sent_bytes" in r for r in rounds):
+                payload["payload_bytes_sent"] = sum(r.get("sent_bytes", 0) for r in rounds)
+                payload["payload_bytes_saved"] = sum(r.get("saved_bytes", 0) for r in rounds)
+            input_tokens = sum(r.get("input_tokens", 0) for r in rounds)
+            cached_tokens = sum(r.get("cached_tokens", 0) for r in rounds)
+            if input_tokens:
+                totals = self._prompt_cache.setdefault(agent, [0, 0])
+                totals[0] += input_tokens
+                totals[1] += cached_tokens
+                payload["cache_hit_ratio"] = round(cached_tokens / input_tokens, 4)
+        self.turns += 1
         self.log_event("turn", payload)
 
+    def prompt_cache_stats(self) -> Dict[str, Any]:
+        """Share of input tokens served from the provider's prompt cache, per agent and run."""
+
+        def _entry(input_tokens: int, cached_tokens: int) -> Dict[str, Any]:
+            return {
+                "input_tokens": input_tokens,
+                "cached_tokens": cached_tokens,
+                "hit_ratio": round(cached_tokens / input_tokens, 4) if input_tokens else 0.0,
+            }
+
+        agents = {name: _entry(*totals) for name, totals in self._prompt_cache.items()}
+        run_input = sum(totals[0] for totals in self._prompt_cache.values())
+        run_cached = sum(totals[1] for totals in self._prompt_cache.values())
+        return {"agents": agents, "run": _entry(run_input, run_cached)}
+
     def close(self) -> None:
         self._file.close()
@@ -1,16 +1,23 @@
 from __future__ import annotations
 
 import asyncio
+import fnmatch
+import functools
+import hashlib
+import json
 import shlex
+import time
 from contextlib import AsyncExitStack
 from dataclasses import dataclass
-from typing import Dict, List, Mapping, Optional, Tuple
+from typing import Callable, Collection, Dict, List, Mapping, Optional, Sequence, Tuple
 
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
-from mcp.types import CallToolResult, TextContent, Tool
+from mcp.types import CallToolResult, ServerNotification, TextContent, Tool, ToolListChangedNotification
 
 from .config import MCPServerConfig
+from .ipc import IPCClient, IPCError
+from .tool_cache import ToolResultCache, call_key
 
 
 @dataclass(slots=True)
@@ -31,37 +38,98 @@ class MCPServerHandle:
     def __init__(self, namespace: str, command: str) -> None:
         self.namespace = namespace
         self.command = command
-        self._exit_stack: Optional[AsyncExitStack] = None
         self._session: Optional[ClientSession] = None
+        # The stdio transport and session are anyio contexts, which must be entered
+        # and exited by the same task; a dedicated runner task owns them.
+        self._runner: Optional[asyncio.Task] = None
+        self._shutdown: Optional[asyncio.Event] = None
+        # Seconds spent in each startup phase of the last connect()
+        self.timings: Dict[str, float] = {}
+        # Called when the server sends notifications/tools/list_changed
+        self.on_tools_changed: Optional[Callable[[], None]] = None
 
     async def connect(self) -> List[ToolDefinition]:
         if self._session:
             return []
 
-        self._exit_stack = AsyncExitStack()
+        started = time.perf_counter()
+        ready: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._shutdown = asyncio.Event()
+        self._runner = asyncio.create_task(
+            self._run(ready, self._shutdown),
+            name=f"mcp-{self.namespace}",
+        )
+        try:
+            self._session = await asyncio.shield(ready)
+        except BaseException:
+            await self.close()
+            if ready.done() and not ready.cancelled():
+                ready.exception()  # mark retrieved; the caller already has the error
+            raise
+        self.timings["initialize"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        response = await self._session.list_tools()
+        self.timings["list_tools"] = time.perf_counter() - started
+        return response.tools
+
+    async def list_tools(self) -> List[Tool]:
+        if not self._session:
+            raise RuntimeError(f"MCP server '{self.namespace}' is not connected")
+        return (await self._session.list_tools()).tools
+
+    async def _handle_message(self, message: object) -> None:
+        # Runs inside the session's receive loop: only signal, never await requests here
+        if (
+            isinstance(message, ServerNotification)
+            and isinstance(message.root, ToolListChangedNotification)
+            and self.on_tools_changed is not None
+        ):
+            self.on_tools_changed()
+
+    async def _run(self, ready: asyncio.Future, shutdown: asyncio.Event) -> None:
+        try:
+            async with AsyncExitStack() as stack:
+                session = await self._open_session(stack)
+                ready.set_result(session)
+                await shutdown.wait()
+        except BaseException as exc:
+            if not ready.done():
+                if isinstance(exc, asyncio.CancelledError):
+                    ready.cancel()
+                else:
+                    ready.set_exception(exc)
+            elif not isinstance(exc, (RuntimeError, asyncio.CancelledError)):
+                raise
+
+    async def _open_session(self, stack: AsyncExitStack) -> ClientSession:
+        """Spawn the server over stdio and return an initialized session."""
         cmd_parts = shlex.split(self.command)
         if not cmd_parts:
             raise RuntimeError(f"Empty command for namespace '{self.namespace}'")
-
         params = _build_stdio_params(cmd_parts)
-        transport = await self._exit_stack.enter_async_context(stdio_client(params))
-        reader, writer = transport
-        self._session = await self._exit_stack.enter_async_context(
-            ClientSession(reader, writer)
+        reader, writer = await stack.enter_async_context(stdio_client(params))
+        session = await stack.enter_async_context(
+            ClientSession(reader, writer, message_handler=self._handle_message)
         )
-
-        await self._session.initialize()
-        response = await self._session.list_tools()
-        return response.tools
+        await session.initialize()
+        return session
 
     async def close(self) -> None:
-        if self._exit_stack:
+        runner = self._runner
+        if self._shutdown:
+            self._shutdown.set()
+        if runner:
+            if not runner.done() and self._session is None:
+                # Still starting up; nothing to shut down gracefully
+                runner.cancel()
             try:
-                await self._exit_stack.aclose()
+                await runner
             except (RuntimeError, asyncio.CancelledError):
                 # Ignore cancellation noise during shutdown
                 pass
-        self._exit_stack = None
+        self._runner = None
+        self._shutdown = None
         self._session = None
 
     async def call_tool(self, name: str, arguments: Mapping[str, object]) -> CallToolResult:
@@ -69,32 +137,308 @@ class MCPServerHandle:
             raise RuntimeError(f"MCP server '{self.namespace}' is not connected")
         return await self._session.call_tool(name, dict(arguments))
 
+    async def ping(self) -> None:
+        if not self._session:
+            raise RuntimeError(f"MCP server '{self.namespace}' is not connected")
+        await self._session.send_ping()
+
+
+class PooledServerHandle:
+    """Server handle backed by a session checked out from the MCP pool daemon.
+
+    Same interface as `MCPServerHandle`; see `orchestrator.mcp_pool`. The daemon does
+    not forward server notifications, so the tool list is the one seen at checkout.
+    """
+
+    def __init__(self, namespace: str, command: str, socket_path: str) -> None:
+        self.namespace = namespace
+        self.command = command
+        self.socket_path = socket_path
+        self._client: Optional[IPCClient] = None
+        self._lease: Optional[str] = None
+        self._tools: List[Tool] = []
+        self.timings: Dict[str, float] = {}
+
+    async def connect(self) -> List[Tool]:
+        if self._lease:
+            return []
+        started = time.perf_counter()
+        client = IPCClient(self.socket_path)
+        try:
+            await client.connect()
+        except OSError as exc:
+            raise RuntimeError(f"MCP pool not reachable at {self.socket_path}: {exc}") from exc
+        self._client = client
+        try:
+            reply = await client.request("checkout", namespace=self.namespace, command=self.command)
+        except BaseException:
+            await self.close()
+            raise
+        self._lease = reply["lease"]
+        self.timings["checkout"] = time.perf_counter() - started
+        self._tools = [Tool.model_validate(tool) for tool in reply["tools"]]
+        return self._tools
+
+    async def list_tools(self) -> List[Tool]:
+        if not self._lease:
+            raise RuntimeError(f"MCP server '{self.namespace}' is not connected")
+        return list(self._tools)
+
+    async def close(self) -> None:
+        if self._client:
+            if self._lease:
+                try:
+                    await self._client.request("checkin", lease=self._lease)
+                except (IPCError, OSError, asyncio.CancelledError):
+                    # The daemon checks leases back in when the connection drops
+                    pass
+            await self._client.close()
+        self._client = None
+        self._lease = None
+
+    async def call_tool(self, name: str, arguments: Mapping[str, object]) -> CallToolResult:
+        if not self._client or not self._lease:
+            raise RuntimeError(f"MCP server '{self.namespace}' is not connected")
+        reply = await self._client.request(
+            "call_tool", lease=self._lease, name=name, arguments=dict(arguments)
+        )
+        return CallToolResult.model_validate(reply)
+
+    async def ping(self) -> None:
+        if not self._client:
+            raise RuntimeError(f"MCP server '{self.namespace}' is not connected")
+        await self._client.request("ping")
+
+
+class SessionGroup:
+    """One or more interchangeable sessions for a namespace.
+
+    Read-only tool calls go to the session with the fewest outstanding requests.
+    Other calls stay on the primary session so writes within a namespace keep the
+    order in which they were issued. Exposes the same interface as a single handle.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        handles: List[object],
+        is_read_only: Callable[[str], bool],
+    ) -> None:
+        self.namespace = namespace
+        self._handles = handles
+        self._live: List[object] = []
+        self._is_read_only = is_read_only
+        self._outstanding: Dict[int, int] = {}
+        self._peak: Dict[int, int] = {}
+        self._calls: Dict[int, int] = {}
+        # Wall time each session spent with at least one request outstanding
+        self._busy_s: Dict[int, float] = {}
+        self._busy_since: Dict[int, float] = {}
+        self._connected_at: Optional[float] = None
+        self.timings: Dict[str, float] = {}
+
+    async def connect(self) -> List[Tool]:
+        if self._live:
+            return []
+        results = await asyncio.gather(
+            *(handle.connect() for handle in self._handles), return_exceptions=True
+        )
+        tools: Optional[List[Tool]] = None
+        for handle, result in zip(self._handles, results):
+            if isinstance(result, BaseException):
+                if not isinstance(result, Exception):
+                    raise result
+                continue
+            self._live.append(handle)
+            if tools is None:
+                tools = result
+                self.timings = dict(handle.timings)
+        if tools is None:
+            # Keep the phases the failed server got through for the startup profile
+            self.timings = dict(self._handles[0].timings)
+            raise next(r for r in results if isinstance(r, BaseException))
+        for index in range(len(self._live)):
+            self._outstanding[index] = self._peak[index] = self._calls[index] = 0
+            self._busy_s[index] = 0.0
+        self._connected_at = time.perf_counter()
+        return tools
+
+    async def close(self) -> None:
+        await asyncio.gather(
+            *(handle.close() for handle in self._handles), return_exceptions=True
+        )
+        self._live = []
+
+    async def call_tool(self, name: str, arguments: Mapping[str, object]) -> CallToolResult:
+        if not self._live:
+            raise RuntimeError(f"MCP server '{self.namespace}' is not connected")
+        if len(self._live) > 1 and self._is_read_only(name):
+            index = min(self._outstanding, key=lambda i: (self._outstanding[i], self._calls[i]))
+        else:
+            index = 0
+        if self._outstanding[index] == 0:
+            self._busy_since[index] = time.perf_counter()
+        self._outstanding[index] += 1
+        self._peak[index] = max(self._peak[index], self._outstanding[index])
+        self._calls[index] += 1
+        try:
+            return await self._live[index].call_tool(name, arguments)
+        finally:
+            self._outstanding[index] -= 1
+            if self._outstanding[index] == 0:
+                self._busy_s[index] += time.perf_counter() - self._busy_since[index]
+
+    async def ping(self) -> None:
+        await asyncio.gather(*(handle.ping() for handle in self._live))
+
+    async def list_tools(self) -> List[Tool]:
+        if not self._live:
+            raise RuntimeError(f"MCP server '{self.namespace}' is not connected")
+        return await self._live[0].list_tools()
+
+    def utilization(self) -> Dict[str, object]:
+        elapsed = time.perf_counter() - self._connected_at if self._connected_at else 0.0
+        return {
+            "configured": len(self._handles),
+            "live": len(self._live),
+            "sessions": [
+                {
+                    "calls": self._calls[i],
+                    "peak_outstanding": self._peak[i],
+                    "busy_s": round(self._busy_s[i], 4),
+                    "busy_ratio": round(self._busy_s[i] / elapsed, 4) if elapsed else 0.0,
+                }
+                for i in range(len(self._live))
+            ],
+        }
+
 
 class MCPManager:
-    def __init__(self, cfg: MCPServerConfig) -> None:
+    def __init__(
+        self,
+        cfg: MCPServerConfig,
+        handle_factory: Optional[Callable[[str, str], object]] = None,
+    ) -> None:
+        """`handle_factory(namespace, command)` overrides how server handles are
+        built (e.g. in-process servers for benchmarks); defaults to stdio, or the
+        pool daemon when `cfg.pool_socket` is set."""
+        make_handle = handle_factory or functools.partial(_make_handle, cfg=cfg)
+        self._read_only_patterns = cfg.read_only_tool_patterns
         self._servers = {
-            "smartsheet": MCPServerHandle("smartsheet", cfg.smartsheet_cmd),
-            "linear": MCPServerHandle("linear", cfg.linear_cmd),
+            namespace: SessionGroup(
+                namespace,
+                [make_handle(namespace, command) for _ in range(cfg.pool_size(namespace))],
+                functools.partial(self._is_read_only_in, namespace),
+            )
+            for namespace, command in cfg.commands().items()
         }
+        # Per-namespace limits on in-flight tool calls
+        self._limits = {
+            namespace: asyncio.Semaphore(cfg.concurrency_limit(namespace))
+            for namespace in self._servers
+        }
+        self._cache: Optional[ToolResultCache] = (
+            ToolResultCache(
+                default_ttl=cfg.cache_ttl_seconds,
+                max_entries=cfg.cache_max_entries,
+                tool_ttls=cfg.cache_tool_ttls,
+            )
+            if cfg.cache_enabled
+            else None
+        )
+        self._single_flight = cfg.single_flight
+        self._single_flight_exclude = cfg.single_flight_exclude
+        self._in_flight: Dict[Tuple[str, str], asyncio.Future] = {}
+        self._flight_stats = {"leaders": 0, "coalesced": 0}
+        self._startup_timeout = cfg.startup_timeout
+        self.startup_profile: Dict[str, object] = {}
+        self.startup_errors: Dict[str, str] = {}
         self._tools: Dict[str, NamespacedTool] = {}
         # Mapping between OpenAI tool function names and namespaced MCP tool names
         self._openai_name_to_fq: Dict[str, str] = {}
+        # OpenAI tool definitions are converted once per namespace tool-list version;
+        # the assembled lists (plain and canonical) are cached until a namespace changes
+        self._namespace_defs: Dict[str, List[dict]] = {}
+        self._namespace_hashes: Dict[str, str] = {}
+        self._openai_defs: Dict[bool, List[dict]] = {}
+        # Synthetic tools answered by the orchestrator itself, sent after the MCP tools
+        self._local_tools: Dict[str, Tuple[dict, str]] = {
+            FINISH_TOOL["name"]: (FINISH_TOOL, "orchestrator.finish"),
+            DISCOVER_TOOL["name"]: (DISCOVER_TOOL, "orchestrator.discover_tools"),
+        }
+        # Synthetic tools a run offers only when it answers them (via `extra_tools`);
+        # the manager, which runs may share, just resolves their names
+        self._run_tool_names: Dict[str, str] = {READ_OUTPUT_TOOL["name"]: "orchestrator.read_output"}
+        self.tools_version = 0
+        self._stale_namespaces: set = set()
+        self._refresh_tasks: Dict[str, asyncio.Task] = {}
+        self._refresh_stats = {"notifications": 0, "refreshes": 0, "changed": 0, "errors": 0}
+        for namespace, group in self._servers.items():
+            for handle in group._handles:
+                if hasattr(handle, "on_tools_changed"):
+                    handle.on_tools_changed = functools.partial(self._tools_changed, namespace)
 
     async def connect_all(self) -> List[NamespacedTool]:
+        """Start every server concurrently; a server that fails or times out is skipped.
+
+        Per-server phase timings are kept in `startup_profile` and failures in
+        `startup_errors`. Raises only if no server could be started.
+        """
+        started = time.perf_counter()
+        namespaces = list(self._servers)
+        results = await asyncio.gather(
+            *(self._connect_one(namespace) for namespace in namespaces),
+            return_exceptions=True,
+        )
+
         tools: List[NamespacedTool] = []
-        for namespace, handle in self._servers.items():
-            listed = await handle.connect()
-            for tool_def in listed:
-                ns_tool = NamespacedTool(namespace=namespace, definition=tool_def)
-                tools.append(ns_tool)
-                self._tools[ns_tool.fq_name] = ns_tool
+        servers_profile: Dict[str, Dict[str, object]] = {}
+        for namespace, result in zip(namespaces, results):
+            handle = self._servers[namespace]
+            profile: Dict[str, object] = {
+                f"{phase}_s": round(seconds, 4) for phase, seconds in handle.timings.items()
+            }
+            if isinstance(result, BaseException):
+                if not isinstance(result, Exception):
+                    raise result
+                error = (
+                    f"startup timed out after {self._startup_timeout}s"
+                    if isinstance(result, asyncio.TimeoutError)
+                    else str(result) or type(result).__name__
+                )
+                self.startup_errors[namespace] = error
+                profile.update({"status": "failed", "error": error})
+            else:
+                self._set_namespace_tools(namespace, result)
+                tools.extend(ns_tool for ns_tool in self._tools.values() if ns_tool.namespace == namespace)
+                profile.update({"status": "ok", "tools": len(result)})
+            servers_profile[namespace] = profile
+
+        self.startup_profile["servers"] = servers_profile
+        self.startup_profile["connect_all_s"] = round(time.perf_counter() - started, 4)
+
+        if len(self.startup_errors) == len(namespaces):
+            details = "; ".join(f"{ns}: {err}" for ns, err in self.startup_errors.items())
+            raise RuntimeError(f"No MCP server could be started ({details})")
         return tools
 
+    async def _connect_one(self, namespace: str) -> List[Tool]:
+        handle = self._servers[namespace]
+        try:
+            return await asyncio.wait_for(handle.connect(), timeout=self._startup_timeout)
+        except BaseException:
+            await handle.close()
+            raise
+
     async def close(self) -> None:
+        for task in self._refresh_tasks.values():
+            task.cancel()
         await asyncio.gather(
+            *self._refresh_tasks.values(),
             *(handle.close() for handle in self._servers.values()),
             return_exceptions=True,
         )
+        self._refresh_tasks.clear()
 
     async def call(
         self, namespaced_tool: str, arguments: Mapping[str, object]
@@ -103,90 +447,243 @@ class MCPManager:
         handle = self._servers.get(namespace)
         if not handle:
             raise RuntimeError(f"Unknown MCP namespace '{namespace}'")
-        result = await handle.call_tool(tool_name, arguments)
+        if (
+            not self._single_flight
+            or not self.is_read_only(namespaced_tool)
+            or self._never_coalesce(namespaced_tool)
+        ):
+            return await self._call_cached(namespaced_tool, namespace, tool_name, handle, arguments)
+
+        # Single flight: identical concurrent reads share the first caller's request.
+        # Followers await it through shield() so one caller's cancellation does not
+        # cancel the request for the others.
+        key = call_key(namespaced_tool, arguments)
+        flight = self._in_flight.get(key)
+        if flight is None:
+            flight = asyncio.ensure_future(
+                self._call_cached(namespaced_tool, namespace, tool_name, handle, arguments)
+            )
+            self._in_flight[key] = flight
+            flight.add_done_callback(functools.partial(self._land, key))
+            self._flight_stats["leaders"] += 1
+        else:
+            self._flight_stats["coalesced"] += 1
+        return await asyncio.shield(flight)
+
+    def _land(self, key: Tuple[str, str], flight: asyncio.Future) -> None:
+        if self._in_flight.get(key) is flight:
+            del self._in_flight[key]
+        if not flight.cancelled():
+            flight.exception()  # mark retrieved even if every caller went away
+
+    def _never_coalesce(self, namespaced_tool: str) -> bool:
+        tool_name = namespaced_tool.split(".", 1)[-1]
+        return any(
+            fnmatch.fnmatchcase(tool_name, pattern) or fnmatch.fnmatchcase(namespaced_tool, pattern)
+            for pattern in self._single_flight_exclude
+        )
+
+    async def _call_cached(
+        self,
+        namespaced_tool: str,
+        namespace: str,
+        tool_name: str,
+        handle: SessionGroup,
+        arguments: Mapping[str, object],
+    ) -> Tuple[str, CallToolResult]:
+        if self._cache is None:
+            return await self._dispatch(namespace, tool_name, handle, arguments)
+
+        if not self.is_read_only(namespaced_tool):
+            try:
+                return await self._dispatch(namespace, tool_name, handle, arguments)
+            finally:
+                # Even a failed write may have changed server state
+                self._cache.invalidate_namespace(namespace)
+
+        key = call_key(namespaced_tool, arguments)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+        generation = self._cache.generation(namespace)
+        rendered, result = await self._dispatch(namespace, tool_name, handle, arguments)
+        if not result.isError:
+            self._cache.put(key, (rendered, result), generation=generation)
+        return rendered, result
+
+    async def _dispatch(
+        self, namespace: str, tool_name: str, handle: SessionGroup, arguments: Mapping[str, object]
+    ) -> Tuple[str, CallToolResult]:
+        async with self._limits[namespace]:
+            result = await handle.call_tool(tool_name, arguments)
         rendered = _render_result(result)
         return rendered, result
 
+    def single_flight_stats(self) -> Dict[str, int]:
+        """Requests sent (`leaders`) vs identical calls that joined one (`coalesced`)."""
+        return dict(self._flight_stats)
+
+    def cache_stats(self) -> Optional[Dict[str, object]]:
+        """Hit/miss counters for the read-only result cache, or None if disabled."""
+        return self._cache.stats() if self._cache else None
+
     async def health_probe(self) -> Dict[str, str]:
-        """Perform lightweight health probes for each server."""
+        """Perform lightweight health probes for each server, concurrently."""
+        probes = [
+            # Smartsheet health check if available
+            ("smartsheet.health_check", {}),
+            # Linear list teams if available
+            ("linear.list_teams", {"limit": 1}),
+        ]
+        probes = [(name, args) for name, args in probes if name in self._tools]
+        started = time.perf_counter()
+        outcomes = await asyncio.gather(*(self._timed_probe(name, args) for name, args in probes))
+
         results: Dict[str, str] = {}
-        # Smartsheet health check if available
-        if "smartsheet.health_check" in self._tools:
-            rendered, _ = await self.call("smartsheet.health_check", {})
-            results["smartsheet.health_check"] = rendered
-        # Linear list teams if available
-        if "linear.list_teams" in self._tools:
-            rendered, _ = await self.call("linear.list_teams", {"limit": 1})
-            results["linear.list_teams"] = rendered
+        probe_profile: Dict[str, float] = {}
+        for (name, _), (rendered, seconds) in zip(probes, outcomes):
+            results[name] = rendered
+            probe_profile[name] = round(seconds, 4)
+        self.startup_profile["probes"] = probe_profile
+        self.startup_profile["health_probe_s"] = round(time.perf_counter() - started, 4)
         return results
 
+    async def _timed_probe(self, name: str, arguments: Mapping[str, object]) -> Tuple[str, float]:
+        started = time.perf_counter()
+        try:
+            rendered, _ = await asyncio.wait_for(
+                self.call(name, arguments), timeout=self._startup_timeout
+            )
+        except Exception as exc:  # noqa: BLE001
+            rendered = f"[probe-error] {exc or type(exc).__name__}"
+        return rendered, time.perf_counter() - started
+
+    def is_read_only(self, namespaced_tool: str) -> bool:
+        """Whether a tool is safe to treat as side-effect free.
+
+        True if the server annotates it with `readOnlyHint`, or if its bare or
+        namespaced name matches one of the configured read-only patterns.
+        """
+        ns_tool = self._tools.get(namespaced_tool)
+        annotations = getattr(ns_tool.definition, "annotations", None) if ns_tool else None
+        if annotations is not None and getattr(annotations, "readOnlyHint", None):
+            return True
+        tool_name = namespaced_tool.split(".", 1)[-1]
+        return any(
+            fnmatch.fnmatchcase(tool_name, pattern) or fnmatch.fnmatchcase(namespaced_tool, pattern)
+            for pattern in self._read_only_patterns
+        )
+
+    def _is_read_only_in(self, namespace: str, tool_name: str) -> bool:
+        return self.is_read_only(f"{namespace}.{tool_name}")
+
+    def pool_utilization(self) -> Dict[str, Dict[str, object]]:
+        """Per-namespace session usage since connect (calls, peak outstanding, busy time)."""
+        return {namespace: group.utilization() for namespace, group in self._servers.items()}
+
     def available_tools(self) -> List[NamespacedTool]:
         return list(self._tools.values())
 
-    def openai_tools(self) -> List[dict]:
-        """Convert discovered MCP tools to OpenAI function tool definitions.
+    def openai_tools(
+        self,
+        *,
+        canonical: bool = False,
+        names: Optional[Collection[str]] = None,
+        extra_tools: Sequence[dict] = (),
+    ) -> List[dict]:
+        """Return discovered MCP tools as OpenAI function tool definitions.
 
         Returns a list of dicts suitable for the OpenAI Responses API `tools` param.
-        Also populates an internal mapping from OpenAI tool names to MCP fq names.
+        Definitions are converted once per tool-list version and cached, so repeated
+        calls return the same objects. With `canonical`, tools are sorted by name and
+        every mapping by key, so the serialized definitions are byte-identical
+        regardless of server order. `names` restricts the MCP tools to a subset of
+        OpenAI tool names and adds `orchestrator__discover_tools` to reach the rest.
+        `extra_tools` are synthetic tools offered by one run only (e.g.
+        `orchestrator__read_output`).
         """
-        defs: List[dict] = []
-        self._openai_name_to_fq.clear()
-        for ns_tool in self.available_tools():
-            fq = ns_tool.fq_name  # e.g., "smartsheet.health_check"
-            # Sanitize: OpenAI tool names cannot include '.'; map to namespace__name
-            sanitized = fq.replace(".", "__")
-            self._openai_name_to_fq[sanitized] = fq
-
-            schema = _extract_input_schema(ns_tool.definition)
-            defs.append(
-                {
-                    "type": "function",
-                    "name": sanitized,
-                    "description": ns_tool.definition.description or "",
-                    # Use permissive schema if none provided
-                    "parameters": schema
-                    if schema is not None
-                    else {
-                        "type": "object",
-                        "properties": {},
-                        "additionalProperties": True,
-                    },
-                }
-            )
-        # Add a synthetic orchestrator finish tool so agents can explicitly end the run
-        finish_name = "orchestrator__finish"
-        self._openai_name_to_fq[finish_name] = "orchestrator.finish"
-        defs.append(
-            {
-                "type": "function",
-                "name": finish_name,
-                "description": "End the run when objectives are complete. Provide a concise summary and relevant links.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "summary": {
-                            "type": "string",
-                            "description": "One-paragraph summary of what was done and key artifacts (IDs, links).",
-                        },
-                        "status": {
-                            "type": "string",
-                            "description": "Final status label (e.g., completed, blocked, parked).",
-                        },
-                        "links": {
-                            "type": "array",
-                            "items": {
-                                "type": "string",
-                                "description": "URLs to created items (Linear issues, Smartsheet rows, etc.)",
-                            },
-                            "description": "List of relevant links.",
-                        },
-                    },
-                    "required": ["summary"],
-                    "additionalProperties": True,
-                },
-            }
-        )
-        return defs
+        defs = self._openai_defs.get(canonical)
+        if defs is None:
+            defs = [
+                definition
+                for namespace in self._servers
+                for definition in self._namespace_defs.get(namespace, [])
+            ]
+            defs.extend(d for d, _ in self._local_tools.values() if d is not DISCOVER_TOOL)
+            if canonical:
+                defs = _canonical(defs)
+            self._openai_defs[canonical] = defs
+        extra = list(extra_tools)
+        if names is not None:
+            defs = [d for d in defs if d["name"] in names or d["name"] in self._local_tools]
+            extra.append(DISCOVER_TOOL)
+        if not extra:
+            return list(defs)
+        if canonical:
+            return sorted([*defs, *_canonical(extra)], key=lambda d: d["name"])
+        return [*defs, *extra]
+
+    def tools_hash(self) -> str:
+        """Content hash of the current tool definitions (changes with `tools_version`)."""
+        digest = hashlib.sha256()
+        for namespace in sorted(self._namespace_hashes):
+            digest.update(f"{namespace}:{self._namespace_hashes[namespace]}\n".encode())
+        return digest.hexdigest()[:16]
+
+    def tool_refresh_stats(self) -> Dict[str, object]:
+        """list_changed notifications seen, refreshes run, and how many changed the tools."""
+        return {**self._refresh_stats, "version": self.tools_version, "hash": self.tools_hash()}
+
+    async def refresh_tools(self, namespace: str) -> bool:
+        """Re-list one namespace's tools; returns whether its definitions changed."""
+        group = self._servers.get(namespace)
+        if not group:
+            raise RuntimeError(f"Unknown MCP namespace '{namespace}'")
+        self._refresh_stats["refreshes"] += 1
+        changed = self._set_namespace_tools(namespace, await group.list_tools())
+        if changed:
+            self._refresh_stats["changed"] += 1
+        return changed
+
+    def _tools_changed(self, namespace: str) -> None:
+        self._refresh_stats["notifications"] += 1
+        self._stale_namespaces.add(namespace)
+        task = self._refresh_tasks.get(namespace)
+        if task is None or task.done():
+            self._refresh_tasks[namespace] = asyncio.ensure_future(self._refresh_stale(namespace))
+
+    async def _refresh_stale(self, namespace: str) -> None:
+        # A notification that lands mid-refresh marks the namespace stale again
+        while namespace in self._stale_namespaces:
+            self._stale_namespaces.discard(namespace)
+            try:
+                await self.refresh_tools(namespace)
+            except Exception:  # noqa: BLE001 - keep the previous definitions
+                self._refresh_stats["errors"] += 1
+
+    def _set_namespace_tools(self, namespace: str, tool_defs: List[Tool]) -> bool:
+        """Convert one namespace's tools; bumps `tools_version` if the content changed."""
+        ns_tools = [NamespacedTool(namespace=namespace, definition=tool_def) for tool_def in tool_defs]
+        defs = [_openai_tool_def(ns_tool) for ns_tool in ns_tools]
+        content_hash = hashlib.sha256(
+            json.dumps(defs, sort_keys=True, ensure_ascii=False, default=str).encode()
+        ).hexdigest()
+
+        # Replace this namespace's entries, keeping the others (and server order) as is
+        merged = {fq: t for fq, t in self._tools.items() if t.namespace != namespace}
+        merged.update((ns_tool.fq_name, ns_tool) for ns_tool in ns_tools)
+        self._tools = {fq: t for ns in self._servers for fq, t in merged.items() if t.namespace == ns}
+        self._openai_name_to_fq = {fq.replace(".", "__"): fq for fq in self._tools}
+        self._openai_name_to_fq.update((name, fq) for name, (_, fq) in self._local_tools.items())
+        self._openai_name_to_fq.update(self._run_tool_names)
+
+        if self._namespace_hashes.get(namespace) == content_hash:
+            return False
+        self._namespace_defs[namespace] = defs
+        self._namespace_hashes[namespace] = content_hash
+        self._openai_defs.clear()
+        self.tools_version += 1
+        return True
 
     def resolve_openai_tool_name(self, tool_name: str) -> str:
         """Map a sanitized OpenAI tool name back to an MCP fully-qualified name."""
@@ -207,6 +704,117 @@ class MCPManager:
         return namespace, tool_name
 
 
+# Synthetic orchestrator finish tool so agents can explicitly end the run
+FINISH_TOOL: Dict[str, object] = {
+    "type": "function",
+    "name": "orchestrator__finish",
+    "description": "End the run when objectives are complete. Provide a concise summary and relevant links.",
+    "parameters": {
+        "type": "object",
+        "properties": {
+            "summary": {
+                "type": "string",
+                "description": "One-paragraph summary of what was done and key artifacts (IDs, links).",
+            },
+            "status": {
+                "type": "string",
+                "description": "Final status label (e.g., completed, blocked, parked).",
+            },
+            "links": {
+                "type": "array",
+                "items": {
+                    "type": "string",
+                    "description": "URLs to created items (Linear issues, Smartsheet rows, etc.)",
+                },
+                "description": "List of relevant links.",
+            },
+        },
+        "required": ["summary"],
+        "additionalProperties": True,
+    },
+}
+
+# Synthetic tool for agents given a tool subset (see `orchestrator.tool_selection`)
+DISCOVER_TOOL: Dict[str, object] = {
+    "type": "function",
+    "name": "orchestrator__discover_tools",
+    "description": "Search all MCP tools, including ones not offered to you yet, and make the matches callable.",
+    "parameters": {
+        "type": "object",
+        "properties": {
+            "query": {
+                "type": "string",
+                "description": "What you want to do, e.g. 'update a Linear issue state'.",
+            },
+            "limit": {
+                "type": "integer",
+                "description": "Maximum number of tools to return (default 5).",
+            },
+        },
+        "required": ["query"],
+        "additionalProperties": False,
+    },
+}
+
+# Synthetic tool for paging through tool outputs too large to send in full
+# (see `orchestrator.output_store`)
+READ_OUTPUT_TOOL: Dict[str, object] = {
+    "type": "function",
+    "name": "orchestrator__read_output",
+    "description": "Read part of a tool output that was truncated, using the handle given in the truncation note.",
+    "parameters": {
+        "type": "object",
+        "properties": {
+            "handle": {
+                "type": "string",
+                "description": "Handle from the truncation note, e.g. out_1a2b3c4d5e6f7a8b.",
+            },
+            "offset": {
+                "type": "integer",
+                "description": "Character offset to start reading from.",
+            },
+            "length": {
+                "type": "integer",
+                "description": "Number of characters to read (capped by the orchestrator).",
+            },
+        },
+        "required": ["handle", "offset"],
+        "additionalProperties": False,
+    },
+}
+
+
+def _canonical(defs: List[dict]) -> List[dict]:
+    return [
+        json.loads(json.dumps(d, sort_keys=True, ensure_ascii=False))
+        for d in sorted(defs, key=lambda d: d["name"])
+    ]
+
+
+def _openai_tool_def(ns_tool: NamespacedTool) -> dict:
+    schema = _extract_input_schema(ns_tool.definition)
+    return {
+        "type": "function",
+        # Sanitize: OpenAI tool names cannot include '.'; map to namespace__name
+        "name": ns_tool.fq_name.replace(".", "__"),
+        "description": ns_tool.definition.description or "",
+        # Use permissive schema if none provided
+        "parameters": schema
+        if schema is not None
+        else {
+            "type": "object",
+            "properties": {},
+            "additionalProperties": True,
+        },
+    }
+
+
+def _make_handle(namespace: str, command: str, cfg: MCPServerConfig):
+    if cfg.pool_socket:
+        return PooledServerHandle(namespace, command, cfg.pool_socket)
+    return MCPServerHandle(namespace, command)
+
+
 def _render_result(result: CallToolResult) -> str:
     if not result.content:
         return ""
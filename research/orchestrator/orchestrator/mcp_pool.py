@@ -0,0 +1,310 @@
+"""Long-lived pool of warm MCP sessions shared across orchestrator runs.
+
+Start it once:
+
+    python -m orchestrator.mcp_pool --socket /tmp/orchestrator-mcp.sock
+
+then point runs at it with `MCP_POOL_SOCKET=/tmp/orchestrator-mcp.sock`. Each
+`MCPManager` server handle checks out a session for its namespace/command over the
+socket and checks it back in when the run closes, so the stdio server process and its
+`initialize` handshake are reused instead of paid for on every run.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+from mcp.shared.exceptions import McpError
+from mcp.types import CallToolResult, Tool
+
+from .config import MCPServerConfig
+from .ipc import IPCConnection, serve_unix
+from .mcp_manager import MCPServerHandle
+
+
+DEFAULT_SOCKET = "/tmp/orchestrator-mcp.sock"
+
+PoolKey = Tuple[str, str]  # (namespace, command)
+
+
+@dataclass
+class _WarmSession:
+    key: PoolKey
+    handle: MCPServerHandle
+    tools: List[Tool]
+    calls: int = 0
+    last_used: float = field(default_factory=time.monotonic)
+
+
+class MCPSessionPool:
+    """Warm MCP sessions keyed by (namespace, command), leased out exclusively.
+
+    Idle sessions are pinged every `health_interval` seconds and replaced when a ping
+    fails. A session is recycled (closed and replaced) after `recycle_after` tool
+    calls, and reconnected when its transport breaks mid-call. `min_idle` spare
+    sessions are kept warm per key so the next checkout does not wait for a spawn.
+    `handle_factory(namespace, command)` overrides how server handles are built.
+    """
+
+    def __init__(
+        self,
+        *,
+        recycle_after: int = 500,
+        health_interval: float = 30.0,
+        min_idle: int = 1,
+        max_idle: int = 4,
+        startup_timeout: float = 60.0,
+        handle_factory: Optional[Callable[[str, str], MCPServerHandle]] = None,
+    ) -> None:
+        self._handle_factory = handle_factory or MCPServerHandle
+        self._recycle_after = recycle_after
+        self._health_interval = health_interval
+        self._min_idle = min_idle
+        self._max_idle = max_idle
+        self._startup_timeout = startup_timeout
+        self._idle: Dict[PoolKey, List[_WarmSession]] = {}
+        self._leases: Dict[str, _WarmSession] = {}
+        self._lease_ids = itertools.count(1)
+        self._spawning: Dict[PoolKey, int] = {}
+        self._background: set = set()
+        self._stats = {"spawned": 0, "reused": 0, "recycled": 0, "reconnected": 0, "health_failures": 0}
+
+    async def checkout(self, namespace: str, command: str) -> Tuple[str, List[Tool]]:
+        key = (namespace, command)
+        session = None
+        idle = self._idle.setdefault(key, [])
+        while idle and session is None:
+            candidate = idle.pop()
+            if candidate.calls >= self._recycle_after:
+                self._stats["recycled"] += 1
+                self._spawn_background(self._discard(candidate))
+            elif await self._healthy(candidate):
+                session = candidate
+                self._stats["reused"] += 1
+            else:
+                self._stats["health_failures"] += 1
+                self._spawn_background(self._discard(candidate))
+        if session is None:
+            session = await self._spawn(key)
+        lease = f"{namespace}-{next(self._lease_ids)}"
+        self._leases[lease] = session
+        self._top_up(key)
+        return lease, session.tools
+
+    async def warm(self, namespace: str, command: str) -> None:
+        """Start an idle session for (namespace, command) ahead of any checkout."""
+        key = (namespace, command)
+        session = await self._spawn(key)
+        self._idle.setdefault(key, []).append(session)
+
+    async def checkin(self, lease: str) -> None:
+        session = self._leases.pop(lease, None)
+        if session is None:
+            return
+        session.last_used = time.monotonic()
+        idle = self._idle.setdefault(session.key, [])
+        if session.calls >= self._recycle_after:
+            self._stats["recycled"] += 1
+            await self._discard(session)
+            self._top_up(session.key)
+        elif len(idle) >= self._max_idle:
+            await self._discard(session)
+        else:
+            idle.append(session)
+
+    async def call_tool(self, lease: str, name: str, arguments: Mapping[str, object]) -> CallToolResult:
+        session = self._leases.get(lease)
+        if session is None:
+            raise RuntimeError(f"Unknown or expired lease '{lease}'")
+        session.calls += 1
+        try:
+            return await session.handle.call_tool(name, arguments)
+        except McpError:
+            # Protocol-level error reported by a live server; the session is fine
+            raise
+        except Exception as exc:
+            # Transport is broken: swap in a fresh session under the same lease
+            # and surface the failure (tool calls are not retried blindly)
+            self._stats["reconnected"] += 1
+            self._spawn_background(self._discard(session))
+            try:
+                self._leases[lease] = await self._spawn(session.key)
+            except Exception as spawn_exc:
+                self._leases.pop(lease, None)
+                raise RuntimeError(
+                    f"MCP server '{session.key[0]}' failed ({exc or type(exc).__name__}) "
+                    f"and could not be restarted: {spawn_exc or type(spawn_exc).__name__}"
+                ) from exc
+            raise
+
+    async def run_health_checks(self) -> None:
+        while True:
+            await asyncio.sleep(self._health_interval)
+            for key, idle in list(self._idle.items()):
+                for session in list(idle):
+                    if session in idle and not await self._healthy(session):
+                        idle.remove(session)
+                        self._stats["health_failures"] += 1
+                        await self._discard(session)
+                self._top_up(key)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "idle": {f"{ns}|{cmd}": len(sessions) for (ns, cmd), sessions in self._idle.items()},
+            "leased": {lease: s.calls for lease, s in self._leases.items()},
+            **self._stats,
+        }
+
+    async def close(self) -> None:
+        for task in list(self._background):
+            task.cancel()
+        sessions = [s for idle in self._idle.values() for s in idle] + list(self._leases.values())
+        self._idle.clear()
+        self._leases.clear()
+        await asyncio.gather(*(s.handle.close() for s in sessions), return_exceptions=True)
+
+    async def _spawn(self, key: PoolKey) -> _WarmSession:
+        namespace, command = key
+        handle = self._handle_factory(namespace, command)
+        try:
+            tools = await asyncio.wait_for(handle.connect(), timeout=self._startup_timeout)
+        except BaseException:
+            await handle.close()
+            raise
+        self._stats["spawned"] += 1
+        return _WarmSession(key=key, handle=handle, tools=list(tools))
+
+    def _top_up(self, key: PoolKey) -> None:
+        missing = self._min_idle - len(self._idle.get(key, [])) - self._spawning.get(key, 0)
+        for _ in range(max(0, missing)):
+            self._spawning[key] = self._spawning.get(key, 0) + 1
+            self._spawn_background(self._prewarm(key))
+
+    async def _prewarm(self, key: PoolKey) -> None:
+        try:
+            session = await self._spawn(key)
+            self._idle.setdefault(key, []).append(session)
+        except Exception:  # noqa: BLE001
+            # A failed prewarm is retried by the next checkout or health check
+            pass
+        finally:
+            self._spawning[key] -= 1
+
+    async def _healthy(self, session: _WarmSession) -> bool:
+        try:
+            await asyncio.wait_for(session.handle.ping(), timeout=5.0)
+            return True
+        except Exception:  # noqa: BLE001
+            return False
+
+    async def _discard(self, session: _WarmSession) -> None:
+        await session.handle.close()
+
+    def _spawn_background(self, coro) -> None:
+        task = asyncio.create_task(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+
+class MCPPoolDaemon:
+    """Serves an `MCPSessionPool` on a Unix socket.
+
+    Ops: `checkout(namespace, command)`, `call_tool(lease, name, arguments)`,
+    `checkin(lease)` and `status()`. Leases held by a client are checked back in
+    automatically when it disconnects.
+    """
+
+    def __init__(self, socket_path: str, pool: MCPSessionPool) -> None:
+        self.socket_path = socket_path
+        self.pool = pool
+
+    async def prewarm(self, commands: Mapping[str, str]) -> Dict[str, str]:
+        """Start one idle session per configured server; returns errors by namespace."""
+        results = await asyncio.gather(
+            *(self.pool.warm(ns, cmd) for ns, cmd in commands.items()),
+            return_exceptions=True,
+        )
+        return {
+            ns: str(result) or type(result).__name__
+            for ns, result in zip(commands, results)
+            if isinstance(result, Exception)
+        }
+
+    async def handle(self, request: Dict[str, Any], connection: IPCConnection) -> Any:
+        op = request.get("op")
+        if op == "checkout":
+            lease, tools = await self.pool.checkout(request["namespace"], request["command"])
+
+            async def _release() -> None:
+                await self.pool.checkin(lease)
+
+            connection.on_close(_release)
+            return {
+                "lease": lease,
+                "tools": [t.model_dump(mode="json", by_alias=True, exclude_none=True) for t in tools],
+            }
+        if op == "call_tool":
+            result = await self.pool.call_tool(
+                request["lease"], request["name"], request.get("arguments") or {}
+            )
+            return result.model_dump(mode="json", by_alias=True, exclude_none=True)
+        if op == "ping":
+            return "pong"
+        if op == "checkin":
+            await self.pool.checkin(request["lease"])
+            return None
+        if op == "status":
+            return self.pool.status()
+        raise ValueError(f"Unknown op '{op}'")
+
+    async def serve_forever(self) -> None:
+        server = await serve_unix(self.socket_path, self.handle)
+        health = asyncio.create_task(self.pool.run_health_checks())
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            health.cancel()
+            await self.pool.close()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--socket", default=DEFAULT_SOCKET, help="Unix socket path to listen on")
+    parser.add_argument("--recycle-after", type=int, default=500, help="Tool calls before a session is recycled")
+    parser.add_argument("--health-interval", type=float, default=30.0, help="Seconds between idle-session pings")
+    parser.add_argument("--min-idle", type=int, default=1, help="Warm spare sessions kept per namespace/command")
+    parser.add_argument("--max-idle", type=int, default=4, help="Idle sessions kept per namespace/command")
+    parser.add_argument("--no-prewarm", action="store_true", help="Do not start the configured servers up front")
+    args = parser.parse_args(argv)
+
+    mcp_cfg = MCPServerConfig.from_env()
+    pool = MCPSessionPool(
+        recycle_after=args.recycle_after,
+        health_interval=args.health_interval,
+        min_idle=args.min_idle,
+        max_idle=args.max_idle,
+        startup_timeout=mcp_cfg.startup_timeout,
+    )
+    daemon = MCPPoolDaemon(args.socket, pool)
+
+    async def _run() -> None:
+        if not args.no_prewarm:
+            errors = await daemon.prewarm(mcp_cfg.commands())
+            for namespace, error in errors.items():
+                print(f"Prewarm failed for {namespace}: {error}", flush=True)
+        print(f"MCP pool listening on {args.socket}", flush=True)
+        await daemon.serve_forever()
+
+    try:
+        asyncio.run(_run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
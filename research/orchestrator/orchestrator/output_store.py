@@ -0,0 +1,71 @@
+"""Spillover store for oversized tool outputs.
+
+A tool output longer than `threshold_chars` is not handed to the model in full.
+The model gets the first `preview_chars` characters and a handle; the whole text
+is kept here, addressed by its content hash, and the synthetic
+`orchestrator__read_output` tool pages through it. Identical outputs share one
+entry. Offsets and lengths are in characters.
+"""
+from __future__ import annotations
+
+import hashlib
+from typing import Any, Dict, Mapping
+
+
+class OutputStore:
+    def __init__(self, threshold_chars: int, preview_chars: int = 2000) -> None:
+        self.threshold_chars = threshold_chars
+        self.preview_chars = min(preview_chars, threshold_chars)
+        self._outputs: Dict[str, str] = {}
+        self._stats = {"spilled": 0, "spilled_chars": 0, "reads": 0, "read_chars": 0, "read_errors": 0}
+
+    def spill(self, text: str) -> str:
+        """`text` itself if small enough, otherwise a preview with a handle to the rest."""
+        if len(text) <= self.threshold_chars:
+            return text
+        handle = self.handle_for(text)
+        self._outputs[handle] = text
+        preview = text[: self.preview_chars]
+        self._stats["spilled"] += 1
+        self._stats["spilled_chars"] += len(text) - len(preview)
+        return (
+            f"{preview}\n\n[Output truncated: showing characters 0-{len(preview)} of {len(text)}. "
+            f'Call orchestrator__read_output with handle="{handle}" and offset={len(preview)} to read more.]'
+        )
+
+    @staticmethod
+    def handle_for(text: str) -> str:
+        return "out_" + hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+    def read(self, arguments: Mapping[str, Any]) -> str:
+        """Answer an `orchestrator__read_output` call."""
+        handle = str(arguments.get("handle", "")) if isinstance(arguments, Mapping) else ""
+        text = self._outputs.get(handle)
+        if text is None:
+            self._stats["read_errors"] += 1
+            return f"Unknown output handle '{handle}'."
+        try:
+            offset = int(arguments.get("offset", 0))
+            length = int(arguments.get("length", self.threshold_chars))
+        except (TypeError, ValueError):
+            self._stats["read_errors"] += 1
+            return "offset and length must be integers."
+        if not 0 <= offset < len(text):
+            self._stats["read_errors"] += 1
+            return f"offset {offset} is out of range: output '{handle}' has {len(text)} characters (offsets 0-{len(text) - 1})."
+        if length < 1:
+            self._stats["read_errors"] += 1
+            return f"length must be at least 1 (got {length})."
+        length = min(length, self.threshold_chars)
+        page = text[offset: offset + length]
+        end = offset + len(page)
+        self._stats["reads"] += 1
+        self._stats["read_chars"] += len(page)
+        if end < len(text):
+            footer = f"[Characters {offset}-{end} of {len(text)}; continue with offset={end}.]"
+        else:
+            footer = f"[Characters {offset}-{end} of {len(text)}; end of output.]"
+        return f"{page}\n\n{footer}"
+
+    def stats(self) -> Dict[str, int]:
+        return {**self._stats, "stored": len(self._outputs)}
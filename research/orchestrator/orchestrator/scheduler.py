@@ -0,0 +1,153 @@
+"""Turn schedulers: which agent takes the next turn.
+
+`RoundRobinScheduler` is the original fixed rotation. `ActivityScheduler` picks the
+agent with the most to react to: unread teammate events, events that mention it
+by name (requests, assignments), and tool work it was in the middle of when its
+last turn ended without a closing message. Agents
+with nothing to react to are skipped without an LLM call, and when no agent has
+anything to react to the run is idle and stops.
+
+Both record the turn order; `stats()` reports it with the LLM calls saved, i.e.
+the idle agents round-robin would have called before reaching the chosen one.
+`next_batch()` picks several distinct agents for turns taken concurrently.
+"""
+from __future__ import annotations
+
+import re
+from typing import Any, Collection, Dict, List, Optional
+
+from .agent_state import AgentState
+
+
+class RoundRobinScheduler:
+    name = "round_robin"
+
+    def __init__(self) -> None:
+        self.turn_order: List[str] = []
+        self.calls_saved = 0
+        self.idle_stop = False
+
+    def next_agent(
+        self, turn: int, agents: List[AgentState], exclude: Collection[str] = ()
+    ) -> Optional[AgentState]:
+        """The agent for `turn`, or None when no agent (outside `exclude`) should run."""
+        agent = agents[turn % len(agents)]
+        if agent.name in exclude:
+            return None
+        self.turn_order.append(agent.name)
+        return agent
+
+    def next_batch(self, turn: int, agents: List[AgentState], size: int) -> List[AgentState]:
+        """Up to `size` distinct agents for turns `turn`, `turn + 1`, ... in order."""
+        batch: List[AgentState] = []
+        for offset in range(min(size, len(agents))):
+            agent = self.next_agent(turn + offset, agents, exclude={a.name for a in batch})
+            if agent is None:
+                break
+            batch.append(agent)
+        return batch
+
+    def record(self, agent: AgentState, tool_calls: List[Any], message: Optional[str]) -> None:
+        """Note the outcome of `agent`'s turn."""
+
+    def stats(self) -> Dict[str, Any]:
+        turns_by_agent: Dict[str, int] = {}
+        for name in self.turn_order:
+            turns_by_agent[name] = turns_by_agent.get(name, 0) + 1
+        return {
+            "scheduler": self.name,
+            "turns": len(self.turn_order),
+            "llm_calls_saved": self.calls_saved,
+            "idle_stop": self.idle_stop,
+            "turns_by_agent": turns_by_agent,
+            "turn_order": list(self.turn_order),
+        }
+
+
+class ActivityScheduler(RoundRobinScheduler):
+    name = "activity"
+
+    def __init__(
+        self,
+        *,
+        event_weight: float = 1.0,
+        mention_weight: float = 3.0,
+        tool_weight: float = 2.0,
+        fresh_weight: float = 1.0,
+        wait_weight: float = 0.1,
+    ) -> None:
+        super().__init__()
+        self.event_weight = event_weight
+        self.mention_weight = mention_weight
+        self.tool_weight = tool_weight
+        # An agent that has not had a turn yet still has its brief to act on
+        self.fresh_weight = fresh_weight
+        # Per turn spent waiting, so a busy agent cannot starve the others
+        self.wait_weight = wait_weight
+        self._last_turn: Dict[str, int] = {}
+        self._working: Dict[str, bool] = {}
+        self._last_index = -1
+
+    def priority(self, agent: AgentState) -> float:
+        """How much `agent` has to react to; 0 means a turn would be wasted."""
+        score = 0.0
+        if agent.name not in self._last_turn:
+            score += self.fresh_weight
+        if self._working.get(agent.name):
+            score += self.tool_weight
+        if agent.event_log is not None:
+            mention = re.compile(rf"\b{re.escape(agent.name)}\b", re.IGNORECASE)
+            for event in agent.event_log.unread(agent.name, agent.event_cursor):
+                score += self.event_weight
+                if mention.search(event.item["content"]):
+                    score += self.mention_weight
+        return score
+
+    def next_agent(
+        self, turn: int, agents: List[AgentState], exclude: Collection[str] = ()
+    ) -> Optional[AgentState]:
+        # Rotation order from the agent after the last one to run; ties go to the earliest
+        count = len(agents)
+        rotation = [
+            (self._last_index + offset) % count
+            for offset in range(1, count + 1)
+            if agents[(self._last_index + offset) % count].name not in exclude
+        ]
+        scores = {index: self.priority(agents[index]) for index in rotation}
+        best: Optional[int] = None
+        best_score = 0.0
+        for index in rotation:
+            score = scores[index]
+            if score <= 0:
+                continue
+            score += self.wait_weight * (turn - self._last_turn.get(agents[index].name, 0))
+            if score > best_score:
+                best, best_score = index, score
+        if best is None:
+            # An empty batch means the whole team is idle; a short one does not
+            self.idle_stop = self.idle_stop or not exclude
+            return None
+        # Round-robin would have called every idle agent before reaching `best`
+        for index in rotation[: rotation.index(best)]:
+            if scores[index] <= 0:
+                self.calls_saved += 1
+        self._last_index = best
+        agent = agents[best]
+        self._last_turn[agent.name] = turn
+        self.turn_order.append(agent.name)
+        return agent
+
+    def record(self, agent: AgentState, tool_calls: List[Any], message: Optional[str]) -> None:
+        # Tool work is ongoing only if the turn stopped mid-task (out of tool rounds)
+        # instead of closing with a message
+        self._working[agent.name] = bool(tool_calls) and not message
+
+
+SCHEDULERS = {RoundRobinScheduler.name: RoundRobinScheduler, ActivityScheduler.name: ActivityScheduler}
+
+
+def make_scheduler(name: str) -> RoundRobinScheduler:
+    try:
+        return SCHEDULERS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown turn scheduler '{name}' (expected one of {tuple(SCHEDULERS)})") from None
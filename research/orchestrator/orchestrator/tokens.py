@@ -0,0 +1,115 @@
+"""Local token counting for request inputs and tool definitions.
+
+"exact" mode uses tiktoken (optional: `uv sync --extra tokens`); "approx" mode
+assumes about four characters per token and needs nothing. Both add a small fixed
+overhead per item for the role/type framing the API wraps around each one.
+"""
+from __future__ import annotations
+
+import json
+from typing import Any, Iterable, List, Optional
+
+try:
+    import tiktoken
+except ImportError:  # optional dependency
+    tiktoken = None
+
+
+APPROX = "approx"
+EXACT = "exact"
+MODES = (APPROX, EXACT)
+
+ITEM_OVERHEAD = 4  # tokens of framing per input item
+TOOL_OVERHEAD = 8  # tokens of framing per tool definition
+FALLBACK_ENCODING = "o200k_base"
+
+
+def item_type(item: Any) -> Optional[str]:
+    return item.get("type") if isinstance(item, dict) else getattr(item, "type", None)
+
+
+def item_field(item: Any, name: str, default: Any = None) -> Any:
+    return item.get(name, default) if isinstance(item, dict) else getattr(item, name, default)
+
+
+class TokenCounter:
+    """Counts tokens of Responses API input items and tool definitions.
+
+    If exact mode is requested but tiktoken or its encoding files are unavailable,
+    the counter falls back to approx mode and records why in `fallback_reason`.
+    """
+
+    def __init__(self, mode: str = APPROX, model: str = "gpt-4o-mini") -> None:
+        if mode not in MODES:
+            raise ValueError(f"Unknown token count mode '{mode}' (expected one of {MODES})")
+        self.mode = mode
+        self.fallback_reason: Optional[str] = None
+        self._encoding = None
+        if mode == EXACT:
+            self._encoding = _load_encoding(model)
+            if isinstance(self._encoding, str):
+                self.fallback_reason = self._encoding
+                self._encoding = None
+                self.mode = APPROX
+
+    def count_text(self, text: Any) -> int:
+        if not text:
+            return 0
+        text = text if isinstance(text, str) else str(text)
+        if self._encoding is not None:
+            return len(self._encoding.encode(text, disallowed_special=()))
+        return (len(text) + 3) // 4
+
+    def count_item(self, item: Any) -> int:
+        """Tokens one input item contributes to a request."""
+        kind = item_type(item)
+        if kind == "function_call":
+            text = f"{item_field(item, 'name', '')}{item_field(item, 'arguments', '')}"
+        elif kind == "function_call_output":
+            text = item_field(item, "output", "")
+        elif kind == "reasoning":
+            # Only the summary text is sent back; raw reasoning tokens are dropped
+            text = " ".join(item_field(part, "text", "") for part in item_field(item, "summary", None) or [])
+        elif kind == "message" or item_field(item, "role") is not None:
+            text = _message_text(item_field(item, "content", ""))
+        elif isinstance(item, str):
+            text = item
+        else:
+            text = _to_json(item)
+        return ITEM_OVERHEAD + self.count_text(text)
+
+    def count_items(self, items: Iterable[Any]) -> int:
+        return sum(self.count_item(item) for item in items)
+
+    def count_tools(self, tools: List[dict]) -> int:
+        """Tokens of the tool definitions sent with every request."""
+        return sum(TOOL_OVERHEAD + self.count_text(_to_json(tool)) for tool in tools)
+
+
+def _load_encoding(model: str) -> Any:
+    """Return a tiktoken encoding, or a string explaining why none is available."""
+    if tiktoken is None:
+        return "tiktoken is not installed (uv sync --extra tokens)"
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding(FALLBACK_ENCODING)
+    except Exception as exc:  # noqa: BLE001 - e.g. encoding files cannot be downloaded
+        return f"tiktoken encoding unavailable: {exc.__class__.__name__}"
+
+
+def _message_text(content: Any) -> str:
+    if isinstance(content, str):
+        return content
+    parts = []
+    for part in content or []:
+        text = item_field(part, "text")
+        parts.append(text if text is not None else _to_json(part))
+    return " ".join(parts)
+
+
+def _to_json(value: Any) -> str:
+    if hasattr(value, "model_dump_json"):
+        return value.model_dump_json(exclude_none=True)
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str)
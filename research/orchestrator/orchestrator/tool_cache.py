@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import fnmatch
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+
+
+CallKey = Tuple[str, str]  # (fq tool name, canonical JSON arguments)
+
+
+def call_key(namespaced_tool: str, arguments: Mapping[str, object]) -> CallKey:
+    """Key a tool call on its name and canonicalized (key-sorted, compact) arguments."""
+    canonical = json.dumps(
+        arguments or {}, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str
+    )
+    return namespaced_tool, canonical
+
+
+class ToolResultCache:
+    """LRU cache of read-only tool results with per-tool TTLs.
+
+    `tool_ttls` maps glob patterns (bare or namespaced tool names) to a TTL in
+    seconds; the first match wins, otherwise `default_ttl` applies. A TTL of 0
+    disables caching for that tool. Entries are invalidated per namespace when a
+    write tool runs there; a namespace generation counter keeps results of reads
+    that were already in flight during the write from being stored.
+    """
+
+    def __init__(
+        self,
+        *,
+        default_ttl: float = 30.0,
+        max_entries: int = 256,
+        tool_ttls: Optional[Mapping[str, float]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._default_ttl = default_ttl
+        self._max_entries = max_entries
+        self._tool_ttls = dict(tool_ttls or {})
+        self._clock = clock
+        self._entries: "OrderedDict[CallKey, Tuple[float, Any]]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self._stats = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0, "invalidations": 0}
+        self._per_tool: Dict[str, Dict[str, int]] = {}
+
+    def ttl_for(self, namespaced_tool: str) -> float:
+        tool_name = namespaced_tool.split(".", 1)[-1]
+        for pattern, ttl in self._tool_ttls.items():
+            if fnmatch.fnmatchcase(namespaced_tool, pattern) or fnmatch.fnmatchcase(tool_name, pattern):
+                return ttl
+        return self._default_ttl
+
+    def generation(self, namespace: str) -> int:
+        return self._generations.get(namespace, 0)
+
+    def get(self, key: CallKey) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] <= self._clock():
+            del self._entries[key]
+            self._stats["expired"] += 1
+            entry = None
+        outcome = "hits" if entry is not None else "misses"
+        self._stats[outcome] += 1
+        tool_stats = self._per_tool.setdefault(key[0], {"hits": 0, "misses": 0})
+        tool_stats[outcome] += 1
+        if entry is None:
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def put(self, key: CallKey, value: Any, *, generation: Optional[int] = None) -> None:
+        namespace = key[0].split(".", 1)[0]
+        if generation is not None and generation != self.generation(namespace):
+            return
+        ttl = self.ttl_for(key[0])
+        if ttl <= 0:
+            return
+        self._entries[key] = (self._clock() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def invalidate_namespace(self, namespace: str) -> int:
+        """Drop every entry for `namespace`; returns how many were removed."""
+        self._generations[namespace] = self.generation(namespace) + 1
+        prefix = f"{namespace}."
+        stale = [key for key in self._entries if key[0].startswith(prefix)]
+        for key in stale:
+            del self._entries[key]
+        self._stats["invalidations"] += 1
+        return len(stale)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self._stats["hits"] + self._stats["misses"]
+        return {
+            **self._stats,
+            "hit_ratio": round(self._stats["hits"] / lookups, 4) if lookups else 0.0,
+            "size": len(self._entries),
+            "per_tool": {name: dict(counts) for name, counts in self._per_tool.items()},
+        }
@@ -0,0 +1,163 @@
+"""Per-agent tool subsets.
+
+Each agent is offered only the tools most relevant to its persona instead of every
+tool from every MCP server. Tools are ranked by namespace affinity (how often the
+persona names the namespace, e.g. "Linear") plus BM25 relevance of the tool's name
+and description to the persona text. Tools outside an agent's subset stay reachable
+through the synthetic `orchestrator__discover_tools` function, which searches the
+same index and adds its matches to the agent's subset.
+"""
+from __future__ import annotations
+
+import math
+import re
+from collections import Counter
+from typing import TYPE_CHECKING, Any, Dict, List, Mapping
+
+from .mcp_manager import NamespacedTool
+
+if TYPE_CHECKING:
+    from .agent_state import AgentState
+
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens; `list_issues` and `ListIssues`-style names split too."""
+    text = re.sub(r"([a-z])([A-Z])", r"\1 \2", text or "")
+    return _WORD.findall(text.lower())
+
+
+class ToolIndex:
+    """BM25 index over tool names and descriptions."""
+
+    def __init__(self, tools: List[NamespacedTool], *, k1: float = 1.2, b: float = 0.75) -> None:
+        self.tools = {tool.fq_name: tool for tool in tools}
+        self._k1 = k1
+        self._b = b
+        self._docs: Dict[str, Counter] = {}
+        for fq, tool in self.tools.items():
+            # The name counts twice: it is the densest description of what a tool does
+            name = f"{tool.namespace} {tool.definition.name}"
+            self._docs[fq] = Counter(tokenize(f"{name} {name} {tool.definition.description or ''}"))
+        lengths = [sum(doc.values()) for doc in self._docs.values()]
+        self._avg_len = sum(lengths) / len(lengths) if lengths else 0.0
+        document_frequency: Counter = Counter()
+        for doc in self._docs.values():
+            document_frequency.update(doc.keys())
+        n = len(self._docs)
+        self._idf = {
+            term: math.log(1 + (n - df + 0.5) / (df + 0.5)) for term, df in document_frequency.items()
+        }
+
+    def scores(self, query: str) -> Dict[str, float]:
+        terms = Counter(term for term in tokenize(query) if term in self._idf)
+        results: Dict[str, float] = {}
+        for fq, doc in self._docs.items():
+            length = sum(doc.values())
+            score = 0.0
+            for term, query_count in terms.items():
+                tf = doc.get(term, 0)
+                if tf:
+                    norm = tf + self._k1 * (1 - self._b + self._b * length / (self._avg_len or 1))
+                    score += query_count * self._idf[term] * tf * (self._k1 + 1) / norm
+            results[fq] = score
+        return results
+
+    def search(self, query: str, limit: int) -> List[NamespacedTool]:
+        """Tools with a positive score for `query`, best first."""
+        scored = sorted(
+            ((score, fq) for fq, score in self.scores(query).items() if score > 0),
+            key=lambda pair: (-pair[0], pair[1]),
+        )
+        return [self.tools[fq] for _, fq in scored[:limit]]
+
+
+def namespace_affinity(text: str, namespaces: List[str]) -> Dict[str, float]:
+    """Mentions of each namespace in `text`, scaled so the most mentioned one is 1.0."""
+    counts = {
+        namespace: len(re.findall(rf"\b{re.escape(namespace)}\b", text, flags=re.IGNORECASE))
+        for namespace in namespaces
+    }
+    top = max(counts.values(), default=0)
+    return {namespace: count / top if top else 0.0 for namespace, count in counts.items()}
+
+
+class ToolSelector:
+    """Chooses each agent's tool subset and serves `orchestrator__discover_tools`.
+
+    `limit` is the subset size per agent. Subsets hold OpenAI tool names (as used
+    in function definitions) and live on `AgentState.tool_subset`; `None` there
+    means the agent sees every tool.
+    """
+
+    def __init__(
+        self, tools: List[NamespacedTool], limit: int, *, affinity_weight: float = 1.0, version: int = 0
+    ) -> None:
+        self.limit = limit
+        self.affinity_weight = affinity_weight
+        self.discoveries: Dict[str, int] = {}
+        self.reindex(tools, version)
+
+    def reindex(self, tools: List[NamespacedTool], version: int) -> None:
+        """Rebuild the index for a new tool list (`MCPManager.tools_version`)."""
+        self.index = ToolIndex(tools)
+        self.version = version
+        self._namespaces = sorted({tool.namespace for tool in tools})
+
+    def rank(self, persona: str) -> List[NamespacedTool]:
+        """Every tool, most relevant to `persona` first."""
+        affinity = namespace_affinity(persona, self._namespaces)
+        relevance = self.index.scores(persona)
+        top = max(relevance.values(), default=0.0) or 1.0
+        ranked = sorted(
+            self.index.tools.items(),
+            key=lambda pair: (
+                -(self.affinity_weight * affinity[pair[1].namespace] + relevance[pair[0]] / top),
+                pair[0],
+            ),
+        )
+        return [tool for _, tool in ranked]
+
+    def assign(self, agent: "AgentState", persona: str) -> List[str]:
+        agent.tool_subset = [_openai_name(tool) for tool in self.rank(persona)[: self.limit]]
+        return agent.tool_subset
+
+    def discover(self, agent: "AgentState", arguments: Mapping[str, Any]) -> str:
+        """Search every tool for `query`; matches join the agent's subset from the next round."""
+        query = str(arguments.get("query", "")) if isinstance(arguments, Mapping) else ""
+        try:
+            limit = max(1, min(int(arguments.get("limit", 5)), 20))
+        except (TypeError, ValueError, AttributeError):
+            limit = 5
+        matches = self.index.search(query, limit)
+        if not matches:
+            return f"No tools match '{query}'."
+        subset = agent.tool_subset
+        added = 0
+        for tool in matches:
+            name = _openai_name(tool)
+            if subset is not None and name not in subset:
+                subset.append(name)
+                added += 1
+        self.discoveries[agent.name] = self.discoveries.get(agent.name, 0) + added
+        lines = [f"- {_openai_name(tool)}: {tool.definition.description or ''}".rstrip() for tool in matches]
+        return "Tools now available:\n" + "\n".join(lines)
+
+    def stats(self, agents: List["AgentState"]) -> Dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "tools": len(self.index.tools),
+            "agents": {
+                agent.name: {
+                    "subset": len(agent.tool_subset) if agent.tool_subset is not None else None,
+                    "discovered": self.discoveries.get(agent.name, 0),
+                }
+                for agent in agents
+            },
+        }
+
+
+def _openai_name(tool: NamespacedTool) -> str:
+    return tool.fq_name.replace(".", "__")
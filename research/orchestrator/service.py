@@ -0,0 +1,300 @@
+"""
+Orchestrator as a long-running service with a job API.
+
+Start it once:
+
+    python service.py --socket /tmp/orchestrator.sock --max-jobs 4
+
+It loads config, builds one `OpenAIClient` and connects one `MCPManager` up front,
+then runs submitted jobs concurrently on them, so a job pays no process start,
+config load or MCP handshake. The API is newline-delimited JSON over a Unix socket
+(see `orchestrator.ipc`); ops:
+
+    submit(scenario | world_prompt, personas?, run?, run_id?) -> {"job": id}
+        `run` overrides RunConfig fields, e.g. {"max_turns": 10}; unknown fields
+        and values of the wrong type are rejected with code 400
+    status(job) -> job summary            list() -> every job summary
+    health() -> MCP health probes and startup profile, taken once at start-up
+    cancel(job) -> job summary
+    stream(job) -> pushes {"job", "event"} for each run-log record (from the first
+        one) and answers with the job summary once the job is over
+
+Example client:
+
+    client = IPCClient("/tmp/orchestrator.sock", on_push=print)
+    await client.connect()
+    job = (await client.request("submit", scenario="bug_triage", run={"max_turns": 6}))["job"]
+    print(await client.request("stream", job=job))
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import time
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Any, Dict, List, Optional, get_type_hints
+
+import main as orchestrator_main
+from examples import SCENARIOS
+from orchestrator.config import Config, RunConfig, load_config
+from orchestrator.ipc import IPCConnection, serve_unix
+from orchestrator.llm import OpenAIClient
+from orchestrator.mcp_manager import MCPManager
+
+
+DEFAULT_SOCKET = "/tmp/orchestrator.sock"
+
+QUEUED, RUNNING, SUCCEEDED, FAILED, CANCELLED = "queued", "running", "succeeded", "failed", "cancelled"
+FINAL_STATES = (SUCCEEDED, FAILED, CANCELLED)
+
+# RunConfig field types, for checking job overrides before a job is accepted
+RUN_FIELDS: Dict[str, type] = get_type_hints(RunConfig)
+
+
+def parse_run_overrides(run: Any) -> Dict[str, Any]:
+    """Check job `run` overrides against the RunConfig fields and their types."""
+    if run is None:
+        return {}
+    if not isinstance(run, dict):
+        raise ValueError("run must be an object of RunConfig fields")
+    unknown = set(run) - set(RUN_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown run config fields: {sorted(unknown)}")
+    overrides: Dict[str, Any] = {}
+    for name, value in run.items():
+        expected = RUN_FIELDS[name]
+        if expected is Path:
+            valid = isinstance(value, str)
+            value = Path(value) if valid else value
+        else:
+            # bool is an int subclass, but true is not a turn count
+            valid = isinstance(value, expected) and not (expected is int and isinstance(value, bool))
+        if not valid:
+            type_name = "str" if expected is Path else expected.__name__
+            raise ValueError(f"run.{name} must be {type_name}, got {type(value).__name__}: {value!r}")
+        overrides[name] = value
+    return overrides
+
+
+@dataclass
+class Job:
+    id: str
+    world_prompt: str
+    personas: Optional[Dict[str, str]]
+    run: RunConfig
+    run_id: Optional[str] = None
+    status: str = QUEUED
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    submitted: float = field(default_factory=time.time)
+    started: Optional[float] = None
+    finished: Optional[float] = None
+    # Every run-log record so far; streams replay them before following live ones
+    events: List[Dict[str, Any]] = field(default_factory=list, repr=False)
+    subscribers: List[asyncio.Queue] = field(default_factory=list, repr=False)
+    task: Optional[asyncio.Task] = field(default=None, repr=False)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "job": self.id,
+            "status": self.status,
+            "run_id": self.run_id,
+            "submitted": self.submitted,
+            "started": self.started,
+            "finished": self.finished,
+            "events": len(self.events),
+            "result": self.result,
+            "error": self.error,
+        }
+
+    def publish(self, event: Optional[Dict[str, Any]]) -> None:
+        """Hand a run-log record (or None: the job is over) to every stream."""
+        if event is not None:
+            self.events.append(event)
+        for queue in self.subscribers:
+            queue.put_nowait(event)
+
+
+class OrchestratorService:
+    """Runs orchestrator jobs concurrently on one warm LLM client and MCP manager.
+
+    At most `max_jobs` jobs run at once; later ones wait queued. Finished jobs are
+    kept for status and stream replay, the oldest dropped beyond `keep_finished`.
+    """
+
+    def __init__(
+        self,
+        cfg: Config,
+        *,
+        llm: Optional[OpenAIClient] = None,
+        mcp: Optional[MCPManager] = None,
+        max_jobs: int = 4,
+        keep_finished: int = 100,
+    ) -> None:
+        self.cfg = cfg
+        self.llm = llm or OpenAIClient(cfg.openai)
+        self.mcp = mcp or MCPManager(cfg.mcp)
+        self._slots = asyncio.Semaphore(max_jobs)
+        self._keep_finished = keep_finished
+        self._jobs: Dict[str, Job] = {}
+        self._ids = itertools.count(1)
+        self.startup: Dict[str, Any] = {}
+
+    async def start(self) -> None:
+        # Jobs share the manager, so servers are probed here once rather than per job
+        await self.mcp.connect_all()
+        self.startup = await orchestrator_main.probe_servers(self.mcp)
+
+    async def close(self) -> None:
+        for job in self._jobs.values():
+            if job.task is not None:
+                job.task.cancel()
+        await asyncio.gather(*(job.task for job in self._jobs.values() if job.task), return_exceptions=True)
+        await self.mcp.close()
+
+    def submit(
+        self,
+        *,
+        scenario: Optional[str] = None,
+        world_prompt: Optional[str] = None,
+        personas: Optional[Dict[str, str]] = None,
+        run: Optional[Dict[str, Any]] = None,
+        run_id: Optional[str] = None,
+    ) -> Job:
+        if world_prompt is None:
+            if scenario not in SCENARIOS:
+                raise ValueError(f"Unknown scenario '{scenario}' (expected one of {tuple(SCENARIOS)})")
+            world_prompt = SCENARIOS[scenario]
+        overrides = parse_run_overrides(run)
+        job_id = f"job{next(self._ids):04d}"
+        job = Job(job_id, world_prompt, personas, replace(self.cfg.run, **overrides), run_id or job_id)
+        self._jobs[job_id] = job
+        job.task = asyncio.create_task(self._run(job))
+        return job
+
+    def get(self, job_id: str) -> Job:
+        job = self._jobs.get(job_id)
+        if job is None:
+            raise ValueError(f"Unknown job '{job_id}'")
+        return job
+
+    def jobs(self) -> List[Job]:
+        return list(self._jobs.values())
+
+    async def cancel(self, job_id: str) -> Job:
+        job = self.get(job_id)
+        if job.task is not None and not job.task.done():
+            job.task.cancel()
+            await asyncio.gather(job.task, return_exceptions=True)
+        return job
+
+    async def stream(self, job_id: str, connection: IPCConnection) -> Dict[str, Any]:
+        """Push the job's run-log records to `connection` until the job is over."""
+        job = self.get(job_id)
+        queue: asyncio.Queue = asyncio.Queue()
+        # Replay and subscribe in one step, so no record is missed or sent twice
+        for event in job.events:
+            queue.put_nowait(event)
+        if job.status in FINAL_STATES:
+            queue.put_nowait(None)
+        else:
+            job.subscribers.append(queue)
+        try:
+            while (event := await queue.get()) is not None:
+                await connection.send({"job": job.id, "event": event})
+        finally:
+            if queue in job.subscribers:
+                job.subscribers.remove(queue)
+        return job.summary()
+
+    async def handle(self, request: Dict[str, Any], connection: IPCConnection) -> Any:
+        op = request.get("op")
+        if op == "submit":
+            job = self.submit(
+                scenario=request.get("scenario"),
+                world_prompt=request.get("world_prompt"),
+                personas=request.get("personas"),
+                run=request.get("run"),
+                run_id=request.get("run_id"),
+            )
+            return job.summary()
+        if op == "status":
+            return self.get(request["job"]).summary()
+        if op == "list":
+            return [job.summary() for job in self.jobs()]
+        if op == "health":
+            return self.startup
+        if op == "cancel":
+            return (await self.cancel(request["job"])).summary()
+        if op == "stream":
+            return await self.stream(request["job"], connection)
+        if op == "ping":
+            return "pong"
+        raise ValueError(f"Unknown op '{op}'")
+
+    async def serve_forever(self, socket_path: str) -> None:
+        server = await serve_unix(socket_path, self.handle)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            await self.close()
+
+    async def _run(self, job: Job) -> None:
+        try:
+            async with self._slots:
+                job.status = RUNNING
+                job.started = time.time()
+                cfg = replace(self.cfg, run=job.run)
+                job.result = await orchestrator_main.main(
+                    job.world_prompt,
+                    cfg=cfg,
+                    llm=self.llm,
+                    mcp=self.mcp,
+                    own_mcp=False,
+                    run_id=job.run_id,
+                    personas=job.personas,
+                    on_event=job.publish,
+                )
+                job.status = SUCCEEDED
+        except asyncio.CancelledError:
+            job.status = CANCELLED
+        except Exception as exc:  # noqa: BLE001
+            job.status = FAILED
+            job.error = str(exc) or type(exc).__name__
+        finally:
+            job.finished = time.time()
+            job.publish(None)
+            self._forget_finished()
+
+    def _forget_finished(self) -> None:
+        finished = [job for job in self._jobs.values() if job.status in FINAL_STATES]
+        for job in finished[: max(0, len(finished) - self._keep_finished)]:
+            del self._jobs[job.id]
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Orchestrator job service")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET, help="Unix socket path to listen on")
+    parser.add_argument("--max-jobs", type=int, default=4, help="Jobs running at once")
+    parser.add_argument("--keep-finished", type=int, default=100, help="Finished jobs kept for status and replay")
+    parser.add_argument("--verbose", action="store_true", help="Keep the runs' (interleaved) console output")
+    args = parser.parse_args(argv)
+    orchestrator_main.console.quiet = not args.verbose
+
+    async def _run() -> None:
+        service = OrchestratorService(load_config(), max_jobs=args.max_jobs, keep_finished=args.keep_finished)
+        await service.start()
+        print(f"Orchestrator service listening on {args.socket}", flush=True)
+        await service.serve_forever(args.socket)
+
+    try:
+        asyncio.run(_run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
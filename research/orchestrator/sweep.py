@@ -0,0 +1,239 @@
+"""
+Parameter sweep: run scenarios across models, temperatures and seeds.
+
+Every cell of the grid (scenario x model x temperature x seed) is one orchestrator
+run with its own log. Cells are fanned out across a process pool, each worker
+running its cell in its own asyncio loop, while one cross-process semaphore caps
+the LLM requests in flight across all workers. Each finished cell is appended to
+one results file (JSON lines) as it completes; re-running the same command skips
+cells already recorded there as "ok", so an interrupted sweep resumes where it
+stopped. Failed cells are retried.
+
+Usage:
+    python sweep.py --scenarios bug_triage hello_ticket --models gpt-4o-mini gpt-4.1-mini \\
+        --temperatures 0 0.7 --seeds 1 2 3 --workers 4 --max-in-flight 8
+
+Temperatures and seeds accept "none" for the model default / no seed. Other
+settings (MAX_TURNS, MCP commands, ...) come from the environment as usual; with
+OPENAI_CASSETTE_MODE set, each cell records to or replays its own cassette.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+import main as orchestrator_main
+from examples import SCENARIOS
+from orchestrator.config import load_config
+from orchestrator.llm import OpenAIClient
+
+
+@dataclass(frozen=True)
+class SweepCell:
+    scenario: str
+    model: str
+    temperature: Optional[float]
+    seed: Optional[int]
+
+    @property
+    def key(self) -> str:
+        return f"{self.scenario}|{self.model}|{self.temperature}|{self.seed}"
+
+    @property
+    def run_id(self) -> str:
+        """Log and cassette file suffix."""
+        return f"{self.model}_t{self.temperature}_s{self.seed}".replace("/", "-")
+
+
+def build_grid(
+    scenarios: Iterable[str],
+    models: Iterable[str],
+    temperatures: Iterable[Optional[float]],
+    seeds: Iterable[Optional[int]],
+) -> List[SweepCell]:
+    models, temperatures, seeds = list(models), list(temperatures), list(seeds)
+    return [
+        SweepCell(scenario, model, temperature, seed)
+        for scenario in scenarios
+        for model in models
+        for temperature in temperatures
+        for seed in seeds
+    ]
+
+
+def load_done(results_path: Path) -> Set[str]:
+    """Keys of cells recorded as "ok"; a line cut short by an interrupt is ignored."""
+    done: Set[str] = set()
+    if not results_path.exists():
+        return done
+    with results_path.open(encoding="utf-8") as results:
+        for line in results:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if record.get("status") == "ok":
+                done.add(record["key"])
+    return done
+
+
+class RequestGate:
+    """`OpenAIClient` wrapper holding a slot of a cross-process semaphore per request."""
+
+    # Seconds between non-blocking attempts at a slot while all are taken
+    POLL_S = 0.05
+
+    def __init__(self, llm: Any, slots: Any) -> None:
+        self._llm = llm
+        self._slots = slots
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._llm, name)
+
+    async def respond_with_tools(self, *args: Any, **kwargs: Any) -> Any:
+        await self._acquire()
+        try:
+            return await self._llm.respond_with_tools(*args, **kwargs)
+        finally:
+            self._slots.release()
+
+    async def complete(self, *args: Any, **kwargs: Any) -> Any:
+        await self._acquire()
+        try:
+            return await self._llm.complete(*args, **kwargs)
+        finally:
+            self._slots.release()
+
+    async def _acquire(self) -> None:
+        # A blocking acquire() would stall the event loop, so poll without blocking;
+        # a cancelled request stops at the sleep holding nothing, so no slot leaks
+        while not self._slots.acquire(False):
+            await asyncio.sleep(self.POLL_S)
+
+
+# Set in each worker process by `_init_worker`
+_request_slots: Any = None
+
+
+def _init_worker(slots: Any) -> None:
+    global _request_slots
+    _request_slots = slots
+    # Output from several runs per worker would interleave; the run logs have it all
+    orchestrator_main.console.quiet = True
+
+
+def run_cell(cell: SweepCell) -> Dict[str, Any]:
+    """Worker entry point: run one cell in a fresh event loop and return its record."""
+    started = time.perf_counter()
+    record: Dict[str, Any] = {"key": cell.key, **asdict(cell)}
+    try:
+        record.update(asyncio.run(_run_cell(cell)))
+        record["status"] = "ok"
+    except Exception as exc:
+        record.update({"status": "error", "error": str(exc) or type(exc).__name__})
+    record["wall_s"] = round(time.perf_counter() - started, 2)
+    return record
+
+
+async def _run_cell(cell: SweepCell) -> Dict[str, Any]:
+    cfg = load_config()
+    cfg.openai.model = cell.model
+    cfg.openai.temperature = cell.temperature
+    cfg.openai.seed = cell.seed
+    if cfg.openai.cassette_mode:
+        # cassettes/openai.jsonl.gz -> cassettes/openai_<scenario>_<run id>.jsonl.gz
+        path = cfg.openai.cassette_path
+        suffixes = "".join(path.suffixes)
+        stem = path.name[: len(path.name) - len(suffixes)]
+        cfg.openai.cassette_path = path.with_name(f"{stem}_{cell.scenario}_{cell.run_id}{suffixes}")
+    llm: Any = OpenAIClient(cfg.openai)
+    if _request_slots is not None:
+        llm = RequestGate(llm, _request_slots)
+    return await orchestrator_main.main(SCENARIOS[cell.scenario], cfg=cfg, llm=llm, run_id=cell.run_id)
+
+
+def run_sweep(
+    cells: List[SweepCell],
+    results_path: Path,
+    *,
+    workers: int,
+    max_in_flight: int,
+    runner: Callable[[SweepCell], Dict[str, Any]] = run_cell,
+) -> Dict[str, int]:
+    """Run every cell not yet done, appending each record to `results_path` as it finishes."""
+    done = load_done(results_path)
+    pending = [cell for cell in cells if cell.key not in done]
+    results_path.parent.mkdir(parents=True, exist_ok=True)
+    counts = {"cells": len(cells), "skipped": len(cells) - len(pending), "ok": 0, "error": 0}
+    if not pending:
+        return counts
+
+    context = multiprocessing.get_context()
+    slots = context.BoundedSemaphore(max_in_flight)
+    pool = ProcessPoolExecutor(
+        max_workers=min(workers, len(pending)), mp_context=context, initializer=_init_worker, initargs=(slots,)
+    )
+    try:
+        with results_path.open("a", encoding="utf-8") as results:
+            if results.tell() and not results_path.read_bytes().endswith(b"\n"):
+                # Start clear of a line cut short by an interrupted sweep
+                results.write("\n")
+            futures = {pool.submit(runner, cell): cell for cell in pending}
+            for future in as_completed(futures):
+                cell = futures[future]
+                try:
+                    record = future.result()
+                except Exception as exc:
+                    # The worker itself died (e.g. killed); the cell is retried on resume
+                    record = {"key": cell.key, **asdict(cell), "status": "error", "error": str(exc) or type(exc).__name__}
+                results.write(json.dumps(record, ensure_ascii=False) + "\n")
+                results.flush()
+                counts["ok" if record["status"] == "ok" else "error"] += 1
+                detail = (
+                    f"{record.get('outcome')}, {record.get('turns')} turns"
+                    if record["status"] == "ok"
+                    else record.get("error")
+                )
+                print(f"  [{counts['ok'] + counts['error']}/{len(pending)}] {cell.key}: {record['status']} ({detail})")
+    except KeyboardInterrupt:
+        pool.shutdown(wait=False, cancel_futures=True)
+        raise
+    pool.shutdown()
+    return counts
+
+
+def _optional(cast: Callable[[str], Any]) -> Callable[[str], Any]:
+    return lambda value: None if value.lower() == "none" else cast(value)
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run a scenario x model x temperature x seed sweep")
+    parser.add_argument("--scenarios", nargs="+", default=["hello_ticket"], choices=sorted(SCENARIOS))
+    parser.add_argument("--models", nargs="+", default=["gpt-4o-mini"])
+    parser.add_argument("--temperatures", nargs="+", type=_optional(float), default=[0.3])
+    parser.add_argument("--seeds", nargs="+", type=_optional(int), default=[None])
+    parser.add_argument("--workers", type=int, default=4, help="Worker processes")
+    parser.add_argument("--max-in-flight", type=int, default=8, help="LLM requests in flight across all workers")
+    parser.add_argument("--results", type=Path, default=Path("runs/sweep_results.jsonl"), help="Aggregated results (JSON lines)")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args(sys.argv[1:])
+    grid = build_grid(args.scenarios, args.models, args.temperatures, args.seeds)
+    print(f"🚀 Sweep of {len(grid)} cells, {args.workers} workers, {args.max_in_flight} LLM requests in flight")
+    summary = run_sweep(
+        grid, args.results, workers=max(1, args.workers), max_in_flight=max(1, args.max_in_flight)
+    )
+    print(
+        f"Done: {summary['ok']} ok, {summary['error']} failed, {summary['skipped']} already done. "
+        f"Results in {args.results}"
+    )
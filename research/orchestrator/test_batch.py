@@ -0,0 +1,50 @@
+"""
+Checks that batch runs in examples.py share one MCP manager, write one log per run
+and report per-run turns and tokens.
+
+Run with: python test_batch.py
+"""
+
+import asyncio
+import tempfile
+from pathlib import Path
+
+from benchmark import ScriptedLLM, build_fake_mcp
+from examples import run_batch
+from orchestrator.config import Config, MCPServerConfig, OpenAIConfig, RunConfig
+
+
+def test_batch_runs_share_clients_and_log_separately():
+    log_dir = Path(tempfile.mkdtemp(prefix="orchestrator-batch-"))
+    cfg = Config(
+        openai=OpenAIConfig(api_key="offline", model="scripted"),
+        mcp=MCPServerConfig(),
+        run=RunConfig(max_turns=4, max_tool_rounds=3, log_dir=log_dir),
+    )
+    mcp = build_fake_mcp(cfg.mcp, 0.0, 200)
+    connects = []
+    connect_all = mcp.connect_all
+
+    async def counting_connect_all():
+        connects.append(1)
+        return await connect_all()
+
+    mcp.connect_all = counting_connect_all
+    rows = asyncio.run(
+        run_batch(["hello_ticket", "bug_triage"], 2, 3, cfg=cfg, llm=ScriptedLLM(calls_per_turn=1), mcp=mcp)
+    )
+
+    assert len(connects) == 1
+    assert [(row["scenario"], row["repeat"]) for row in rows] == [
+        ("hello_ticket", 1), ("hello_ticket", 2), ("bug_triage", 1), ("bug_triage", 2)
+    ]
+    assert all(row["outcome"] == "max_turns" and row["turns"] == 4 and row["input_tokens"] > 0 for row in rows)
+    assert len({row["log_path"] for row in rows}) == 4
+    assert sorted(path.name.rsplit("_", 1)[1] for path in log_dir.iterdir()) == [
+        "run001.jsonl", "run002.jsonl", "run003.jsonl", "run004.jsonl"
+    ]
+
+
+if __name__ == "__main__":
+    test_batch_runs_share_clients_and_log_separately()
+    print("ALL TESTS PASSED ✅")
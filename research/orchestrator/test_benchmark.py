@@ -0,0 +1,46 @@
+"""
+Smoke test for benchmark.py: a few turns of the real loop against the scripted
+LLM and the in-process fake MCP servers, sequential and concurrent.
+
+Run with: python test_benchmark.py
+"""
+
+import asyncio
+
+import benchmark
+
+
+def _run(*argv):
+    benchmark.orchestrator_main.console.quiet = True
+    try:
+        return asyncio.run(benchmark.run_benchmark(benchmark.parse_args(list(argv))))
+    finally:
+        benchmark.orchestrator_main.console.quiet = False
+
+
+def test_sequential_turns_are_recorded():
+    report = _run("--agents", "2", "--turns", "4", "--calls-per-turn", "3")
+    summary, turns = report["summary"], report["turns"]
+    assert summary["turns"] == 4 and [t["turn"] for t in turns] == [1, 2, 3, 4]
+    # One request per tool call plus the closing message, every turn
+    assert summary["llm_requests"] == 4 * (3 + 1)
+    assert all(t["cpu_ms"] >= 0 and t["log_ms"] >= 0 for t in turns)
+    # Tool outputs and messages accumulate in the agents' histories
+    sizes = [t["inputs_bytes"] for t in turns]
+    assert sizes == sorted(sizes) and sizes[0] < sizes[-1] == summary["inputs_bytes_final"]
+    assert summary["inputs_bytes_growth_per_turn"] > 0 and summary["request_bytes_total"] > 0
+
+
+def test_parallel_calls_and_concurrent_turns():
+    report = _run("--turns", "4", "--calls-per-turn", "3", "--parallel-tool-calls", "--concurrent-turns", "2")
+    summary = report["summary"]
+    assert summary["turns"] == 4
+    # All of a turn's tool calls go out in one round
+    assert summary["llm_requests"] == 4 * 2
+    assert report["config"]["concurrent_turns"] == 2
+
+
+if __name__ == "__main__":
+    test_sequential_turns_are_recorded()
+    test_parallel_calls_and_concurrent_turns()
+    print("ALL TESTS PASSED ✅")
@@ -0,0 +1,94 @@
+"""
+Checks that OpenAIClient cassettes replay a recorded conversation without network
+access and report mismatching requests precisely.
+
+Run with: python test_cassette.py
+"""
+
+import asyncio
+import tempfile
+from pathlib import Path
+
+from openai.types.responses import Response
+
+from orchestrator.cassette import CassetteMismatchError
+from orchestrator.config import OpenAIConfig
+from orchestrator.llm import OpenAIClient
+
+
+TOOLS = [{"type": "function", "name": "linear__list_teams", "description": "List teams", "parameters": {"type": "object"}}]
+
+
+def _response(index, output):
+    return Response.model_validate(
+        {
+            "id": f"resp_{index}",
+            "object": "response",
+            "created_at": 0,
+            "model": "gpt-4o-mini",
+            "output": output,
+            "parallel_tool_calls": False,
+            "tool_choice": "auto",
+            "tools": [],
+        }
+    )
+
+
+class FakeResponses:
+    def __init__(self):
+        self.calls = 0
+
+    async def create(self, **kwargs):
+        self.calls += 1
+        if self.calls == 1:
+            return _response(1, [
+                {"type": "function_call", "id": "fc_1", "call_id": "c1", "name": "linear__list_teams", "arguments": "{}", "status": "completed"}
+            ])
+        return _response(2, [
+            {"type": "message", "id": "msg_1", "role": "assistant", "status": "completed",
+             "content": [{"type": "output_text", "text": "Found team ENG", "annotations": []}]}
+        ])
+
+
+async def _conversation(client):
+    inputs = [{"role": "system", "content": "system"}, {"role": "user", "content": "hi"}]
+    first = await client.respond_with_tools(inputs, TOOLS)
+    inputs.extend(first.output)
+    inputs.append({"type": "function_call_output", "call_id": "c1", "output": "ENG"})
+    second = await client.respond_with_tools(inputs, TOOLS)
+    return first, second
+
+
+def test_record_then_replay():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "run.jsonl.gz"
+
+        recorder = OpenAIClient(OpenAIConfig(api_key="sk-test", cassette_mode="record", cassette_path=path))
+        fake = FakeResponses()
+        recorder._client.responses = fake
+        recorded = asyncio.run(_conversation(recorder))
+        assert fake.calls == 2 and recorder.cassette_stats()["recorded"] == 2
+
+        player = OpenAIClient(OpenAIConfig(api_key="", cassette_mode="replay", cassette_path=path))
+        assert player._client is None
+        replayed = asyncio.run(_conversation(player))
+        assert [r.id for r in replayed] == [r.id for r in recorded]
+        assert replayed[1].output_text == "Found team ENG"
+
+        async def diverging():
+            inputs = [{"role": "system", "content": "system"}, {"role": "user", "content": "hello"}]
+            await player.respond_with_tools(inputs, TOOLS)
+
+        try:
+            asyncio.run(diverging())
+        except CassetteMismatchError as err:
+            report = str(err)
+        else:
+            raise AssertionError("expected a cassette mismatch")
+        assert "input[1] differs" in report
+        assert '"content":"hi"' in report and '"content":"hello"' in report
+
+
+if __name__ == "__main__":
+    test_record_then_replay()
+    print("ALL TESTS PASSED ✅")
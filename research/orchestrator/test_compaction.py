@@ -0,0 +1,118 @@
+"""
+Checks that ContextCompactor keeps agent histories under budget without splitting
+function_call/function_call_output pairs or touching the system prompt, and that
+each request's log records only the tokens saved since the agent's previous one.
+
+Run with: python test_compaction.py
+"""
+
+import asyncio
+import json
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+
+import benchmark
+from main import main
+from orchestrator.agent_state import AgentState
+from orchestrator.compaction import SUMMARY_HEADER, ContextCompactor, build_spans
+from orchestrator.config import Config, MCPServerConfig, OpenAIConfig, RunConfig
+from orchestrator.prompts import HELLO_TICKET_WORLD
+from orchestrator.tokens import item_type
+
+
+def _function_call(call_id):
+    return SimpleNamespace(type="function_call", call_id=call_id, name="linear__list_issues", arguments="{}")
+
+
+def _reasoning():
+    return SimpleNamespace(type="reasoning", summary=[])
+
+
+def _assert_pairs_intact(agent):
+    calls = [i.call_id for i in agent.inputs if item_type(i) == "function_call"]
+    outputs = [i["call_id"] for i in agent.inputs if item_type(i) == "function_call_output"]
+    assert calls == outputs
+
+
+def test_spans_keep_responses_with_their_outputs():
+    inputs = [
+        {"role": "user", "content": "hi"},
+        _reasoning(),
+        _function_call("c1"),
+        _function_call("c2"),
+        {"type": "function_call_output", "call_id": "c1", "output": "a"},
+        {"type": "function_call_output", "call_id": "c2", "output": "b"},
+        {"role": "user", "content": "planner: next"},
+    ]
+    assert build_spans(inputs) == [[0], [1, 2, 3, 4, 5], [6]]
+
+
+def test_history_stays_under_budget():
+    compactor = ContextCompactor(400, keep_recent=2)
+    agent = AgentState("engineer", "system prompt " * 20, compactor=compactor)
+    agent.receive("planner: please triage the open bugs")
+    for turn in range(30):
+        agent.add_output_items([_reasoning(), _function_call(f"c{turn}")])
+        agent.add_function_output(f"c{turn}", f"issue ENG-{turn} " + "details " * 20)
+        agent.receive(f"planner: ack {turn}")
+        assert agent.total_tokens() <= 400
+        _assert_pairs_intact(agent)
+
+    assert agent.compactions > 1 and agent.tokens_saved > 0
+    assert agent.build_inputs()[0] == {"role": "system", "content": "system prompt " * 20}
+    summary = agent.inputs[0]["content"]
+    assert summary.startswith(SUMMARY_HEADER) and len(summary) <= compactor.summary_max_chars
+    assert "called linear__list_issues" in summary
+    assert agent.history_tokens == sum(agent.item_tokens)
+    assert len(agent.item_tokens) == len(agent.inputs)
+
+
+def test_open_calls_are_never_compacted():
+    compactor = ContextCompactor(50, keep_recent=0, mode="drop")
+    agent = AgentState("engineer", "system", compactor=compactor)
+    agent.add_output_items([_function_call("c1")])
+    agent.receive("planner: " + "x" * 400)  # over budget while c1 is still running
+    assert item_type(agent.inputs[0]) == "function_call"
+    agent.add_function_output("c1", "done")
+    assert agent.context_summary is None
+    assert all(item_type(i) != "function_call" for i in agent.inputs)
+
+
+def test_request_timings_log_per_request_savings():
+    log_dir = Path(tempfile.mkdtemp(prefix="orchestrator-compaction-"))
+    cfg = Config(
+        openai=OpenAIConfig(api_key="offline", model="scripted"),
+        mcp=MCPServerConfig(),
+        run=RunConfig(max_turns=8, max_tool_rounds=3, context_token_budget=1500, compaction_keep_recent=2, log_dir=log_dir),
+    )
+    result = asyncio.run(
+        main(
+            HELLO_TICKET_WORLD,
+            cfg=cfg,
+            llm=benchmark.ScriptedLLM(calls_per_turn=2),
+            mcp=benchmark.build_fake_mcp(cfg.mcp, 0.0, 2000),
+        )
+    )
+
+    records = [json.loads(line) for line in Path(result["log_path"]).read_text(encoding="utf-8").splitlines()]
+    (stats,) = [record for record in records if record["type"] == "compaction_stats"]
+    for name, totals in stats["agents"].items():
+        saved = [
+            timing["tokens_saved"]
+            for record in records
+            if record.get("agent") == name
+            for timing in record.get("rounds", [])
+        ]
+        # Savings after an agent's last request are only in the run totals
+        assert sum(saved) <= totals["tokens_saved"]
+        assert len([tokens for tokens in saved if tokens]) > 1
+    assert any(totals["compactions"] > 1 for totals in stats["agents"].values())
+
+
+if __name__ == "__main__":
+    test_spans_keep_responses_with_their_outputs()
+    test_history_stays_under_budget()
+    test_open_calls_are_never_compacted()
+    test_request_timings_log_per_request_savings()
+    print("ALL TESTS PASSED ✅")
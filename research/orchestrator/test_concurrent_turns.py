@@ -0,0 +1,61 @@
+"""
+Checks that when one of a batch of concurrent turns fails, its batch-mates are
+cancelled before the run closes its MCP sessions and log.
+
+Run with: python test_concurrent_turns.py
+"""
+
+import asyncio
+import tempfile
+from pathlib import Path
+
+from benchmark import ScriptedLLM, build_fake_mcp
+from main import main
+from orchestrator.config import Config, MCPServerConfig, OpenAIConfig, RunConfig
+from orchestrator.prompts import HELLO_TICKET_WORLD
+
+
+class FailingFirstLLM(ScriptedLLM):
+    """The first request fails quickly; every other one is slow."""
+
+    def __init__(self):
+        super().__init__(calls_per_turn=1)
+        self.started = 0
+        self.completed = 0
+
+    async def respond_with_tools(self, inputs, tools, **kwargs):
+        self.started += 1
+        if self.started == 1:
+            await asyncio.sleep(0.01)
+            raise RuntimeError("API error")
+        await asyncio.sleep(0.2)
+        response = await super().respond_with_tools(inputs, tools, **kwargs)
+        self.completed += 1
+        return response
+
+
+def test_failed_turn_cancels_batch_mates():
+    cfg = Config(
+        openai=OpenAIConfig(api_key="offline", model="scripted"),
+        mcp=MCPServerConfig(),
+        run=RunConfig(max_turns=4, concurrent_turns=2, log_dir=Path(tempfile.mkdtemp(prefix="orchestrator-batch-"))),
+    )
+    llm = FailingFirstLLM()
+
+    async def _run():
+        try:
+            await main(HELLO_TICKET_WORLD, cfg=cfg, llm=llm, mcp=build_fake_mcp(cfg.mcp, 0.0, 200))
+        except RuntimeError as exc:
+            assert str(exc) == "API error"
+        else:
+            raise AssertionError("the failed turn did not fail the run")
+        # Had the batch-mate kept running, its request would complete by now
+        await asyncio.sleep(0.3)
+
+    asyncio.run(_run())
+    assert llm.started == 2 and llm.completed == 0
+
+
+if __name__ == "__main__":
+    test_failed_turn_cancels_batch_mates()
+    print("ALL TESTS PASSED ✅")
@@ -0,0 +1,259 @@
+"""
+Checks for the tool-execution loop in `_drive_agent_turn`, using scripted stand-ins
+for the LLM and MCP manager so no network or MCP servers are needed.
+
+Run with: python test_drive_agent_turn.py
+"""
+
+import asyncio
+import json
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+
+from main import _drive_agent_turn
+from orchestrator.agent_state import AgentState
+from orchestrator.llm import ResponseChainError
+from orchestrator.logger import RunLogger
+
+
+def _function_call(name, call_id, **arguments):
+    return SimpleNamespace(
+        type="function_call", name=name, call_id=call_id, arguments=json.dumps(arguments)
+    )
+
+
+def _message(text):
+    return SimpleNamespace(
+        type="message", content=[SimpleNamespace(type="output_text", text=text)]
+    )
+
+
+class ScriptedLLM:
+    def __init__(self, rounds):
+        self._rounds = list(rounds)
+        self.parallel_flags = []
+
+    async def respond_with_tools(self, inputs, tools, *, parallel_tool_calls=False, **_):
+        self.parallel_flags.append(parallel_tool_calls)
+        return SimpleNamespace(output=self._rounds.pop(0), usage=None)
+
+
+class StreamingLLM(ScriptedLLM):
+    """Emits each output item through the streaming callbacks, then keeps generating."""
+
+    def __init__(self, rounds, tail_delay):
+        super().__init__(rounds)
+        self._tail_delay = tail_delay
+        self.completed_at = []
+
+    async def respond_with_tools(self, inputs, tools, *, on_output_item=None, on_text_delta=None, timings=None, **kwargs):
+        response = await super().respond_with_tools(inputs, tools, **kwargs)
+        timings["ttft_s"] = 0.0
+        for item in response.output:
+            if item.type == "message":
+                on_text_delta(item.content[0].text)
+            on_output_item(item)
+        await asyncio.sleep(self._tail_delay)
+        self.completed_at.append(asyncio.get_running_loop().time())
+        return response
+
+
+class ChainingLLM(ScriptedLLM):
+    """Records what each request sends; optionally forgets stored responses."""
+
+    def __init__(self, rounds, lose_chain_at=None):
+        super().__init__(rounds)
+        self.requests = []
+        self._lose_chain_at = lose_chain_at
+
+    async def respond_with_tools(self, inputs, tools, *, previous_response_id=None, **kwargs):
+        self.requests.append((previous_response_id, list(inputs)))
+        if previous_response_id and len(self.requests) == self._lose_chain_at:
+            raise ResponseChainError("Previous response not found")
+        response = await super().respond_with_tools(inputs, tools, **kwargs)
+        response.id = f"resp_{len(self.requests)}"
+        return response
+
+
+class SlowMCP:
+    """Fake manager whose calls finish in reverse order of submission."""
+
+    def __init__(self, delays):
+        self._delays = delays
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.started_at = []
+
+    def openai_tools(self, canonical=False, names=None, extra_tools=()):
+        self.canonical = canonical
+        return []
+
+    def resolve_openai_tool_name(self, name):
+        return name.replace("__", ".")
+
+    async def call(self, fq, arguments):
+        self.started_at.append(asyncio.get_running_loop().time())
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self._delays.get(fq, 0))
+            if fq == "linear.broken":
+                raise RuntimeError("boom")
+            return f"{fq} ok", None
+        finally:
+            self.in_flight -= 1
+
+
+def _run(llm, mcp, parallel, **kwargs):
+    agent = AgentState("engineer", "system")
+    teammate = AgentState("planner", "system")
+    result = asyncio.run(
+        _drive_agent_turn(
+            agent, [teammate], llm, mcp, max_tool_rounds=4, parallel_tool_calls=parallel, **kwargs
+        )
+    )
+    return agent, teammate, result
+
+
+def test_parallel_round_keeps_call_order():
+    llm = ScriptedLLM(
+        [
+            [
+                _function_call("linear__list_teams", "c1"),
+                _function_call("linear__broken", "c2"),
+                _function_call("smartsheet__list_sheets", "c3"),
+            ],
+            [_message("done")],
+        ]
+    )
+    mcp = SlowMCP({"linear.list_teams": 0.05, "linear.broken": 0.02})
+    agent, teammate, (message, calls, outputs, _) = _run(llm, mcp, parallel=True)
+
+    assert llm.parallel_flags == [True, True]
+    assert mcp.peak_in_flight == 3
+    assert message == "done"
+    fc_outputs = [i for i in agent.inputs if isinstance(i, dict) and i.get("type") == "function_call_output"]
+    assert [o["call_id"] for o in fc_outputs] == ["c1", "c2", "c3"]
+    assert fc_outputs[1]["output"] == "boom"
+    assert [c.name for c in calls] == ["linear.list_teams", "smartsheet.list_sheets"]
+    assert [o["name"] for o in outputs] == ["linear.list_teams", "linear.broken", "smartsheet.list_sheets"]
+    assert "error" in outputs[1]
+    assert "engineer tool linear.broken failed: boom" in teammate.inputs[1]["content"]
+
+
+def test_finish_skips_later_calls():
+    for parallel in (False, True):
+        llm = ScriptedLLM(
+            [
+                [
+                    _function_call("linear__list_teams", "c1"),
+                    _function_call("orchestrator__finish", "c2", summary="all done"),
+                    _function_call("linear__list_issues", "c3"),
+                ]
+            ]
+        )
+        mcp = SlowMCP({})
+        _, teammate, (message, calls, outputs, _) = _run(llm, mcp, parallel=parallel)
+        assert message == "__RUN_FINISHED__"
+        assert [c.name for c in calls] == ["linear.list_teams", "orchestrator.finish"]
+        assert teammate.inputs[-1]["content"] == "engineer finished: all done"
+
+
+def test_streaming_dispatches_before_response_completes():
+    llm = StreamingLLM(
+        [
+            [
+                _function_call("linear__list_teams", "c1"),
+                _function_call("orchestrator__finish", "c2", summary="all done"),
+                _function_call("linear__list_issues", "c3"),
+            ]
+        ],
+        tail_delay=0.05,
+    )
+    mcp = SlowMCP({"linear.list_teams": 0.05})
+    timings = []
+    _, _, (message, calls, _, _) = _run(llm, mcp, parallel=False, stream=True, round_timings=timings)
+
+    assert message == "__RUN_FINISHED__"
+    assert len(mcp.started_at) == 1  # nothing dispatched after the finish call
+    assert mcp.started_at[0] < llm.completed_at[0]
+    assert [c.name for c in calls] == ["linear.list_teams", "orchestrator.finish"]
+    assert timings[0]["ttft_s"] == 0.0
+    assert timings[0]["first_dispatch_s"] < timings[0]["response_s"]
+
+
+def test_chaining_sends_only_new_items():
+    for lose_chain_at in (None, 3):
+        llm = ChainingLLM(
+            [
+                [_function_call("linear__list_teams", "c1")],
+                [_message("found ENG")],
+                [_message("next")],
+            ],
+            lose_chain_at=lose_chain_at,
+        )
+        agent = AgentState("engineer", "system")
+        agent.receive("hello")
+        turn = _drive_agent_turn(agent, [], llm, SlowMCP({}), max_tool_rounds=4, chain_responses=True)
+        asyncio.run(turn)
+        agent.receive("planner: please continue")
+        timings = []
+        turn = _drive_agent_turn(
+            agent, [], llm, SlowMCP({}), max_tool_rounds=4, chain_responses=True, round_timings=timings
+        )
+        asyncio.run(turn)
+
+        first, second, third = llm.requests[:3]
+        assert first[0] is None and len(first[1]) == 2  # system prompt + greeting
+        assert second[0] == "resp_1" and [i["type"] for i in second[1]] == ["function_call_output"]
+        assert third[0] == "resp_2" and third[1] == [{"role": "user", "content": "planner: please continue"}]
+        if lose_chain_at is None:
+            assert len(llm.requests) == 3 and timings[0]["saved_bytes"] > 0
+        else:
+            # The full history is resent after the stored response was lost
+            previous, resent = llm.requests[3]
+            assert previous is None and len(resent) == len(agent.inputs)
+            assert timings[0]["chain_lost"] and timings[0]["saved_bytes"] == 0
+            assert agent.last_response_id == "resp_4"
+
+
+class CachingLLM(ScriptedLLM):
+    def __init__(self, rounds):
+        super().__init__(rounds)
+        self.cache_keys = []
+
+    async def respond_with_tools(self, inputs, tools, *, prompt_cache_key=None, **kwargs):
+        self.cache_keys.append(prompt_cache_key)
+        response = await super().respond_with_tools(inputs, tools, **kwargs)
+        details = SimpleNamespace(cached_tokens=300 if len(self.cache_keys) > 1 else 0)
+        response.usage = SimpleNamespace(input_tokens=400, input_tokens_details=details)
+        return response
+
+
+def test_prompt_cache_key_and_cached_tokens_reporting():
+    llm = CachingLLM([[_function_call("linear__list_teams", "c1")], [_message("done")]])
+    mcp = SlowMCP({})
+    timings = []
+    agent, _, (message, calls, outputs, usage) = _run(
+        llm, mcp, parallel=False, prompt_cache_key="hello_ticket:engineer", round_timings=timings
+    )
+    assert llm.cache_keys == ["hello_ticket:engineer"] * 2 and mcp.canonical
+    assert [t["cached_tokens"] for t in timings] == [0, 300]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        logger = RunLogger(Path(tmp))
+        logger.log_turn(1, agent.name, message, calls, outputs, None, rounds=timings)
+        logger.close()
+        stats = logger.prompt_cache_stats()
+    assert stats["agents"]["engineer"] == {"input_tokens": 800, "cached_tokens": 300, "hit_ratio": 0.375}
+    assert stats["run"]["hit_ratio"] == 0.375
+
+
+if __name__ == "__main__":
+    test_parallel_round_keeps_call_order()
+    test_finish_skips_later_calls()
+    test_streaming_dispatches_before_response_completes()
+    test_chaining_sends_only_new_items()
+    test_prompt_cache_key_and_cached_tokens_reporting()
+    print("ALL TESTS PASSED ✅")
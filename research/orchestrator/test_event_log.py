@@ -0,0 +1,129 @@
+"""
+Checks that team broadcasts are stored once in the shared event log, that each
+agent's view reads them lazily, in order, without its own events, and that digests
+condense teammate activity into one update. Broadcasts held during concurrent turns
+are merged in scheduled order.
+
+Run with: python test_event_log.py
+"""
+
+import json
+
+from orchestrator.agent_state import AgentState
+from orchestrator.digest import DIGEST_HEADER
+from orchestrator.event_log import SharedEventLog
+from orchestrator.tokens import TokenCounter
+
+
+def _team(*names, digest_chars=0):
+    log = SharedEventLog(digest_chars=digest_chars)
+    agents = [AgentState(name, "system", token_counter=TokenCounter(), event_log=log) for name in names]
+    return log, agents
+
+
+def test_views_share_items_and_skip_own_events():
+    log, (alex, sam, jordan) = _team("alex", "sam", "jordan")
+    alex.broadcast("alex: kickoff", [sam, jordan])
+    sam.broadcast("sam tool linear.list_teams: ENG", [alex, jordan])
+    assert sam.inputs == [] and jordan.inputs == []  # nothing copied until read
+
+    jordan_inputs = jordan.build_inputs()
+    sam.sync_events()
+    alex.sync_events()
+    assert [i["content"] for i in jordan_inputs[1:]] == ["alex: kickoff", "sam tool linear.list_teams: ENG"]
+    assert [i["content"] for i in sam.inputs] == ["alex: kickoff"]
+    assert [i["content"] for i in alex.inputs] == ["sam tool linear.list_teams: ENG"]
+    assert sam.inputs[0] is jordan.inputs[0]  # one item, referenced by both views
+    assert jordan.total_tokens() == jordan.token_counter.count_items(jordan.build_inputs())
+
+
+def test_cursor_and_repeated_broadcasts():
+    log, (alex, sam) = _team("alex", "sam")
+    alex.broadcast("alex: ping", [sam])
+    sam.sync_events()
+    sam.respond("pong")
+    alex.broadcast("alex: ping", [sam])
+    sam.sync_events()
+    assert [i["content"] for i in sam.inputs] == ["alex: ping", "pong", "alex: ping"]
+    assert sam.inputs[0] is sam.inputs[2]
+    assert log.stats() == {
+        "events": 2, "unique_items": 1, "content_chars": len("alex: ping"), "digests": 0, "digested_events": 0
+    }
+
+
+def test_without_log_broadcast_copies_to_teammates():
+    alex, sam = AgentState("alex", "system"), AgentState("sam", "system")
+    alex.broadcast("alex: hi", [sam])
+    assert sam.inputs == [{"role": "user", "content": "alex: hi"}]
+
+
+def _tool(agent, fq, arguments, output):
+    agent.broadcast(
+        f"{agent.name} tool {fq}: {output}", [], kind="tool",
+        details={"tool": fq, "arguments": arguments, "output": output},
+    )
+
+
+def test_digest_condenses_activity_since_last_turn():
+    log, (alex, sam, jordan) = _team("alex", "sam", "jordan", digest_chars=1000)
+    alex.broadcast("alex: I'll file the ticket", [])
+    for _ in range(3):
+        _tool(alex, "linear.list_teams", {"limit": 5}, json.dumps({"teams": [{"id": "team_eng"}]}))
+    _tool(alex, "linear.create_issue", {"title": "Hello"}, json.dumps({"id": "ENG-7", "state": "Todo"}))
+    _tool(sam, "linear.update_issue", {"issue_id": "ENG-1", "state": "Done"}, json.dumps({"id": "ENG-1"}))
+    _tool(sam, "smartsheet.add_sheet_row", {"sheet_id": 101}, json.dumps({"sheet_id": 101, "row_id": 1001}))
+    sam.broadcast("sam tool linear.delete_issue failed: boom", [], kind="tool_error",
+                  details={"tool": "linear.delete_issue", "arguments": {}, "error": "boom"})
+
+    jordan.sync_events()
+    assert len(jordan.inputs) == 1
+    digest = jordan.inputs[0]["content"]
+    assert digest.startswith(DIGEST_HEADER) and len(digest) <= 1000
+    assert "- alex: I'll file the ticket" in digest
+    assert "- alex linear.create_issue: ENG-7" in digest
+    assert "- sam smartsheet.add_sheet_row: 101, 1001" in digest
+    assert "- sam linear.update_issue ENG-1: state=Done" in digest
+    assert "- sam linear.delete_issue: boom" in digest
+    assert "- alex: linear.list_teams x3" in digest
+    assert log.stats()["digested_events"] == 8
+
+    # A single new event needs no digest
+    alex.broadcast("alex: done", [])
+    jordan.sync_events()
+    assert jordan.inputs[-1]["content"] == "alex: done"
+
+
+def test_digest_respects_size_cap():
+    log, (alex, sam) = _team("alex", "sam", digest_chars=300)
+    for i in range(40):
+        _tool(alex, "linear.create_issue", {"title": f"t{i}"}, json.dumps({"id": f"ENG-{i}"}))
+    sam.sync_events()
+    digest = sam.inputs[0]["content"]
+    assert len(digest) <= 300 and "more updates omitted" in digest
+
+
+def test_held_broadcasts_merge_in_batch_order():
+    log, (alex, sam, jordan) = _team("alex", "sam", "jordan")
+    log.hold()
+    # sam's turn finishes first, but alex was scheduled first
+    sam.broadcast("sam: sheet ready", [])
+    alex.broadcast("alex: ticket filed", [])
+    alex.broadcast("alex: assigned to jordan", [])
+    sam.sync_events()
+    assert sam.inputs == [] and len(log) == 0  # batch-mates see nothing before the barrier
+    log.release(["alex", "sam"])
+
+    jordan.sync_events()
+    assert [i["content"] for i in jordan.inputs] == ["alex: ticket filed", "alex: assigned to jordan", "sam: sheet ready"]
+    alex.broadcast("alex: next", [])  # no longer held
+    assert len(log) == 4
+
+
+if __name__ == "__main__":
+    test_views_share_items_and_skip_own_events()
+    test_cursor_and_repeated_broadcasts()
+    test_without_log_broadcast_copies_to_teammates()
+    test_digest_condenses_activity_since_last_turn()
+    test_digest_respects_size_cap()
+    test_held_broadcasts_merge_in_batch_order()
+    print("ALL TESTS PASSED ✅")
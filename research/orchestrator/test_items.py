@@ -0,0 +1,67 @@
+"""
+Checks for compact output-item storage in AgentState and the reasoning prune policy.
+
+Run with: python test_items.py
+"""
+
+from openai.types.responses import ResponseFunctionToolCall, ResponseOutputMessage, ResponseReasoningItem
+
+from orchestrator.agent_state import AgentState
+from orchestrator.cassette import to_jsonable
+from orchestrator.items import FunctionCallItem, compact_item, to_wire
+from orchestrator.tokens import TokenCounter
+
+
+def _response(n):
+    return [
+        ResponseReasoningItem(type="reasoning", id=f"rs_{n}", summary=[{"type": "summary_text", "text": "thinking " * 20}]),
+        ResponseFunctionToolCall(
+            type="function_call", id=f"fc_{n}", call_id=f"c{n}", name="linear__list_issues", arguments="{}", status="completed"
+        ),
+    ]
+
+
+def test_wire_form_matches_sdk_dump():
+    items = [
+        *_response(1),
+        ResponseOutputMessage(
+            type="message", id="msg_1", role="assistant", status="completed",
+            content=[{"type": "output_text", "text": "hi", "annotations": []}],
+        ),
+    ]
+    for item in items:
+        compact = compact_item(item)
+        assert compact.type == item.type and not hasattr(compact, "__dict__")
+        assert to_wire(compact) == item.model_dump(mode="json", exclude_none=True) == to_jsonable(compact)
+    assert compact_item(items[1]).call_id == "c1"
+    assert to_wire({"role": "user", "content": "x"}) == {"role": "user", "content": "x"}
+
+
+def test_agent_stores_compact_items():
+    agent = AgentState("engineer", "system", token_counter=TokenCounter())
+    agent.add_output_items(_response(1))
+    assert isinstance(agent.inputs[1], FunctionCallItem)
+    assert agent.total_tokens() == agent.token_counter.count_items(agent.build_inputs())
+
+
+def test_prune_keeps_recent_reasoning():
+    agent = AgentState("engineer", "system", token_counter=TokenCounter(), reasoning_keep=1)
+    for n in range(3):
+        agent.add_output_items(_response(n))
+        agent.add_function_output(f"c{n}", "ok")
+        agent.advance_chain(f"resp_{n}", 0)
+
+    kinds = [getattr(item, "type", None) or item["type"] for item in agent.inputs]
+    assert kinds == ["function_call", "function_call_output"] * 2 + ["reasoning", "function_call", "function_call_output"]
+    # Calls whose reasoning was dropped no longer reference it by id
+    assert [agent.inputs[i].id for i in (0, 2, 5)] == [None, None, "fc_2"]
+    assert agent.reasoning_pruned == 2
+    assert agent.chain_cursor == len(agent.inputs)
+    assert agent.total_tokens() == agent.token_counter.count_items(agent.build_inputs())
+
+
+if __name__ == "__main__":
+    test_wire_form_matches_sdk_dump()
+    test_agent_stores_compact_items()
+    test_prune_keeps_recent_reasoning()
+    print("ALL TESTS PASSED ✅")
@@ -0,0 +1,320 @@
+"""
+Checks the MCP session pool and its daemon against in-memory FastMCP servers:
+checkout/checkin reuse, recycling, health probing, reconnect after a broken
+transport, the IPC framing, refusing a socket a live server is on, and
+`PooledServerHandle` talking to the daemon.
+
+Run with: python test_mcp_pool.py
+"""
+
+import asyncio
+import os
+import socket
+import tempfile
+from contextlib import AsyncExitStack
+
+from mcp.server.fastmcp import FastMCP
+from mcp.shared.memory import create_connected_server_and_client_session
+
+from orchestrator.ipc import IPCClient, IPCError, serve_unix
+from orchestrator.mcp_manager import MCPServerHandle, PooledServerHandle
+from orchestrator.mcp_pool import MCPPoolDaemon, MCPSessionPool
+
+
+class InProcessHandle(MCPServerHandle):
+    """Handle on a FastMCP server in this process; `broken` fails pings and calls."""
+
+    def __init__(self, namespace, server):
+        super().__init__(namespace, f"in-process:{namespace}")
+        self._server = server
+        self.broken = False
+        self.closed = False
+
+    async def _open_session(self, stack: AsyncExitStack):
+        return await stack.enter_async_context(
+            create_connected_server_and_client_session(self._server, message_handler=self._handle_message)
+        )
+
+    async def ping(self):
+        if self.broken:
+            raise ConnectionError("server went away")
+        await super().ping()
+
+    async def call_tool(self, name, arguments):
+        if self.broken:
+            raise ConnectionError("server went away")
+        return await super().call_tool(name, arguments)
+
+    async def close(self):
+        self.closed = True
+        await super().close()
+
+
+def _pool(**kwargs):
+    server = FastMCP("linear")
+
+    @server.tool()
+    def list_teams() -> str:
+        return "ENG"
+
+    handles = []
+
+    def make_handle(namespace, _command):
+        handles.append(InProcessHandle(namespace, server))
+        return handles[-1]
+
+    kwargs.setdefault("min_idle", 0)
+    return MCPSessionPool(handle_factory=make_handle, **kwargs), handles
+
+
+def _text(result):
+    return result.content[0].text
+
+
+def test_checkin_makes_session_reusable():
+    async def run():
+        pool, handles = _pool()
+        lease, tools = await pool.checkout("linear", "cmd")
+        assert [tool.name for tool in tools] == ["list_teams"]
+        assert _text(await pool.call_tool(lease, "list_teams", {})) == "ENG"
+        await pool.checkin(lease)
+        second, _ = await pool.checkout("linear", "cmd")
+        assert second != lease
+        status = pool.status()
+        assert status["spawned"] == 1 and status["reused"] == 1
+        assert status["leased"] == {second: 1}
+        # A different command is a different server: no reuse across keys
+        other, _ = await pool.checkout("linear", "other-cmd")
+        assert pool.status()["spawned"] == 2
+        try:
+            await pool.call_tool(lease, "list_teams", {})
+        except RuntimeError as exc:
+            assert "expired lease" in str(exc)
+        else:
+            raise AssertionError("checked-in lease still usable")
+        for held in (second, other):
+            await pool.checkin(held)
+        await pool.close()
+        assert all(handle.closed for handle in handles)
+
+    asyncio.run(run())
+
+
+def test_sessions_are_recycled_after_their_call_budget():
+    async def run():
+        pool, handles = _pool(recycle_after=2)
+        lease, _ = await pool.checkout("linear", "cmd")
+        for _ in range(2):
+            await pool.call_tool(lease, "list_teams", {})
+        await pool.checkin(lease)
+        assert handles[0].closed
+        assert pool.status()["recycled"] == 1
+
+        # A session at its budget that is still idle is recycled on checkout, not leased
+        lease, _ = await pool.checkout("linear", "cmd")
+        await pool.checkin(lease)
+        pool._idle[("linear", "cmd")][0].calls = 2
+        lease, _ = await pool.checkout("linear", "cmd")
+        await asyncio.sleep(0)
+        status = pool.status()
+        assert status["recycled"] == 2 and status["reused"] == 0
+        assert status["leased"] == {lease: 0}
+        await pool.close()
+
+    asyncio.run(run())
+
+
+def test_unhealthy_idle_sessions_are_replaced():
+    async def run():
+        pool, handles = _pool(health_interval=0.01, min_idle=1)
+        await pool.warm("linear", "cmd")
+        handles[0].broken = True
+        health = asyncio.create_task(pool.run_health_checks())
+        for _ in range(100):
+            await asyncio.sleep(0.01)
+            if len(handles) > 1 and pool.status()["idle"] == {"linear|cmd": 1}:
+                break
+        health.cancel()
+        assert handles[0].closed and not handles[1].closed
+        assert pool.status()["health_failures"] >= 1
+
+        # A checkout skips an idle session that fails its ping
+        handles[1].broken = True
+        lease, _ = await pool.checkout("linear", "cmd")
+        assert _text(await pool.call_tool(lease, "list_teams", {})) == "ENG"
+        await pool.close()
+
+    asyncio.run(run())
+
+
+def test_broken_transport_reconnects_under_the_same_lease():
+    async def run():
+        pool, handles = _pool()
+        lease, _ = await pool.checkout("linear", "cmd")
+        handles[0].broken = True
+        try:
+            await pool.call_tool(lease, "list_teams", {})
+        except ConnectionError:
+            pass
+        else:
+            raise AssertionError("transport failure was swallowed")
+        # The failed call is surfaced, not retried; the lease now has a fresh session
+        assert pool.status()["reconnected"] == 1
+        assert _text(await pool.call_tool(lease, "list_teams", {})) == "ENG"
+        await asyncio.sleep(0)
+        assert handles[0].closed
+
+        # If the server cannot be restarted either, the original failure is chained
+        handles[1].broken = True
+        original_connect = InProcessHandle.connect
+
+        async def failing_connect(self):
+            raise OSError("spawn failed")
+
+        InProcessHandle.connect = failing_connect
+        try:
+            await pool.call_tool(lease, "list_teams", {})
+        except RuntimeError as exc:
+            assert "server went away" in str(exc) and "spawn failed" in str(exc)
+            assert isinstance(exc.__cause__, ConnectionError)
+        else:
+            raise AssertionError("failed restart was not reported")
+        finally:
+            InProcessHandle.connect = original_connect
+        assert pool.status()["leased"] == {}
+        await pool.close()
+
+    asyncio.run(run())
+
+
+def test_ipc_framing():
+    async def run():
+        async def handler(request, connection):
+            if request["op"] == "echo":
+                await connection.send({"push": request["value"]})
+                await asyncio.sleep(request.get("delay", 0))
+                return {"value": request["value"], "text": "naïve\nline"}
+            raise ValueError(f"Unknown op '{request['op']}'")
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "ipc.sock")
+            server = await serve_unix(path, handler)
+            pushes = []
+            client = IPCClient(path, on_push=pushes.append)
+            await client.connect()
+            # Replies are matched by id, so a slow request does not hold up a fast one
+            slow = asyncio.create_task(client.request("echo", value=1, delay=0.05))
+            fast = await client.request("echo", value=2)
+            assert fast == {"value": 2, "text": "naïve\nline"}
+            assert not slow.done()
+            assert (await slow)["value"] == 1
+            assert sorted(push["push"] for push in pushes) == [1, 2]
+            try:
+                await client.request("nope")
+            except IPCError as exc:
+                assert "Unknown op 'nope'" in str(exc)
+            else:
+                raise AssertionError("handler error was not raised")
+
+            # A malformed line is answered with an error and the connection stays up
+            reader, writer = await asyncio.open_unix_connection(path)
+            writer.write(b"{not json\n")
+            await writer.drain()
+            assert b'"ok": false' in await reader.readline()
+            writer.close()
+            assert (await client.request("echo", value=3))["value"] == 3
+
+            server.close()
+            await server.wait_closed()
+            await client.close()
+            try:
+                await client.request("echo", value=4)
+            except IPCError:
+                pass
+            else:
+                raise AssertionError("request on a closed client succeeded")
+
+    asyncio.run(run())
+
+
+def test_socket_of_a_live_server_is_not_taken_over():
+    async def run():
+        async def handler(request, connection):
+            return "pong"
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "ipc.sock")
+            # A socket file left behind by a server that died is replaced
+            stale = socket.socket(socket.AF_UNIX)
+            stale.bind(path)
+            stale.close()
+            server = await serve_unix(path, handler)
+            try:
+                await serve_unix(path, handler)
+            except RuntimeError as exc:
+                assert "already listening" in str(exc)
+            else:
+                raise AssertionError("second server took over a live socket")
+            client = IPCClient(path)
+            await client.connect()
+            assert await client.request("ping") == "pong"
+            await client.close()
+            server.close()
+            await server.wait_closed()
+
+    asyncio.run(run())
+
+
+def test_pooled_server_handle_through_the_daemon():
+    async def run():
+        pool, handles = _pool()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "pool.sock")
+            daemon = MCPPoolDaemon(path, pool)
+            server = await serve_unix(path, daemon.handle)
+
+            handle = PooledServerHandle("linear", "cmd", path)
+            tools = await handle.connect()
+            assert [tool.name for tool in tools] == ["list_teams"]
+            assert [tool.name for tool in await handle.list_tools()] == ["list_teams"]
+            assert _text(await handle.call_tool("list_teams", {})) == "ENG"
+            await handle.ping()
+            assert pool.status()["leased"] == {handle._lease: 1}
+            await handle.close()
+            assert pool.status()["leased"] == {}
+
+            # The next run reuses the warm session instead of starting a server
+            again = PooledServerHandle("linear", "cmd", path)
+            await again.connect()
+            assert pool.status()["spawned"] == 1 and pool.status()["reused"] == 1
+            # A client that disconnects without checking in gives its lease back
+            await again._client.close()
+            for _ in range(50):
+                if not pool.status()["leased"]:
+                    break
+                await asyncio.sleep(0.01)
+            assert pool.status()["leased"] == {}
+
+            server.close()
+            await server.wait_closed()
+            await pool.close()
+        try:
+            await PooledServerHandle("linear", "cmd", path).connect()
+        except RuntimeError as exc:
+            assert "not reachable" in str(exc)
+        else:
+            raise AssertionError("connected to a stopped daemon")
+        assert len(handles) == 1
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    test_checkin_makes_session_reusable()
+    test_sessions_are_recycled_after_their_call_budget()
+    test_unhealthy_idle_sessions_are_replaced()
+    test_broken_transport_reconnects_under_the_same_lease()
+    test_ipc_framing()
+    test_socket_of_a_live_server_is_not_taken_over()
+    test_pooled_server_handle_through_the_daemon()
+    print("ALL TESTS PASSED ✅")
@@ -0,0 +1,141 @@
+"""
+Checks MCP startup: servers connect concurrently, one that hangs past
+MCP_STARTUP_TIMEOUT or raises is reported and skipped without holding up the
+others, health probes skip missing servers, and the run logs a startup_profile.
+
+Run with: python test_mcp_startup.py
+"""
+
+import asyncio
+import json
+import tempfile
+import time
+from pathlib import Path
+
+import benchmark
+from main import main
+from orchestrator.config import Config, MCPServerConfig, OpenAIConfig, RunConfig
+from orchestrator.mcp_manager import MCPManager
+from orchestrator.prompts import HELLO_TICKET_WORLD
+
+
+class HangingHandle:
+    def __init__(self, namespace):
+        self.namespace = namespace
+        self.timings = {}
+        self.closed = False
+
+    async def connect(self):
+        await asyncio.sleep(3600)
+
+    async def close(self):
+        self.closed = True
+
+
+class RaisingHandle(HangingHandle):
+    async def connect(self):
+        self.timings["initialize"] = 0.001
+        raise OSError("No such file or directory: 'smartsheet-mcp'")
+
+
+def _manager(smartsheet_handle, linear_handle=None, startup_timeout=0.2):
+    """Fake Linear server; Smartsheet (and optionally Linear) replaced by the given handle types."""
+    servers = {"linear": benchmark.build_fake_linear(0.0, 100)}
+    handles = {}
+
+    def make_handle(namespace, _command):
+        if namespace == "smartsheet":
+            handles[namespace] = smartsheet_handle(namespace)
+        elif linear_handle is not None:
+            handles[namespace] = linear_handle(namespace)
+        else:
+            handles[namespace] = benchmark.InProcessServerHandle(namespace, servers[namespace])
+        return handles[namespace]
+
+    return MCPManager(MCPServerConfig(startup_timeout=startup_timeout), handle_factory=make_handle), handles
+
+
+def test_hanging_server_times_out_without_blocking_others():
+    async def run():
+        manager, handles = _manager(HangingHandle)
+        started = time.perf_counter()
+        tools = await manager.connect_all()
+        elapsed = time.perf_counter() - started
+        try:
+            return manager, handles, tools, elapsed, await manager.health_probe()
+        finally:
+            await manager.close()
+
+    manager, handles, tools, elapsed, health = asyncio.run(run())
+    assert elapsed < 1.0
+    assert tools and all(tool.namespace == "linear" for tool in tools)
+    assert manager.startup_errors == {"smartsheet": "startup timed out after 0.2s"}
+    assert handles["smartsheet"].closed
+    servers = manager.startup_profile["servers"]
+    assert servers["smartsheet"]["status"] == "failed"
+    assert servers["linear"]["status"] == "ok" and servers["linear"]["tools"] == len(tools)
+    assert "initialize_s" in servers["linear"] and "list_tools_s" in servers["linear"]
+    # Only the server that started is probed
+    assert list(health) == ["linear.list_teams"]
+    assert not health["linear.list_teams"].startswith("[probe-error]")
+    assert set(manager.startup_profile["probes"]) == {"linear.list_teams"}
+
+
+def test_raising_server_is_reported_with_its_error():
+    async def run():
+        manager, handles = _manager(RaisingHandle)
+        try:
+            await manager.connect_all()
+        finally:
+            await manager.close()
+        return manager, handles
+
+    manager, handles = asyncio.run(run())
+    assert manager.startup_errors == {"smartsheet": "No such file or directory: 'smartsheet-mcp'"}
+    assert handles["smartsheet"].closed
+    # Phases a failed server got through are still profiled
+    assert manager.startup_profile["servers"]["smartsheet"]["initialize_s"] == 0.001
+
+
+def test_no_server_started_is_an_error():
+    async def run():
+        manager, _ = _manager(RaisingHandle, linear_handle=HangingHandle, startup_timeout=0.05)
+        try:
+            await manager.connect_all()
+        finally:
+            await manager.close()
+
+    try:
+        asyncio.run(run())
+    except RuntimeError as exc:
+        assert "No MCP server could be started" in str(exc)
+        assert "linear: startup timed out" in str(exc) and "smartsheet: No such file" in str(exc)
+    else:
+        raise AssertionError("connect_all succeeded with every server down")
+
+
+def test_run_logs_startup_profile():
+    log_dir = Path(tempfile.mkdtemp(prefix="orchestrator-startup-"))
+    cfg = Config(
+        openai=OpenAIConfig(api_key="offline", model="scripted"),
+        mcp=MCPServerConfig(),
+        run=RunConfig(max_turns=1, max_tool_rounds=2, log_dir=log_dir),
+    )
+    manager, _ = _manager(HangingHandle)
+    result = asyncio.run(main(HELLO_TICKET_WORLD, cfg=cfg, llm=benchmark.ScriptedLLM(), mcp=manager))
+
+    records = [json.loads(line) for line in Path(result["log_path"]).read_text(encoding="utf-8").splitlines()]
+    (profile,) = [record for record in records if record["type"] == "startup_profile"]
+    assert profile["errors"] == {"smartsheet": "startup timed out after 0.2s"}
+    assert profile["servers"]["linear"]["status"] == "ok"
+    assert profile["connect_all_s"] < 1.0
+    assert set(profile["probes"]) == {"linear.list_teams"}
+    assert result["turns"] == 1
+
+
+if __name__ == "__main__":
+    test_hanging_server_times_out_without_blocking_others()
+    test_raising_server_is_reported_with_its_error()
+    test_no_server_started_is_an_error()
+    test_run_logs_startup_profile()
+    print("ALL TESTS PASSED ✅")
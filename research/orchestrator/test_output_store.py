@@ -0,0 +1,146 @@
+"""
+Checks that oversized tool outputs are replaced by a preview and a handle, and that
+orchestrator__read_output pages through the stored text.
+
+Run with: python test_output_store.py
+"""
+
+import asyncio
+import json
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+
+from mcp.types import CallToolResult, TextContent, Tool
+
+import benchmark
+from main import _drive_agent_turn, main
+from orchestrator.agent_state import AgentState
+from orchestrator.config import Config, MCPServerConfig, OpenAIConfig, RunConfig
+from orchestrator.mcp_manager import READ_OUTPUT_TOOL, MCPManager
+from orchestrator.output_store import OutputStore
+from orchestrator.prompts import HELLO_TICKET_WORLD
+
+BIG = "".join(f"row {i:04d}\n" for i in range(300))  # 2700 chars
+
+
+class BigHandle:
+    def __init__(self, namespace, command):
+        self.namespace = namespace
+        self.timings = {}
+
+    async def connect(self):
+        return [Tool(name="export_sheet", description="Export a sheet", inputSchema={"type": "object"})]
+
+    async def close(self):
+        pass
+
+    async def call_tool(self, name, arguments):
+        return CallToolResult(content=[TextContent(type="text", text=BIG)])
+
+
+class ScriptedLLM:
+    def __init__(self, rounds):
+        self._rounds = list(rounds)
+        self.tool_names = []
+
+    async def respond_with_tools(self, inputs, tools, **_):
+        self.tool_names.append([tool["name"] for tool in tools])
+        return SimpleNamespace(output=self._rounds.pop(0), usage=None)
+
+
+def _call(name, call_id, arguments):
+    return [SimpleNamespace(type="function_call", name=name, call_id=call_id, arguments=json.dumps(arguments))]
+
+
+def test_spill_and_page():
+    store = OutputStore(1000, preview_chars=100)
+    assert store.spill("short") == "short"
+
+    preview = store.spill(BIG)
+    handle = preview.split('handle="')[1].split('"')[0]
+    assert preview.startswith(BIG[:100]) and "of 2700" in preview and "offset=100" in preview
+    assert store.spill(BIG) == preview  # identical outputs share one entry
+
+    page = store.read({"handle": handle, "offset": 100, "length": 5000})
+    assert page.startswith(BIG[100:1100]) and "continue with offset=1100" in page
+    last = store.read({"handle": handle, "offset": 2600})
+    assert last.startswith(BIG[2600:]) and "end of output" in last
+    assert store.read({"handle": "out_missing", "offset": 0}).startswith("Unknown output handle")
+    # Out-of-range pages are refused with the valid range, not served empty
+    for offset in (-1, 2700, 9000):
+        error = store.read({"handle": handle, "offset": offset})
+        assert error == f"offset {offset} is out of range: output '{handle}' has 2700 characters (offsets 0-2699)."
+    assert store.read({"handle": handle, "offset": 0, "length": 0}) == "length must be at least 1 (got 0)."
+    assert store.stats() == {
+        "spilled": 2, "spilled_chars": 5200, "reads": 2, "read_chars": 1100, "read_errors": 5, "stored": 1
+    }
+
+
+def test_agent_reads_spilled_output():
+    manager = MCPManager(MCPServerConfig(), handle_factory=BigHandle)
+    asyncio.run(manager.connect_all())
+    store = OutputStore(1000, preview_chars=200)
+
+    first = ScriptedLLM([_call("smartsheet__export_sheet", "c1", {}), [SimpleNamespace(type="message", content=[])]])
+    agent = AgentState("sam", "system")
+    _, _, outputs, _ = asyncio.run(
+        _drive_agent_turn(agent, [], first, manager, max_tool_rounds=2, output_store=store)
+    )
+    assert "orchestrator__read_output" in first.tool_names[0]
+    sent = [item["output"] for item in agent.inputs if isinstance(item, dict) and item.get("type") == "function_call_output"]
+    # The agent gets the preview; the run log keeps the whole output and its handle
+    assert len(sent) == 1 and len(sent[0]) < 400
+    handle = sent[0].split('handle="')[1].split('"')[0]
+    assert outputs[0]["output"] == BIG and outputs[0]["output_handle"] == handle
+
+    second = ScriptedLLM([_call("orchestrator__read_output", "c2", {"handle": handle, "offset": 200}),
+                          [SimpleNamespace(type="message", content=[])]])
+    _, _, outputs, _ = asyncio.run(
+        _drive_agent_turn(agent, [], second, manager, max_tool_rounds=2, output_store=store)
+    )
+    # Pages are never spilled again
+    assert outputs[0]["output"].startswith(BIG[200:1200]) and "offset=1200" in outputs[0]["output"]
+
+
+class ToolRecordingLLM(benchmark.ScriptedLLM):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.tool_names = set()
+
+    async def respond_with_tools(self, inputs, tools, **kwargs):
+        self.tool_names.update(tool["name"] for tool in tools)
+        return await super().respond_with_tools(inputs, tools, **kwargs)
+
+
+def test_read_tool_is_offered_per_run_on_a_shared_manager():
+    log_dir = Path(tempfile.mkdtemp(prefix="orchestrator-spill-"))
+    mcp = benchmark.build_fake_mcp(MCPServerConfig(), 0.0, 3000)
+
+    async def _runs():
+        offered = []
+        await mcp.connect_all()
+        try:
+            for spill_chars in (1000, 0):
+                cfg = Config(
+                    openai=OpenAIConfig(api_key="offline", model="scripted"),
+                    mcp=MCPServerConfig(),
+                    run=RunConfig(max_turns=2, max_tool_rounds=3, tool_output_spill_chars=spill_chars, log_dir=log_dir),
+                )
+                llm = ToolRecordingLLM(calls_per_turn=1)
+                await main(HELLO_TICKET_WORLD, cfg=cfg, llm=llm, mcp=mcp, own_mcp=False)
+                offered.append(llm.tool_names)
+        finally:
+            await mcp.close()
+        return offered
+
+    spill_run, plain_run = asyncio.run(_runs())
+    assert READ_OUTPUT_TOOL["name"] in spill_run
+    assert READ_OUTPUT_TOOL["name"] not in plain_run
+
+
+if __name__ == "__main__":
+    test_spill_and_page()
+    test_agent_reads_spilled_output()
+    test_read_tool_is_offered_per_run_on_a_shared_manager()
+    print("ALL TESTS PASSED ✅")
@@ -0,0 +1,116 @@
+"""
+Checks that the activity scheduler picks the agent with the most to react to, skips
+idle agents without a turn, and stops when the whole team is idle.
+
+Run with: python test_scheduler.py
+"""
+
+from orchestrator.agent_state import AgentState
+from orchestrator.event_log import SharedEventLog
+from orchestrator.scheduler import ActivityScheduler, RoundRobinScheduler, make_scheduler
+
+
+def _team(*names):
+    log = SharedEventLog()
+    return [AgentState(name, "system", event_log=log) for name in names]
+
+
+def _take_turn(scheduler, agent, tool_calls=(), message=None):
+    agent.sync_events()
+    scheduler.record(agent, list(tool_calls), message)
+
+
+def test_round_robin_keeps_rotation():
+    agents = _team("alex", "sam")
+    scheduler = make_scheduler("round_robin")
+    assert isinstance(scheduler, RoundRobinScheduler)
+    assert [scheduler.next_agent(turn, agents).name for turn in range(3)] == ["alex", "sam", "alex"]
+    assert scheduler.stats()["llm_calls_saved"] == 0
+    try:
+        make_scheduler("lottery")
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("unknown scheduler accepted")
+
+
+def test_activity_prefers_mentions_and_skips_idle_agents():
+    alex, sam, jordan, taylor = agents = _team("alex", "sam", "jordan", "taylor")
+    scheduler = ActivityScheduler()
+    # Everyone starts with a brief to act on, so the first round is the usual rotation
+    for turn, agent in enumerate(agents):
+        assert scheduler.next_agent(turn, agents) is agent
+        _take_turn(scheduler, agent)
+
+    # Only taylor and sam have something new; taylor is asked for by name
+    alex.broadcast("alex: Taylor, please size the backlog", [])
+    assert scheduler.priority(taylor) > scheduler.priority(sam) > 0
+    assert scheduler.priority(alex) == 0
+    assert scheduler.next_agent(4, agents) is taylor
+    _take_turn(scheduler, taylor, tool_calls=["linear.list_issues"])
+    # taylor is mid-task; sam and jordan wait on one unread event each, alex on none
+    assert scheduler.next_agent(5, agents) is taylor
+    _take_turn(scheduler, taylor, message="Sized.")
+    taylor.broadcast("taylor: Sized.", [])
+    # sam now has two unread events and has waited longest
+    assert scheduler.next_agent(6, agents) is sam
+
+    stats = scheduler.stats()
+    assert stats["turn_order"] == ["alex", "sam", "jordan", "taylor", "taylor", "taylor", "sam"]
+    # Both times taylor went, round-robin would first have woken alex with nothing new
+    assert stats["llm_calls_saved"] == 2
+
+
+def test_batches_pick_distinct_agents():
+    agents = _team("alex", "sam", "jordan")
+    assert [a.name for a in RoundRobinScheduler().next_batch(2, agents, 2)] == ["jordan", "alex"]
+    assert len(RoundRobinScheduler().next_batch(0, agents, 5)) == 3
+
+    scheduler = ActivityScheduler()
+    assert [a.name for a in scheduler.next_batch(0, agents, 2)] == ["alex", "sam"]
+    for agent in agents[:2]:
+        _take_turn(scheduler, agent)
+    # Only jordan still has something to react to: a short batch, not an idle stop
+    assert [a.name for a in scheduler.next_batch(2, agents, 2)] == ["jordan"]
+    assert scheduler.stats()["idle_stop"] is False
+
+
+def test_finished_tool_work_does_not_keep_an_agent_busy():
+    alex, sam = agents = _team("alex", "sam")
+    scheduler = ActivityScheduler()
+    for turn, agent in enumerate(agents):
+        scheduler.next_agent(turn, agents)
+        _take_turn(scheduler, agent)
+    # sam reacts to alex's news with tool calls and wraps up with a message
+    alex.broadcast("alex: Backlog is groomed", [])
+    assert scheduler.next_agent(2, agents) is sam
+    _take_turn(scheduler, sam, tool_calls=["linear.list_issues", "linear.update_issue"], message="Updated ENG-4.")
+    # Nothing new arrived for either of them, so no turn is spent on sam
+    assert scheduler.priority(sam) == 0
+    assert scheduler.next_agent(3, agents) is None
+
+    # Running out of tool rounds mid-task does keep the agent going
+    scheduler = ActivityScheduler()
+    for turn, agent in enumerate(agents):
+        scheduler.next_agent(turn, agents)
+        _take_turn(scheduler, agent, tool_calls=["linear.list_issues"] if agent is sam else (), message="")
+    assert scheduler.next_agent(2, agents) is sam
+
+
+def test_activity_stops_when_team_is_idle():
+    agents = _team("planner", "engineer")
+    scheduler = ActivityScheduler()
+    for turn, agent in enumerate(agents):
+        scheduler.next_agent(turn, agents)
+        _take_turn(scheduler, agent)
+    assert scheduler.next_agent(2, agents) is None
+    assert scheduler.stats()["idle_stop"] is True
+
+
+if __name__ == "__main__":
+    test_round_robin_keeps_rotation()
+    test_activity_prefers_mentions_and_skips_idle_agents()
+    test_batches_pick_distinct_agents()
+    test_finished_tool_work_does_not_keep_an_agent_busy()
+    test_activity_stops_when_team_is_idle()
+    print("ALL TESTS PASSED ✅")
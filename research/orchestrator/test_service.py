@@ -0,0 +1,118 @@
+"""
+Checks the orchestrator service: jobs run concurrently on one warm MCP manager probed
+once at start-up, bad run overrides are refused with code 400, and status,
+cancellation and event streaming work over the Unix-socket API.
+
+Run with: python test_service.py
+"""
+
+import asyncio
+import os
+import tempfile
+from pathlib import Path
+
+from benchmark import ScriptedLLM, build_fake_mcp
+from orchestrator.config import Config, MCPServerConfig, OpenAIConfig, RunConfig
+from orchestrator.ipc import IPCClient, IPCError
+from service import OrchestratorService
+
+
+async def _exercise_service():
+    tmp = Path(tempfile.mkdtemp(prefix="orchestrator-service-"))
+    cfg = Config(
+        openai=OpenAIConfig(api_key="offline", model="scripted"),
+        mcp=MCPServerConfig(),
+        run=RunConfig(max_turns=4, max_tool_rounds=3, log_dir=tmp / "runs"),
+    )
+    mcp = build_fake_mcp(cfg.mcp, 0.0, 200)
+    connects = []
+    connect_all = mcp.connect_all
+
+    async def counting_connect_all():
+        connects.append(1)
+        return await connect_all()
+
+    mcp.connect_all = counting_connect_all
+    probes = []
+    health_probe = mcp.health_probe
+
+    async def counting_health_probe():
+        probes.append(1)
+        return await health_probe()
+
+    mcp.health_probe = counting_health_probe
+    service = OrchestratorService(cfg, llm=ScriptedLLM(latency=0.01, calls_per_turn=1), mcp=mcp, max_jobs=2)
+    await service.start()
+    socket_path = os.path.join(tmp, "service.sock")
+    server = asyncio.create_task(service.serve_forever(socket_path))
+    while not os.path.exists(socket_path):
+        await asyncio.sleep(0.01)
+
+    pushed = []
+    client = IPCClient(socket_path, on_push=pushed.append)
+    await client.connect()
+    try:
+        first = await client.request("submit", scenario="hello_ticket", run={"max_turns": 3})
+        personas = {"writer": "You write release notes.", "reviewer": "You review release notes."}
+        second = await client.request("submit", scenario="bug_triage", personas=personas)
+        slow = await client.request("submit", scenario="bug_triage", run={"max_turns": 40})
+
+        # Cancelling works for a job still queued behind the two running ones
+        cancelled = await client.request("cancel", job=slow["job"])
+        assert cancelled["status"] == "cancelled"
+
+        done = await client.request("stream", job=first["job"])
+        assert done["status"] == "succeeded" and done["result"]["turns"] == 3
+        events = [message["event"]["type"] for message in pushed if message["job"] == first["job"]]
+        assert events[0] == "run_signature" and events.count("turn") == 3
+        assert "health_probe" not in events and "startup_profile" not in events
+        assert len(events) == done["events"]
+
+        second_done = await client.request("stream", job=second["job"])
+        turns = [m["event"] for m in pushed if m["job"] == second["job"] and m["event"]["type"] == "turn"]
+        assert second_done["status"] == "succeeded" and {t["agent"] for t in turns} == {"writer", "reviewer"}
+
+        assert [job["status"] for job in await client.request("list")] == ["succeeded", "succeeded", "cancelled"]
+        try:
+            await client.request("submit", scenario="hello_ticket", run={"max_turnz": 1})
+        except IPCError as exc:
+            assert "max_turnz" in str(exc)
+        else:
+            raise AssertionError("unknown run field accepted")
+        for bad_run in ({"max_turns": "3"}, {"max_turns": True}, {"log_dir": 5}, ["max_turns"]):
+            try:
+                await client.request("submit", scenario="hello_ticket", run=bad_run)
+            except IPCError as exc:
+                assert exc.code == 400, (bad_run, exc)
+            else:
+                raise AssertionError(f"bad run overrides accepted: {bad_run}")
+        try:
+            await client.request("status", job="job-999")
+        except IPCError as exc:
+            assert exc.code == 400
+        else:
+            raise AssertionError("status of an unknown job succeeded")
+        # A running job stops at its next await and keeps the log written so far
+        running = await client.request("submit", scenario="bug_triage", run={"max_turns": 40})
+        while (await client.request("status", job=running["job"]))["events"] < 3:
+            await asyncio.sleep(0.01)
+        assert (await client.request("cancel", job=running["job"]))["status"] == "cancelled"
+
+        # Every job reused the manager connected at start-up; the queued-then-cancelled one never logged
+        assert len(connects) == 1 and len(probes) == 1
+        health = await client.request("health")
+        assert health["probes"] and health["startup_profile"]["errors"] == {}
+        assert len(list((tmp / "runs").iterdir())) == 3
+    finally:
+        await client.close()
+        server.cancel()
+        await asyncio.gather(server, return_exceptions=True)
+
+
+def test_service_jobs():
+    asyncio.run(_exercise_service())
+
+
+if __name__ == "__main__":
+    test_service_jobs()
+    print("ALL TESTS PASSED ✅")
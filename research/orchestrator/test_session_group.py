@@ -0,0 +1,142 @@
+"""
+Checks that a SessionGroup spreads concurrent read-only calls over its sessions
+(least outstanding first), keeps writes on the primary session in issue order,
+survives a session that fails to start, and reports per-session utilization.
+
+Run with: python test_session_group.py
+"""
+
+import asyncio
+
+from mcp.types import CallToolResult, TextContent, Tool
+
+from orchestrator.config import MCPServerConfig
+from orchestrator.mcp_manager import MCPManager, SessionGroup
+
+
+class CountingHandle:
+    """Stand-in MCP session recording its calls and peak concurrency."""
+
+    def __init__(self, namespace, command="", latency=0.05, fail=False):
+        self.namespace = namespace
+        self.timings = {}
+        self.latency = latency
+        self.fail = fail
+        self.calls = []
+        self.outstanding = 0
+        self.peak = 0
+
+    async def connect(self):
+        if self.fail:
+            raise OSError("spawn failed")
+        return [
+            Tool(name="list_issues", inputSchema={"type": "object"}),
+            Tool(name="update_issue", inputSchema={"type": "object"}),
+        ]
+
+    async def close(self):
+        pass
+
+    async def ping(self):
+        pass
+
+    async def call_tool(self, name, arguments):
+        self.calls.append((name, dict(arguments)))
+        self.outstanding += 1
+        self.peak = max(self.peak, self.outstanding)
+        try:
+            await asyncio.sleep(self.latency)
+        finally:
+            self.outstanding -= 1
+        return CallToolResult(content=[TextContent(type="text", text=name)])
+
+
+def _group(handles):
+    return SessionGroup("linear", handles, lambda name: name.startswith("list_"))
+
+
+def test_reads_spread_over_least_busy_sessions():
+    async def run():
+        handles = [CountingHandle("linear") for _ in range(3)]
+        group = _group(handles)
+        await group.connect()
+        await asyncio.gather(*(group.call_tool("list_issues", {"page": page}) for page in range(6)))
+        return handles, group.utilization()
+
+    handles, utilization = asyncio.run(run())
+    assert [len(handle.calls) for handle in handles] == [2, 2, 2]
+    assert [handle.peak for handle in handles] == [2, 2, 2]
+    assert utilization["configured"] == utilization["live"] == 3
+    for session in utilization["sessions"]:
+        assert session["calls"] == 2 and session["peak_outstanding"] == 2
+        assert session["busy_s"] > 0 and 0 < session["busy_ratio"] <= 1
+
+
+def test_writes_stay_on_the_primary_session():
+    async def run():
+        handles = [CountingHandle("linear") for _ in range(3)]
+        group = _group(handles)
+        await group.connect()
+        writes = [group.call_tool("update_issue", {"seq": seq}) for seq in range(3)]
+        # A write in flight on session 0 steers concurrent reads to the idle sessions
+        reads = [group.call_tool("list_issues", {"page": page}) for page in range(2)]
+        await asyncio.gather(*writes, *reads)
+        return handles
+
+    primary, second, third = asyncio.run(run())
+    assert primary.calls == [("update_issue", {"seq": seq}) for seq in range(3)]
+    assert second.calls == [("list_issues", {"page": 0})]
+    assert third.calls == [("list_issues", {"page": 1})]
+
+
+def test_failed_session_leaves_the_rest_serving():
+    async def run():
+        handles = [CountingHandle("linear"), CountingHandle("linear", fail=True), CountingHandle("linear")]
+        group = _group(handles)
+        tools = await group.connect()
+        await asyncio.gather(*(group.call_tool("list_issues", {"page": page}) for page in range(4)))
+        return tools, handles, group.utilization()
+
+    tools, handles, utilization = asyncio.run(run())
+    assert [tool.name for tool in tools] == ["list_issues", "update_issue"]
+    assert [len(handle.calls) for handle in handles] == [2, 0, 2]
+    assert utilization["configured"] == 3 and utilization["live"] == 2
+    assert [session["calls"] for session in utilization["sessions"]] == [2, 2]
+
+    group = _group([CountingHandle("linear", fail=True)])
+    try:
+        asyncio.run(group.connect())
+    except OSError:
+        pass
+    else:
+        raise AssertionError("group with no live session connected")
+
+
+def test_manager_opens_configured_sessions_and_reports_them():
+    created = []
+
+    def make_handle(namespace, command):
+        created.append(CountingHandle(namespace, command))
+        return created[-1]
+
+    cfg = MCPServerConfig(session_counts={"linear": 3}, max_concurrent_calls=8, single_flight=False)
+    manager = MCPManager(cfg, handle_factory=make_handle)
+
+    async def run():
+        await manager.connect_all()
+        await asyncio.gather(*(manager.call("linear.list_issues", {"page": page}) for page in range(3)))
+        await manager.call("linear.update_issue", {"id": "ENG-1"})
+        return manager.pool_utilization()
+
+    utilization = asyncio.run(run())
+    assert utilization["smartsheet"]["configured"] == 1
+    assert utilization["linear"]["live"] == 3
+    assert [session["calls"] for session in utilization["linear"]["sessions"]] == [2, 1, 1]
+
+
+if __name__ == "__main__":
+    test_reads_spread_over_least_busy_sessions()
+    test_writes_stay_on_the_primary_session()
+    test_failed_session_leaves_the_rest_serving()
+    test_manager_opens_configured_sessions_and_reports_them()
+    print("ALL TESTS PASSED ✅")
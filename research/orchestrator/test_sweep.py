@@ -0,0 +1,94 @@
+"""
+Checks the sweep driver: grid expansion, streamed results, the cross-process cap on
+in-flight requests, resuming an interrupted sweep, and that a request cancelled
+while waiting for a slot does not leak it.
+
+Run with: python test_sweep.py
+"""
+
+import asyncio
+import json
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import sweep
+from sweep import RequestGate, build_grid, load_done, run_sweep
+
+
+def _fake_cell(cell):
+    """Stands in for `run_cell`: holds one request slot for a while, like an LLM call."""
+    sweep._request_slots.acquire()
+    try:
+        started = time.time()
+        time.sleep(0.05)
+        ended = time.time()
+    finally:
+        sweep._request_slots.release()
+    status = "error" if cell.seed == 13 else "ok"
+    return {"key": cell.key, "status": status, "started": started, "ended": ended, "turns": 1, "outcome": "finished"}
+
+
+def test_grid_and_resume():
+    grid = build_grid(["hello_ticket", "bug_triage"], ["m1", "m2"], [0.0, None], [1, 13])
+    assert len(grid) == 16 and len({cell.key for cell in grid}) == 16
+    assert grid[0].run_id == "m1_t0.0_s1"
+
+    results = Path(tempfile.mkdtemp(prefix="orchestrator-sweep-")) / "results.jsonl"
+    counts = run_sweep(grid, results, workers=3, max_in_flight=1, runner=_fake_cell)
+    assert counts == {"cells": 16, "skipped": 0, "ok": 8, "error": 8}
+
+    records = [json.loads(line) for line in results.read_text().splitlines()]
+    assert len(records) == 16
+    # One slot across three processes: no two requests overlapped
+    spans = sorted((record["started"], record["ended"]) for record in records)
+    assert all(previous[1] <= current[0] for previous, current in zip(spans, spans[1:]))
+
+    # A truncated last line (interrupted write) is ignored; done cells are skipped, failed ones retried
+    with results.open("a") as handle:
+        handle.write('{"key": "hello_ticket|m1')
+    assert len(load_done(results)) == 8
+    counts = run_sweep(grid, results, workers=2, max_in_flight=2, runner=_fake_cell)
+    assert counts == {"cells": 16, "skipped": 8, "ok": 0, "error": 8}
+    assert len(load_done(results)) == 8 and len(results.read_text().splitlines()) == 25
+
+
+class EchoLLM:
+    async def respond_with_tools(self, inputs, tools, **kwargs):
+        return "response"
+
+
+def test_cancelled_wait_does_not_leak_a_slot():
+    slots = threading.BoundedSemaphore(1)
+    gate = RequestGate(EchoLLM(), slots)
+
+    async def run():
+        assert await gate.respond_with_tools([], []) == "response"
+        slots.acquire()  # another process holds the only slot
+        for free_on_cancel in (False, True):
+            waiting = asyncio.create_task(gate.respond_with_tools([], []))
+            await asyncio.sleep(0.12)
+            assert not waiting.done()
+            if free_on_cancel:
+                # The slot frees up just as the request is cancelled: the attempt
+                # already in flight may take it, and must give it back
+                slots.release()
+            waiting.cancel()
+            try:
+                await waiting
+            except asyncio.CancelledError:
+                pass
+            else:
+                raise AssertionError("cancelled request went ahead")
+        await asyncio.sleep(RequestGate.POLL_S * 3)
+
+    asyncio.run(run())
+    assert slots.acquire(blocking=False)
+    slots.release()
+
+
+if __name__ == "__main__":
+    test_grid_and_resume()
+    test_cancelled_wait_does_not_leak_a_slot()
+    print("ALL TESTS PASSED ✅")
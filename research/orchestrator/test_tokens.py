@@ -0,0 +1,77 @@
+"""
+Checks for the local token counter and AgentState's incremental token totals.
+
+Run with: python test_tokens.py
+"""
+
+from types import SimpleNamespace
+
+from mcp.types import Tool
+
+from main import _build_prompt, _prompt_tool_tokens
+from orchestrator import tokens
+from orchestrator.agent_state import AgentState
+from orchestrator.mcp_manager import NamespacedTool
+from orchestrator.tokens import ITEM_OVERHEAD, TOOL_OVERHEAD, TokenCounter
+
+
+def test_approx_counts_item_payloads():
+    counter = TokenCounter()
+    assert counter.count_text("abcdefgh") == 2
+    assert counter.count_item({"role": "user", "content": "abcdefgh"}) == ITEM_OVERHEAD + 2
+    call = SimpleNamespace(type="function_call", name="abcd", arguments="{}")
+    assert counter.count_item(call) == ITEM_OVERHEAD + 2
+    output = {"type": "function_call_output", "call_id": "c1", "output": "x" * 40}
+    assert counter.count_item(output) == ITEM_OVERHEAD + 10
+    tool = {"type": "function", "name": "linear__list_teams", "parameters": {}}
+    assert counter.count_tools([tool]) > TOOL_OVERHEAD
+
+
+def test_agent_totals_update_incrementally():
+    counter = TokenCounter()
+    agent = AgentState("engineer", "system", token_counter=counter)
+    agent.receive("planner: hello")
+    agent.respond("on it")
+    agent.add_output_items([SimpleNamespace(type="function_call", name="linear__list_teams", arguments="{}", call_id="c1")])
+    agent.add_function_output("c1", "ENG")
+    assert len(agent.item_tokens) == len(agent.inputs) == 4
+    assert agent.total_tokens() == counter.count_items(agent.build_inputs())
+
+
+def test_exact_mode_falls_back_without_tiktoken():
+    original = tokens.tiktoken
+    tokens.tiktoken = None
+    try:
+        counter = TokenCounter("exact")
+    finally:
+        tokens.tiktoken = original
+    assert counter.mode == "approx" and "tiktoken" in counter.fallback_reason
+    assert counter.count_text("abcdefgh") == 2
+
+
+def test_prompt_tool_modes_shrink_request_tokens():
+    tools = [
+        NamespacedTool("linear", Tool(name="list_teams", description="List teams " * 10, inputSchema={})),
+        NamespacedTool("linear", Tool(name="create_issue", description="Create an issue " * 10, inputSchema={})),
+        NamespacedTool("smartsheet", Tool(name="list_sheets", description="List sheets " * 10, inputSchema={})),
+    ]
+    index = _build_prompt("base", tools, "index")
+    assert "- linear: list_teams, create_issue" in index and "List teams" not in index
+    assert "Available MCP tools" not in _build_prompt("base", tools, "none")
+
+    oi_tools = [{"type": "function", "name": "linear__list_teams", "parameters": {}}]
+    report = _prompt_tool_tokens(
+        {"planner": "base"}, {"planner": tools}, "none", TokenCounter(), {"planner": oi_tools}
+    )
+    planner = report["agents"]["planner"]
+    assert planner["saved_per_request"] > 50
+    assert planner["request_tokens_full"] - planner["request_tokens"] == planner["saved_per_request"]
+    assert planner["tool_tokens"] == TokenCounter().count_tools(oi_tools) and planner["tools"] == 3
+
+
+if __name__ == "__main__":
+    test_approx_counts_item_payloads()
+    test_agent_totals_update_incrementally()
+    test_exact_mode_falls_back_without_tiktoken()
+    test_prompt_tool_modes_shrink_request_tokens()
+    print("ALL TESTS PASSED ✅")
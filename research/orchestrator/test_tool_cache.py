@@ -0,0 +1,150 @@
+"""
+Checks for the read-only tool result cache and single-flight coalescing inside
+MCPManager.call.
+
+Run with: python test_tool_cache.py
+"""
+
+import asyncio
+
+from mcp.types import CallToolResult, TextContent, Tool
+
+from orchestrator.config import MCPServerConfig
+from orchestrator.mcp_manager import MCPManager
+from orchestrator.tool_cache import ToolResultCache, call_key
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class CountingHandle:
+    """Stand-in for an MCP server handle that counts calls per tool."""
+
+    def __init__(self, namespace, command):
+        self.namespace = namespace
+        self.timings = {}
+        self.calls = []
+
+    async def connect(self):
+        return [
+            Tool(name="list_teams", inputSchema={"type": "object"}),
+            Tool(name="create_issue", inputSchema={"type": "object"}),
+        ]
+
+    async def close(self):
+        pass
+
+    async def call_tool(self, name, arguments):
+        self.calls.append(name)
+        await asyncio.sleep(0.01)
+        return CallToolResult(content=[TextContent(type="text", text=f"{name} #{len(self.calls)}")])
+
+
+def test_key_ignores_argument_order():
+    assert call_key("linear.list_teams", {"a": 1, "b": 2}) == call_key("linear.list_teams", {"b": 2, "a": 1})
+    assert call_key("linear.list_teams", {"a": 1}) != call_key("linear.list_teams", {"a": 2})
+
+
+def test_ttl_lru_and_invalidation():
+    clock = FakeClock()
+    cache = ToolResultCache(
+        default_ttl=10, max_entries=2, tool_ttls={"linear.list_teams": 100, "*health*": 0}, clock=clock
+    )
+    teams = call_key("linear.list_teams", {})
+    issues = call_key("linear.list_issues", {})
+    sheets = call_key("smartsheet.list_sheets", {})
+
+    cache.put(teams, "teams")
+    cache.put(issues, "issues")
+    cache.put(call_key("smartsheet.health_check", {}), "ok")  # TTL 0: not stored
+    assert cache.get(teams) == "teams"
+
+    clock.now = 11
+    assert cache.get(issues) is None  # expired after default TTL
+    assert cache.get(teams) == "teams"  # per-tool TTL still valid
+
+    cache.put(issues, "issues")
+    cache.put(sheets, "sheets")  # evicts least recently used (teams)
+    assert cache.get(teams) is None
+    assert cache.invalidate_namespace("linear") == 1
+    assert cache.get(sheets) == "sheets"
+
+    # A read that started before the write must not repopulate the cache
+    generation = cache.generation("linear")
+    cache.invalidate_namespace("linear")
+    cache.put(issues, "stale", generation=generation)
+    assert cache.get(issues) is None
+
+    stats = cache.stats()
+    assert stats["evictions"] == 1 and stats["expired"] == 1 and stats["hits"] == 3
+
+
+def _manager(**cfg):
+    handles = {}
+
+    def make_handle(namespace, command):
+        handles[namespace] = CountingHandle(namespace, command)
+        return handles[namespace]
+
+    return MCPManager(MCPServerConfig(**cfg), handle_factory=make_handle), handles
+
+
+def test_manager_caches_reads_and_writes_invalidate():
+    manager, handles = _manager(cache_enabled=True)
+
+    async def scenario():
+        await manager.connect_all()
+        first, _ = await manager.call("linear.list_teams", {"limit": 5})
+        second, _ = await manager.call("linear.list_teams", {"limit": 5})
+        await manager.call("linear.create_issue", {"title": "x"})
+        third, _ = await manager.call("linear.list_teams", {"limit": 5})
+        return first, second, third
+
+    first, second, third = asyncio.run(scenario())
+    assert first == second == "list_teams #1"
+    assert third == "list_teams #3"
+    assert handles["linear"].calls == ["list_teams", "create_issue", "list_teams"]
+    assert manager.cache_stats()["hits"] == 1
+
+
+def test_single_flight_coalesces_identical_calls():
+    manager, handles = _manager()
+
+    async def scenario():
+        await manager.connect_all()
+        reads = await asyncio.gather(*(manager.call("linear.list_teams", {"limit": 5}) for _ in range(3)))
+        other = await manager.call("linear.list_teams", {"limit": 5})
+        # Only read-only tools are coalesced: every write reaches the server, whatever its verb
+        for tool in ("create_issue", "update_issue"):
+            await asyncio.gather(*(manager.call(f"linear.{tool}", {"title": "x"}) for _ in range(2)))
+        return reads, other
+
+    reads, other = asyncio.run(scenario())
+    assert len({id(result) for _, result in reads}) == 1  # same CallToolResult object
+    assert other[0] == "list_teams #2"  # not coalesced once the first flight landed
+    assert handles["linear"].calls == ["list_teams", "list_teams"] + ["create_issue"] * 2 + ["update_issue"] * 2
+    assert manager.single_flight_stats() == {"leaders": 2, "coalesced": 2}
+
+    # Read-only tools can be excluded too
+    manager, handles = _manager(single_flight_exclude=("*.list_teams",))
+
+    async def excluded():
+        await manager.connect_all()
+        await asyncio.gather(*(manager.call("linear.list_teams", {"limit": 5}) for _ in range(2)))
+
+    asyncio.run(excluded())
+    assert handles["linear"].calls == ["list_teams", "list_teams"]
+    assert manager.single_flight_stats() == {"leaders": 0, "coalesced": 0}
+
+
+if __name__ == "__main__":
+    test_key_ignores_argument_order()
+    test_ttl_lru_and_invalidation()
+    test_manager_caches_reads_and_writes_invalidate()
+    test_single_flight_coalesces_identical_calls()
+    print("ALL TESTS PASSED ✅")
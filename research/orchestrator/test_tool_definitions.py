@@ -0,0 +1,96 @@
+"""
+Checks that MCPManager converts tool definitions once per tool-list version and
+rebuilds only the namespace whose server sent notifications/tools/list_changed.
+
+Run with: python test_tool_definitions.py
+"""
+
+import asyncio
+from contextlib import AsyncExitStack
+
+from mcp.server.fastmcp import Context, FastMCP
+from mcp.shared.memory import create_connected_server_and_client_session
+
+from orchestrator.config import MCPServerConfig
+from orchestrator.mcp_manager import MCPManager, MCPServerHandle
+
+
+class InProcessHandle(MCPServerHandle):
+    def __init__(self, namespace, server):
+        super().__init__(namespace, f"in-process:{namespace}")
+        self._server = server
+
+    async def _open_session(self, stack: AsyncExitStack):
+        return await stack.enter_async_context(
+            create_connected_server_and_client_session(self._server, message_handler=self._handle_message)
+        )
+
+
+def _servers():
+    linear = FastMCP("linear")
+    smartsheet = FastMCP("smartsheet")
+
+    @linear.tool()
+    def list_teams() -> str:
+        return "ENG"
+
+    @linear.tool()
+    async def enable_projects(ctx: Context) -> str:
+        @linear.tool()
+        def list_projects() -> str:
+            return "proj_1"
+
+        await ctx.session.send_tool_list_changed()
+        return "enabled"
+
+    @smartsheet.tool()
+    def list_sheets() -> str:
+        return "101"
+
+    return {"linear": linear, "smartsheet": smartsheet}
+
+
+def _manager():
+    servers = _servers()
+    cfg = MCPServerConfig(linear_cmd="in-process", smartsheet_cmd="in-process")
+    return MCPManager(cfg, handle_factory=lambda namespace, _command: InProcessHandle(namespace, servers[namespace]))
+
+
+def test_definitions_are_cached_until_list_changed():
+    manager = _manager()
+
+    async def scenario():
+        await manager.connect_all()
+        try:
+            first = manager.openai_tools()
+            again = manager.openai_tools()
+            canonical = manager.openai_tools(canonical=True)
+            version, digest = manager.tools_version, manager.tools_hash()
+            assert all(a is b for a, b in zip(first, again))
+            assert [d["name"] for d in canonical] == sorted(d["name"] for d in canonical)
+
+            await manager.call("linear.enable_projects", {})
+            for _ in range(100):
+                if manager.tool_refresh_stats()["changed"]:
+                    break
+                await asyncio.sleep(0.01)
+            after = manager.openai_tools()
+            return first, after, version, digest
+        finally:
+            await manager.close()
+
+    first, after, version, digest = asyncio.run(scenario())
+    names = [d["name"] for d in after]
+    assert "linear__list_projects" in names and names[-1] == "orchestrator__finish"
+    assert manager.resolve_openai_tool_name("linear__list_projects") == "linear.list_projects"
+    assert manager.tools_version == version + 1 and manager.tools_hash() != digest
+    # The smartsheet namespace was not rebuilt
+    sheet = next(d for d in first if d["name"] == "smartsheet__list_sheets")
+    assert any(d is sheet for d in after)
+    stats = manager.tool_refresh_stats()
+    assert stats["notifications"] == stats["refreshes"] == stats["changed"] == 1
+
+
+if __name__ == "__main__":
+    test_definitions_are_cached_until_list_changed()
+    print("ALL TESTS PASSED ✅")
@@ -0,0 +1,152 @@
+"""
+Checks for per-agent tool subsets: persona-based ranking, subset definitions from
+MCPManager, system prompts that list only the agent's subset, and recovering
+out-of-subset tools through orchestrator__discover_tools.
+
+Run with: python test_tool_selection.py
+"""
+
+import asyncio
+import json
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+
+from mcp.types import CallToolResult, TextContent, Tool
+
+import benchmark
+from main import _drive_agent_turn, main
+from orchestrator.agent_state import AgentState
+from orchestrator.config import Config, MCPServerConfig, OpenAIConfig, RunConfig
+from orchestrator.mcp_manager import MCPManager
+from orchestrator.prompts import HELLO_TICKET_WORLD
+from orchestrator.tool_selection import ToolSelector, namespace_affinity
+
+TOOLS = {
+    "linear": [
+        ("list_issues", "List issues in a Linear project"),
+        ("create_issue", "Create a Linear issue for engineering work"),
+        ("update_issue", "Update the state of a Linear issue"),
+    ],
+    "smartsheet": [
+        ("list_sheets", "List Smartsheet sheets"),
+        ("add_sheet_row", "Add a row to a Smartsheet sheet for planning"),
+        ("health_check", "Check that the Smartsheet API is reachable"),
+    ],
+}
+
+
+class StaticHandle:
+    def __init__(self, namespace, command):
+        self.namespace = namespace
+        self.timings = {}
+
+    async def connect(self):
+        return [Tool(name=name, description=desc, inputSchema={"type": "object"}) for name, desc in TOOLS[self.namespace]]
+
+    async def close(self):
+        pass
+
+    async def call_tool(self, name, arguments):
+        return CallToolResult(content=[TextContent(type="text", text=f"{name} ok")])
+
+
+class RecordingLLM:
+    def __init__(self, rounds):
+        self._rounds = list(rounds)
+        self.tool_names = []
+
+    async def respond_with_tools(self, inputs, tools, **_):
+        self.tool_names.append([tool["name"] for tool in tools])
+        return SimpleNamespace(output=self._rounds.pop(0), usage=None)
+
+
+def _connected_manager():
+    manager = MCPManager(MCPServerConfig(), handle_factory=StaticHandle)
+    asyncio.run(manager.connect_all())
+    return manager
+
+
+def test_persona_ranks_its_namespace_first():
+    manager = _connected_manager()
+    persona = "You have used Linear for years. Reference Linear issues often; Smartsheet is new to you."
+    assert namespace_affinity(persona, ["linear", "smartsheet"]) == {"linear": 1.0, "smartsheet": 0.5}
+
+    selector = ToolSelector(manager.available_tools(), limit=3)
+    agent = AgentState("sam", "system")
+    assert selector.assign(agent, persona) == ["linear__list_issues", "linear__create_issue", "linear__update_issue"]
+
+    names = [d["name"] for d in manager.openai_tools(names=agent.tool_subset)]
+    assert names == [*agent.tool_subset, "orchestrator__finish", "orchestrator__discover_tools"]
+    canonical = [d["name"] for d in manager.openai_tools(canonical=True, names=agent.tool_subset)]
+    assert canonical == sorted(canonical) and "orchestrator__discover_tools" in canonical
+
+
+def test_discover_adds_tools_for_the_next_round():
+    manager = _connected_manager()
+    selector = ToolSelector(manager.available_tools(), limit=2)
+    agent = AgentState("sam", "system")
+    selector.assign(agent, "Linear Linear issues")
+    llm = RecordingLLM(
+        [
+            [SimpleNamespace(type="function_call", name="orchestrator__discover_tools", call_id="c1",
+                             arguments=json.dumps({"query": "smartsheet row", "limit": 1}))],
+            [SimpleNamespace(type="function_call", name="smartsheet__add_sheet_row", call_id="c2", arguments="{}")],
+            [SimpleNamespace(type="message", content=[SimpleNamespace(type="output_text", text="done")])],
+        ]
+    )
+    message, calls, outputs, _ = asyncio.run(
+        _drive_agent_turn(agent, [], llm, manager, max_tool_rounds=4, tool_selector=selector)
+    )
+
+    assert message == "done"
+    assert "smartsheet__add_sheet_row" not in llm.tool_names[0]
+    assert "smartsheet__add_sheet_row" in llm.tool_names[1]
+    assert outputs[0]["output"].startswith("Tools now available:\n- smartsheet__add_sheet_row")
+    assert outputs[1]["output"] == "add_sheet_row ok"
+    assert selector.stats([agent])["agents"]["sam"] == {"subset": 3, "discovered": 1}
+
+
+class PromptRecordingLLM(benchmark.ScriptedLLM):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.system_prompts = []
+        self.tool_names = []
+
+    async def respond_with_tools(self, inputs, tools, **kwargs):
+        self.system_prompts.append(inputs[0]["content"])
+        self.tool_names.append({tool["name"] for tool in tools})
+        return await super().respond_with_tools(inputs, tools, **kwargs)
+
+
+def test_system_prompt_lists_only_the_agent_subset():
+    log_dir = Path(tempfile.mkdtemp(prefix="orchestrator-subset-"))
+    cfg = Config(
+        openai=OpenAIConfig(api_key="offline", model="scripted"),
+        mcp=MCPServerConfig(),
+        run=RunConfig(max_turns=1, max_tool_rounds=2, tool_subset_size=3, log_dir=log_dir),
+    )
+    llm = PromptRecordingLLM(calls_per_turn=1)
+    result = asyncio.run(main(HELLO_TICKET_WORLD, cfg=cfg, llm=llm, mcp=benchmark.build_fake_mcp(cfg.mcp, 0.0, 200)))
+
+    prompt, offered = llm.system_prompts[0], llm.tool_names[0]
+    catalogue = prompt.split("Available MCP tools:\n", 1)[1].split("\nMore tools exist", 1)[0]
+    listed = {line[2:].split(":")[0].replace(".", "__") for line in catalogue.splitlines()}
+    subset = {name for name in offered if not name.startswith("orchestrator__")}
+    assert len(subset) == 3 and listed == subset
+    assert "orchestrator__discover_tools" in prompt
+
+    records = [json.loads(line) for line in Path(result["log_path"]).read_text(encoding="utf-8").splitlines()]
+    (tokens,) = [record for record in records if record["type"] == "prompt_tool_tokens"]
+    (subsets,) = [record for record in records if record["type"] == "tool_subsets"]
+    for name, counts in tokens["agents"].items():
+        assert counts["tools"] == 3
+        # The definitions counted are the subset's, not the whole catalogue's
+        assert counts["tool_tokens"] == subsets["agents"][name]["tool_tokens"] < subsets["tool_tokens_all"]
+
+
+if __name__ == "__main__":
+    test_persona_ranks_its_namespace_first()
+    test_discover_adds_tools_for_the_next_round()
+    test_system_prompt_lists_only_the_agent_subset()
+    print("ALL TESTS PASSED ✅")